@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark line counting over a synthetic source tree.
+
+Builds a tree of --files files (JavaScript/C++-like sizes: mostly small
+modules plus a long tail of large bundles and generated sources), then
+counts every file's lines three ways: decoding UTF-8 text line by line (the
+old count_lines_in_file), counting b"\\n" on raw bytes in-process, and
+LineCounter sharding the files by size across a process pool. All three
+must agree. Run twice to time a warm page cache; the tree is kept in --dir.
+
+Usage (from chapter-04/reporank):
+    python benchmarks/bench_line_count.py --files 100000 --processes 4
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.line_counter import LineCounter, count_file_lines
+
+LINE = b'    const value = computeSomething(input, options); // keep going\n'
+
+
+def build_tree(root: str, files: int, seed: int = 7) -> None:
+    """Write the synthetic tree, unless it already has the right number of files."""
+    marker = os.path.join(root, f'.built-{files}-{seed}')
+    if os.path.exists(marker):
+        return
+    rng = random.Random(seed)
+    for i in range(files):
+        directory = os.path.join(root, f'pkg{i % 100}', f'mod{i % 1000 // 100}')
+        os.makedirs(directory, exist_ok=True)
+        # Log-normal line counts: median ~30 lines, a few files of 100k+ lines
+        lines = min(200000, int(rng.lognormvariate(3.5, 1.4)))
+        extension = rng.choice(('.js', '.ts', '.cc', '.h'))
+        with open(os.path.join(directory, f'file{i}{extension}'), 'wb') as f:
+            f.write(LINE * lines)
+            if i % 3 == 0:
+                f.write(b'// no trailing newline')
+    open(marker, 'w').close()
+
+
+def list_tree(root: str) -> list:
+    """(path, size) for every file under root."""
+    files = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if not filename.startswith('.built-'):
+                path = os.path.join(dirpath, filename)
+                files.append((path, os.path.getsize(path)))
+    return files
+
+
+def count_decoded(files: list) -> dict:
+    """The old approach: decode each file and iterate over its lines."""
+    counts = {}
+    for path, _ in files:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            counts[path] = sum(1 for _ in f)
+    return counts
+
+
+def count_raw(files: list) -> dict:
+    """Raw-byte newline counts in this process."""
+    return {path: count_file_lines(path) for path, _ in files}
+
+
+def count_pooled(files: list, processes: int) -> dict:
+    """LineCounter with every batch sent to the pool (startup included in the timing)."""
+    with LineCounter(processes, parallel_min_bytes=0) as counter:
+        return counter.count(files)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=100000, help='Number of files in the synthetic tree')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help='Process pool size')
+    parser.add_argument('--dir', default=os.path.join(tempfile.gettempdir(), 'reporank_bench_lines'),
+                        help='Where the synthetic tree is built (kept between runs)')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    start = time.perf_counter()
+    build_tree(args.dir, args.files)
+    files = list_tree(args.dir)
+    total_bytes = sum(size for _, size in files)
+    print(f"Tree: {len(files)} files, {total_bytes / 1024 / 1024:.0f} MB "
+          f"(ready in {time.perf_counter() - start:.1f} s)")
+
+    results = {}
+    for label, count in (
+        ('decoded', count_decoded),
+        ('raw bytes', count_raw),
+        (f'pool x{args.processes}', lambda batch: count_pooled(batch, args.processes)),
+    ):
+        start = time.perf_counter()
+        counts = count(files)
+        results[label] = (time.perf_counter() - start, counts)
+
+    baseline_time, baseline = results['decoded']
+    for label, (elapsed, counts) in results.items():
+        status = 'ok' if counts == baseline else 'MISMATCH'
+        print(f"  {label:<10} {elapsed:7.2f} s  {baseline_time / elapsed:5.1f}x  "
+              f"{sum(counts.values())} lines  {status}")
+    return 0 if all(counts == baseline for _, counts in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark sequential vs concurrent GitHub metadata acquisition.
+
+Starts a local stub of the GitHub REST API that answers every request after a
+fixed delay, then times AcquisitionPipeline.fetch_metadata() with fan-out
+disabled and enabled. With fan-out the per-repo latency should drop to roughly
+the slowest single method (check_security_files, which probes several paths).
+
+Usage (from chapter-04/reporank):
+    python benchmarks/bench_metadata_fanout.py --delay 0.1 --runs 5
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_acquisition.github_client import GitHubClient
+from data_acquisition.repo_analyzer import RepositoryAnalyzer
+from data_acquisition.acquisition_pipeline import AcquisitionPipeline
+
+
+def make_stub_handler(delay: float):
+    """Build a request handler that mimics the endpoints the pipeline uses."""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload, link: str = '') -> None:
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            if link:
+                self.send_header('Link', link)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('X-RateLimit-Remaining', '4999')
+            self.send_header('X-RateLimit-Limit', '5000')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            time.sleep(delay)
+            path = self.path.split('?')[0]
+            if path.endswith('/languages'):
+                self._send_json(200, {'Python': 120000, 'Shell': 3000})
+            elif path.endswith('/readme'):
+                body = b'# Stub\n\nBenchmark README.'
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/vnd.github.raw')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif path.endswith('/contributors'):
+                self._send_json(200, [{'login': 'user0', 'contributions': 1}],
+                                link=f'<http://stub{path}?per_page=1&page=30>; rel="last"')
+            elif path.endswith('/commits'):
+                self._send_json(200, [{'sha': '0' * 40}],
+                                link=f'<http://stub{path}?per_page=1&page=1200>; rel="last"')
+            elif '/stats/' in path:
+                self._send_json(200, [])
+            elif '/contents/' in path:
+                self._send_json(404, {'message': 'Not Found'})
+            else:
+                self._send_json(200, {
+                    'name': 'stub', 'description': 'Stub repository',
+                    'stargazers_count': 42, 'forks_count': 7,
+                    'default_branch': 'main', 'language': 'Python', 'license': None,
+                })
+
+    return StubHandler
+
+
+def time_fetch(pipeline: AcquisitionPipeline, runs: int) -> list:
+    """Time fetch_metadata() over several runs."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        pipeline.fetch_metadata('stub-owner', 'stub-repo')
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--delay', type=float, default=0.1, help='Stub server latency per request (seconds)')
+    parser.add_argument('--runs', type=int, default=5, help='Number of timed runs per mode')
+    parser.add_argument('--concurrency', type=int, default=6, help='Concurrency for the fan-out mode')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_stub_handler(args.delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = {}
+    for label, concurrency in (('sequential', 1), ('concurrent', args.concurrency)):
+        client = GitHubClient(base_url=base_url, pool_size=concurrency)
+        pipeline = AcquisitionPipeline(client, RepositoryAnalyzer(), max_concurrency=concurrency)
+        results[label] = time_fetch(pipeline, args.runs)
+
+    server.shutdown()
+
+    print(f"Stub latency: {args.delay * 1000:.0f} ms/request, {args.runs} runs")
+    for label, timings in results.items():
+        print(f"  {label:<11} median {statistics.median(timings) * 1000:8.1f} ms")
+    speedup = statistics.median(results['sequential']) / statistics.median(results['concurrent'])
+    print(f"  speedup     {speedup:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Check that tarball mode matches the clone path on a local fixture.
+
+Builds a synthetic git repository in --dir: source files of several
+languages and sizes, test, vendored and generated files that selection must
+skip, binary assets, and dependency manifests at the root, in nested
+packages and under excluded directories. It then packs HEAD into a tarball
+with ``git archive``, the same layout GitHub's tarball endpoint serves.
+
+The tarball is analyzed with RepositoryAnalyzer.analyze_tarball(). A clone of
+the fixture (over file://, with the configured --clone-strategy) is analyzed
+with analyze_file_extensions(), select_files_for_analysis(),
+read_file_contents() and extract_dependencies(). Extension counts, selected
+files, code samples and dependencies must be identical. No network access
+is needed.
+
+Usage (from chapter-04/reporank):
+    python benchmarks/check_tarball_parity.py
+    python benchmarks/check_tarball_parity.py --clone-strategy full --keep
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_acquisition.repo_analyzer import RepositoryAnalyzer
+
+MAX_FILES = 5
+
+
+def build_fixture(root: str, seed: int = 11) -> str:
+    """
+    Create the fixture repository and its tarball.
+
+    Args:
+        root: Directory to build in (emptied first)
+        seed: Seed for file sizes
+
+    Returns:
+        Path to the tarball (<root>/fixture.tar.gz)
+    """
+    shutil.rmtree(root, ignore_errors=True)
+    repo = os.path.join(root, 'repo')
+    rng = random.Random(seed)
+
+    def write(path: str, content) -> None:
+        path = os.path.join(repo, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content if isinstance(content, bytes) else content.encode('utf-8'))
+
+    for i in range(40):
+        extension = ('.py', '.js', '.go', '.rs', '.java')[i % 5]
+        lines = rng.randint(5, 400)
+        write(f'src/pkg{i % 4}/module{i}{extension}', f'value_{i} = compute({i})  # é\n' * lines)
+    write('src/app.min.js', 'var a=1;' * 5000)
+    write('src/generated/schema_pb2.py', 'x = 1\n' * 3000)
+    write('tests/test_big.py', 'assert True\n' * 3000)
+    write('vendor/lib/huge.go', 'package lib\n' * 3000)
+    write('node_modules/left-pad/index.js', 'module.exports = 1\n' * 3000)
+    write('assets/logo.png', bytes(range(256)) * 64)
+    write('README.md', '# Fixture\n')
+
+    write('requirements.txt', 'requests==2.31.0\nflask>=2.0  # web\n-r dev.txt\n')
+    write('pyproject.toml', '[project]\nname = "fixture"\ndependencies = ["click>=8", "requests>=1"]\n')
+    write('package.json', json.dumps({'dependencies': {'react': '^18.2.0'}, 'devDependencies': {'jest': '^29'}}))
+    for name in ('web', 'api'):
+        write(f'packages/{name}/package.json', json.dumps({'dependencies': {'lodash': '^4.17.21'}}))
+    write('services/go.mod', 'module example.com/svc\n\nrequire github.com/pkg/errors v0.9.1\n')
+    write('services/Cargo.toml', '[dependencies]\nserde = "1.0"\n')
+    write('java/build.gradle', "dependencies {\n    implementation 'org.slf4j:slf4j-api:2.0.9'\n}\n")
+    write('node_modules/left-pad/package.json', json.dumps({'dependencies': {'not-a-dependency': '1'}}))
+    write('tests/fixtures/requirements.txt', 'fixture-only==1.0\n')
+
+    git = ['git', '-c', 'user.name=Fixture', '-c', 'user.email=fixture@example.com']
+    subprocess.run(['git', 'init', '-q', '-b', 'main', repo], check=True)
+    subprocess.run(git + ['add', '-A'], cwd=repo, check=True)
+    subprocess.run(git + ['commit', '-q', '-m', 'Fixture'], cwd=repo, check=True)
+    # Blobless clones over file:// need the server side to allow filters
+    subprocess.run(['git', 'config', 'uploadpack.allowFilter', 'true'], cwd=repo, check=True)
+
+    tarball = os.path.join(root, 'fixture.tar.gz')
+    subprocess.run(
+        ['git', 'archive', '--format=tar.gz', '--prefix=fixture-main/', '-o', tarball, 'HEAD'],
+        cwd=repo, check=True
+    )
+    return tarball
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=os.path.join(tempfile.gettempdir(), 'reporank_tarball_fixture'),
+                        help='Where the fixture repository and tarball are built')
+    parser.add_argument('--clone-strategy', default='blobless', choices=('blobless', 'full'),
+                        help='Clone strategy of the reference path')
+    parser.add_argument('--keep', action='store_true', help='Keep the fixture after the check')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    tarball = build_fixture(args.dir)
+    analyzer = RepositoryAnalyzer(temp_dir=os.path.join(args.dir, 'work'), clone_strategy=args.clone_strategy)
+
+    with open(tarball, 'rb') as stream:
+        snapshot = analyzer.analyze_tarball(stream, max_files=MAX_FILES)
+    tarball_results = {
+        'extension_counts': snapshot.extension_counts,
+        'selected_files': snapshot.selected_files,
+        'code_samples': snapshot.code_samples,
+        'dependencies': snapshot.dependencies,
+    }
+
+    repo_path = analyzer.clone_repository('file://' + os.path.join(args.dir, 'repo'))
+    try:
+        selected = analyzer.select_files_for_analysis(repo_path, max_files=MAX_FILES)
+        clone_results = {
+            'extension_counts': analyzer.analyze_file_extensions(repo_path),
+            'selected_files': selected,
+            'code_samples': analyzer.read_file_contents(repo_path, selected),
+            'dependencies': analyzer.extract_dependencies(repo_path),
+        }
+    finally:
+        analyzer.cleanup(repo_path)
+
+    print(f"Fixture: {snapshot.files} files, {tarball} ({args.clone_strategy} clone as reference)")
+    mismatches = 0
+    for name, expected in clone_results.items():
+        actual = tarball_results[name]
+        status = 'ok' if actual == expected else 'MISMATCH'
+        mismatches += actual != expected
+        print(f"  {name:<17} {len(expected):4d} entries  {status}")
+        if actual != expected:
+            print(f"    clone:   {expected}\n    tarball: {actual}")
+
+    if not args.keep:
+        shutil.rmtree(args.dir, ignore_errors=True)
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,7 +2,7 @@
 
 import os
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 @dataclass
@@ -20,10 +20,48 @@ class Config:
     
     # GitHub API (token is optional for public repos)
     github_token: Optional[str] = None
+    github_tokens: list = field(default_factory=list)  # Pool rotated by headroom
     github_api_base_url: str = "https://api.github.com"
     api_timeout: int = 30
     max_retries: int = 3
     require_authentication: bool = False  # Set to True only for private repos
+    rate_limit_reserve_fraction: float = 0.1  # Pace requests once below this share of the limit
+    rate_limit_max_wait: int = 900  # Max seconds to wait for rate-limit headroom
+    stats_poll_deadline: int = 60  # Seconds to re-poll stats endpoints answering 202
+    readme_max_kb: int = 256  # README bytes downloaded for scoring (0 = no cap)
+    api_concurrency: int = 6  # Concurrent API requests per repository (1 = sequential)
+    # Metadata backend: "rest" (one call per endpoint) or "graphql" (single query,
+    # requires github_token; falls back to REST without one)
+    acquisition_backend: str = "rest"
+    
+    # Fleet mode (main.py --batch): repositories processed at once, and processes
+    # for the analysis step (0 = run it on the worker threads)
+    batch_workers: int = 4
+    batch_analysis_processes: int = 0
+    
+    # Stage checkpoints for --resume (one JSON file per repository and run)
+    checkpoint_enabled: bool = True
+    checkpoint_dir: Optional[str] = None  # Defaults to <temp_dir>/checkpoints
+    
+    # Incremental re-ranking: reuse the last ranking of repositories whose
+    # pushed_at and HEAD SHA did not change
+    incremental_enabled: bool = False
+    state_dir: Optional[str] = None  # Defaults to <temp_dir>/ranking_state
+    
+    # HTTP response cache (ETag/Last-Modified revalidation, 304s are free)
+    http_cache_enabled: bool = True
+    http_cache_dir: Optional[str] = None  # Defaults to <temp_dir>/http_cache
+    http_cache_max_mb: int = 100
+    # Per-endpoint TTL overrides in seconds, merged onto http_cache.DEFAULT_TTLS
+    # e.g. {'/stats/': 3600} - the longest matching endpoint fragment wins
+    http_cache_ttls: dict = field(default_factory=dict)
+    
+    # Record/replay cassette for offline and load-test runs (disables the HTTP cache)
+    cassette_path: Optional[str] = None
+    cassette_mode: str = "replay"  # "record" or "replay"
+    cassette_latency: Optional[float] = None  # Replay delay per request; None = recorded latency
+    cassette_faults: str = ""  # Injected faults on replay, e.g. "202:0.2,403:0.01,502:0.05"
+    cassette_seed: int = 0  # Seed making injected faults reproducible
     
     # LLM Configuration - CENTRAL MODEL CONFIGURATION
     # Change this to use a different model across the entire system
@@ -46,10 +84,39 @@ class Config:
     log_level: str = "INFO"
     log_file: Optional[str] = "reporank.log"
     enable_structured_logging: bool = True
+    # GitHub API request metrics snapshot written at exit (.prom = Prometheus text, else JSON)
+    metrics_file: Optional[str] = None
     
     # Analysis
     enable_local_clone: bool = True
     clone_timeout: int = 300
+    # Clone strategy: "blobless" (commits and trees, plus only the blobs of the
+    # files local analysis reads) or "full" (every blob of the history)
+    clone_strategy: str = "blobless"
+    # Bare mirrors of cloned repositories kept between runs: later clones of the
+    # same repository only fetch new commits. Least recently used mirrors are
+    # evicted above clone_cache_max_mb
+    clone_cache_enabled: bool = True
+    clone_cache_dir: Optional[str] = None  # Defaults to <temp_dir>/mirrors
+    clone_cache_max_mb: int = 2048
+    # Processes counting lines for file selection; batches of 32 MB or more are
+    # split across them by size (0 = count in the analysis thread)
+    line_count_processes: int = 0
+    # Per-file facts (line counts, languages, parsed manifests) kept between runs
+    # by git blob SHA, so unchanged files are never recounted or reparsed. Least
+    # recently used rows are evicted above blob_cache_max_entries
+    blob_cache_enabled: bool = True
+    blob_cache_path: Optional[str] = None  # Defaults to <temp_dir>/blob_cache.sqlite
+    blob_cache_max_entries: int = 1000000
+    # Local analysis source: "clone" (git clone to disk, includes git history) or
+    # "tarball" (stream the default-branch tarball, nothing written to disk)
+    local_analysis: str = "clone"
+    # Time budgets: seconds for one repository's acquisition and analysis (0 = no
+    # deadline), and per-stage budgets by stage or analysis step name, e.g.
+    # {'clone': 120, 'select_files': 30, 'llm_evaluation': 90}. Stages out of time
+    # degrade (API-only, sampled walks, skipped LLM steps) instead of blocking
+    analysis_deadline: int = 0
+    stage_budgets: dict = field(default_factory=dict)
     max_repo_size_mb: int = 500
     max_files_for_analysis: int = 5
     
@@ -73,6 +140,7 @@ class Config:
         
         Environment variables:
         - GITHUB_TOKEN: Optional GitHub API token for higher rate limits
+        - GITHUB_TOKENS: Optional comma-separated token pool for fleet runs
         - GEMINI_API_KEY: API key for Gemini models (if using Gemini)
         - OPENAI_API_KEY: API key for OpenAI models (if using OpenAI)
         - ANTHROPIC_API_KEY: API key for Anthropic models (if using Claude)
@@ -80,10 +148,40 @@ class Config:
         - REPORANK_OUTPUT_DIR: Output directory for reports
         - REPORANK_LOG_LEVEL: Logging level (DEBUG, INFO, WARNING, ERROR)
         - REPORANK_LOG_FILE: Log file path (optional, omit for no file logging)
+        - REPORANK_METRICS_FILE: API metrics snapshot path (.prom for Prometheus, else JSON)
         - REPORANK_TEMP_DIR: Temporary directory for cloning repositories
         - REPORANK_ENABLE_LOCAL_CLONE: Enable/disable local repository cloning (true/false)
         - REPORANK_CLONE_TIMEOUT: Timeout for repository cloning in seconds
+        - REPORANK_CLONE_STRATEGY: Clone strategy ("blobless" or "full")
+        - REPORANK_CLONE_CACHE: Enable/disable the mirror cache of cloned repositories (true/false)
+        - REPORANK_CLONE_CACHE_DIR: Directory for cached repository mirrors
+        - REPORANK_CLONE_CACHE_MAX_MB: Disk usage in MB above which mirrors are evicted
+        - REPORANK_LINE_COUNT_PROCESSES: Processes for line counting (0 = in-process)
+        - REPORANK_BLOB_CACHE: Enable/disable the per-file blob cache (true/false)
+        - REPORANK_BLOB_CACHE_PATH: SQLite file of the blob cache
+        - REPORANK_BLOB_CACHE_MAX_ENTRIES: Files kept in the blob cache before eviction
+        - REPORANK_LOCAL_ANALYSIS: Local analysis source ("clone" or "tarball")
+        - REPORANK_ANALYSIS_DEADLINE: Seconds allowed per repository (0 = no deadline)
+        - REPORANK_STAGE_BUDGETS: Per-stage budgets in seconds ("clone=120,llm_evaluation=90")
         - REPORANK_MAX_REPO_SIZE_MB: Maximum repository size in MB
+        - REPORANK_API_CONCURRENCY: Concurrent GitHub API requests per repository
+        - REPORANK_STATS_POLL_DEADLINE: Seconds to wait for GitHub to compute repository stats
+        - REPORANK_README_MAX_KB: Maximum README size downloaded in KB (0 = no cap)
+        - REPORANK_ACQUISITION_BACKEND: Metadata backend ("rest" or "graphql")
+        - REPORANK_BATCH_WORKERS: Repositories analyzed at once in --batch mode
+        - REPORANK_BATCH_ANALYSIS_PROCESSES: Processes for the analysis step in --batch mode
+        - REPORANK_CHECKPOINTS: Enable/disable stage checkpoints for --resume (true/false)
+        - REPORANK_CHECKPOINT_DIR: Directory for stage checkpoints
+        - REPORANK_INCREMENTAL: Reuse earlier rankings of unchanged repositories (true/false)
+        - REPORANK_STATE_DIR: Directory for the last ranking of each repository
+        - REPORANK_HTTP_CACHE: Enable/disable the GitHub API response cache (true/false)
+        - REPORANK_HTTP_CACHE_DIR: Directory for cached API responses
+        - REPORANK_HTTP_CACHE_MAX_MB: Maximum size of the response cache in MB
+        - REPORANK_CASSETTE: Cassette file to record to or replay from
+        - REPORANK_CASSETTE_MODE: Cassette mode ("record" or "replay")
+        - REPORANK_CASSETTE_LATENCY: Replay delay per request in seconds (default: recorded)
+        - REPORANK_CASSETTE_FAULTS: Faults injected on replay ("status:rate,...")
+        - REPORANK_CASSETTE_SEED: Seed for injected faults
         """
         # Determine LLM model and API key
         llm_model = os.getenv("REPORANK_LLM_MODEL", "gemini/gemini-2.0-flash")
@@ -99,14 +197,29 @@ class Config:
         
         # Parse boolean environment variables
         enable_local_clone = os.getenv("REPORANK_ENABLE_LOCAL_CLONE", "true").lower() in ("true", "1", "yes")
+        http_cache_enabled = os.getenv("REPORANK_HTTP_CACHE", "true").lower() in ("true", "1", "yes")
+        checkpoint_enabled = os.getenv("REPORANK_CHECKPOINTS", "true").lower() in ("true", "1", "yes")
+        incremental_enabled = os.getenv("REPORANK_INCREMENTAL", "false").lower() in ("true", "1", "yes")
+        clone_cache_enabled = os.getenv("REPORANK_CLONE_CACHE", "true").lower() in ("true", "1", "yes")
+        blob_cache_enabled = os.getenv("REPORANK_BLOB_CACHE", "true").lower() in ("true", "1", "yes")
         
         # Parse log file (None if empty string)
         log_file = os.getenv("REPORANK_LOG_FILE", "reporank.log")
         if not log_file or log_file.lower() == "none":
             log_file = None
         
+        cassette_latency = os.getenv("REPORANK_CASSETTE_LATENCY")
+        
+        # Parse stage budgets ("name=seconds,...")
+        stage_budgets = {}
+        for item in os.getenv("REPORANK_STAGE_BUDGETS", "").split(","):
+            if item.strip():
+                name, _, seconds = item.partition("=")
+                stage_budgets[name.strip()] = float(seconds)
+        
         return cls(
             github_token=os.getenv("GITHUB_TOKEN"),
+            github_tokens=[t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()],
             llm_model=llm_model,
             llm_api_key=llm_api_key,
             llm_temperature=float(os.getenv("REPORANK_LLM_TEMPERATURE", "0.7")),
@@ -115,11 +228,89 @@ class Config:
             log_level=os.getenv("REPORANK_LOG_LEVEL", "INFO"),
             log_file=log_file,
             temp_dir=os.getenv("REPORANK_TEMP_DIR", "/tmp/reporank"),
+            metrics_file=os.getenv("REPORANK_METRICS_FILE") or None,
             enable_local_clone=enable_local_clone,
             clone_timeout=int(os.getenv("REPORANK_CLONE_TIMEOUT", "300")),
+            clone_strategy=os.getenv("REPORANK_CLONE_STRATEGY", "blobless").lower(),
+            clone_cache_enabled=clone_cache_enabled,
+            clone_cache_dir=os.getenv("REPORANK_CLONE_CACHE_DIR") or None,
+            clone_cache_max_mb=int(os.getenv("REPORANK_CLONE_CACHE_MAX_MB", "2048")),
+            line_count_processes=int(os.getenv("REPORANK_LINE_COUNT_PROCESSES", "0")),
+            blob_cache_enabled=blob_cache_enabled,
+            blob_cache_path=os.getenv("REPORANK_BLOB_CACHE_PATH") or None,
+            blob_cache_max_entries=int(os.getenv("REPORANK_BLOB_CACHE_MAX_ENTRIES", "1000000")),
+            local_analysis=os.getenv("REPORANK_LOCAL_ANALYSIS", "clone").lower(),
+            analysis_deadline=int(os.getenv("REPORANK_ANALYSIS_DEADLINE", "0")),
+            stage_budgets=stage_budgets,
             max_repo_size_mb=int(os.getenv("REPORANK_MAX_REPO_SIZE_MB", "500")),
+            api_concurrency=int(os.getenv("REPORANK_API_CONCURRENCY", "6")),
+            stats_poll_deadline=int(os.getenv("REPORANK_STATS_POLL_DEADLINE", "60")),
+            readme_max_kb=int(os.getenv("REPORANK_README_MAX_KB", "256")),
+            acquisition_backend=os.getenv("REPORANK_ACQUISITION_BACKEND", "rest").lower(),
+            batch_workers=int(os.getenv("REPORANK_BATCH_WORKERS", "4")),
+            batch_analysis_processes=int(os.getenv("REPORANK_BATCH_ANALYSIS_PROCESSES", "0")),
+            checkpoint_enabled=checkpoint_enabled,
+            checkpoint_dir=os.getenv("REPORANK_CHECKPOINT_DIR") or None,
+            incremental_enabled=incremental_enabled,
+            state_dir=os.getenv("REPORANK_STATE_DIR") or None,
+            http_cache_enabled=http_cache_enabled,
+            http_cache_dir=os.getenv("REPORANK_HTTP_CACHE_DIR") or None,
+            http_cache_max_mb=int(os.getenv("REPORANK_HTTP_CACHE_MAX_MB", "100")),
+            cassette_path=os.getenv("REPORANK_CASSETTE") or None,
+            cassette_mode=os.getenv("REPORANK_CASSETTE_MODE", "replay").lower(),
+            cassette_latency=float(cassette_latency) if cassette_latency else None,
+            cassette_faults=os.getenv("REPORANK_CASSETTE_FAULTS", ""),
+            cassette_seed=int(os.getenv("REPORANK_CASSETTE_SEED", "0")),
         )
     
+    def get_github_tokens(self) -> List[str]:
+        """
+        Get the pool of GitHub tokens to rotate across.
+        
+        Returns:
+            github_tokens plus github_token (deduplicated), possibly empty
+        """
+        tokens = list(self.github_tokens)
+        if self.github_token and self.github_token not in tokens:
+            tokens.insert(0, self.github_token)
+        return tokens
+    
+    def get_checkpoint_dir(self) -> str:
+        """
+        Get the directory holding stage checkpoints.
+        
+        Returns:
+            checkpoint_dir, or <temp_dir>/checkpoints if unset
+        """
+        return self.checkpoint_dir or os.path.join(self.temp_dir, "checkpoints")
+    
+    def get_state_dir(self) -> str:
+        """
+        Get the directory holding the last ranking of each repository.
+        
+        Returns:
+            state_dir, or <temp_dir>/ranking_state if unset
+        """
+        return self.state_dir or os.path.join(self.temp_dir, "ranking_state")
+    
+    def get_clone_cache_dir(self) -> str:
+        """
+        Get the directory holding cached repository mirrors.
+        
+        Returns:
+            clone_cache_dir, or <temp_dir>/mirrors if unset
+        """
+        return self.clone_cache_dir or os.path.join(self.temp_dir, "mirrors")
+    
+    def get_blob_cache_path(self) -> str:
+        """
+        Get the SQLite file of the per-file blob cache.
+        
+        Returns:
+            blob_cache_path, or <temp_dir>/blob_cache.sqlite if unset
+        """
+        return self.blob_cache_path or os.path.join(self.temp_dir, "blob_cache.sqlite")
+    
     def get_llm_api_key(self) -> Optional[str]:
         """
         Get the appropriate API key for the configured LLM model.
@@ -164,10 +355,70 @@ class Config:
         if self.clone_timeout < 1:
             return False, f"Clone timeout must be positive, got {self.clone_timeout}"
         
+        if self.clone_strategy not in ("blobless", "full"):
+            return False, f"Clone strategy must be 'blobless' or 'full', got '{self.clone_strategy}'"
+        
+        if self.clone_cache_enabled and self.clone_cache_max_mb < 1:
+            return False, f"Clone cache size must be positive, got {self.clone_cache_max_mb}"
+        
+        if self.line_count_processes < 0:
+            return False, f"Line count processes cannot be negative, got {self.line_count_processes}"
+        
+        if self.blob_cache_enabled and self.blob_cache_max_entries < 1:
+            return False, f"Blob cache entries must be positive, got {self.blob_cache_max_entries}"
+        
+        # Validate local analysis source
+        if self.local_analysis not in ("clone", "tarball"):
+            return False, f"Local analysis must be 'clone' or 'tarball', got '{self.local_analysis}'"
+        
+        # Validate time budgets
+        if self.analysis_deadline < 0:
+            return False, f"Analysis deadline cannot be negative, got {self.analysis_deadline}"
+        
+        for name, seconds in self.stage_budgets.items():
+            if seconds <= 0:
+                return False, f"Stage budget for '{name}' must be positive, got {seconds}"
+        
         # Validate max repo size
         if self.max_repo_size_mb < 1:
             return False, f"Max repo size must be positive, got {self.max_repo_size_mb}"
         
+        # Validate rate-limit pacing
+        if not 0.0 <= self.rate_limit_reserve_fraction < 1.0:
+            return False, f"Rate limit reserve fraction must be in [0, 1), got {self.rate_limit_reserve_fraction}"
+        
+        # Validate API concurrency
+        if self.api_concurrency < 1:
+            return False, f"API concurrency must be positive, got {self.api_concurrency}"
+        
+        if self.stats_poll_deadline < 0:
+            return False, f"Stats poll deadline cannot be negative, got {self.stats_poll_deadline}"
+        
+        if self.readme_max_kb < 0:
+            return False, f"README size cap cannot be negative, got {self.readme_max_kb}"
+        
+        # Validate acquisition backend
+        if self.acquisition_backend not in ("rest", "graphql"):
+            return False, f"Acquisition backend must be 'rest' or 'graphql', got '{self.acquisition_backend}'"
+        
+        # Validate fleet mode pools
+        if self.batch_workers < 1:
+            return False, f"Batch workers must be positive, got {self.batch_workers}"
+        
+        if self.batch_analysis_processes < 0:
+            return False, f"Batch analysis processes cannot be negative, got {self.batch_analysis_processes}"
+        
+        # Validate response cache size
+        if self.http_cache_enabled and self.http_cache_max_mb < 1:
+            return False, f"HTTP cache size must be positive, got {self.http_cache_max_mb}"
+        
+        # Validate cassette settings
+        if self.cassette_path:
+            if self.cassette_mode not in ("record", "replay"):
+                return False, f"Cassette mode must be 'record' or 'replay', got '{self.cassette_mode}'"
+            if self.cassette_mode == "replay" and not os.path.exists(self.cassette_path):
+                return False, f"Cassette file not found: {self.cassette_path}"
+        
         return True, None
     
     def to_dict(self) -> Dict[str, Any]:
@@ -181,20 +432,50 @@ class Config:
             "github_api_base_url": self.github_api_base_url,
             "api_timeout": self.api_timeout,
             "max_retries": self.max_retries,
+            "api_concurrency": self.api_concurrency,
+            "stats_poll_deadline": self.stats_poll_deadline,
+            "readme_max_kb": self.readme_max_kb,
+            "rate_limit_reserve_fraction": self.rate_limit_reserve_fraction,
+            "rate_limit_max_wait": self.rate_limit_max_wait,
+            "acquisition_backend": self.acquisition_backend,
+            "batch_workers": self.batch_workers,
+            "batch_analysis_processes": self.batch_analysis_processes,
+            "checkpoint_enabled": self.checkpoint_enabled,
+            "checkpoint_dir": self.get_checkpoint_dir(),
+            "incremental_enabled": self.incremental_enabled,
+            "state_dir": self.get_state_dir(),
             "llm_model": self.llm_model,
             "llm_temperature": self.llm_temperature,
             "llm_max_tokens": self.llm_max_tokens,
             "temp_dir": self.temp_dir,
             "output_dir": self.output_dir,
             "log_level": self.log_level,
+            "metrics_file": self.metrics_file,
             "enable_local_clone": self.enable_local_clone,
             "clone_timeout": self.clone_timeout,
+            "clone_strategy": self.clone_strategy,
+            "clone_cache_enabled": self.clone_cache_enabled,
+            "clone_cache_dir": self.get_clone_cache_dir(),
+            "clone_cache_max_mb": self.clone_cache_max_mb,
+            "line_count_processes": self.line_count_processes,
+            "blob_cache_enabled": self.blob_cache_enabled,
+            "blob_cache_path": self.get_blob_cache_path(),
+            "blob_cache_max_entries": self.blob_cache_max_entries,
+            "local_analysis": self.local_analysis,
+            "analysis_deadline": self.analysis_deadline,
+            "stage_budgets": self.stage_budgets,
             "max_repo_size_mb": self.max_repo_size_mb,
             "max_files_for_analysis": self.max_files_for_analysis,
+            "http_cache_enabled": self.http_cache_enabled,
+            "http_cache_max_mb": self.http_cache_max_mb,
+            "cassette_path": self.cassette_path,
+            "cassette_mode": self.cassette_mode,
+            "cassette_faults": self.cassette_faults,
         }
         
         # Add flags for sensitive data (but not the actual values)
         config_dict["has_github_token"] = bool(self.github_token)
+        config_dict["github_token_count"] = len(self.get_github_tokens())
         config_dict["has_llm_api_key"] = bool(self.get_llm_api_key())
         
         return config_dict
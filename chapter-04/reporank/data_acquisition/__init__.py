@@ -1,7 +1,17 @@
 """Data acquisition module for fetching repository data."""
 
 from .github_client import GitHubClient
+from .async_github_client import AsyncGitHubClient
+from .file_index import FileIndex
+from .git_analytics import GitAnalytics
+from .telemetry import RequestMetrics
 from .repo_analyzer import RepositoryAnalyzer
+from .mirror_cache import MirrorCache
+from .blob_cache import BlobCache
+from .deadline import Deadline
+from .checkpoint import CheckpointStore
+from .incremental import RankingStateStore
 from .acquisition_pipeline import AcquisitionPipeline
 
-__all__ = ['GitHubClient', 'RepositoryAnalyzer', 'AcquisitionPipeline']
+__all__ = ['GitHubClient', 'AsyncGitHubClient', 'FileIndex', 'GitAnalytics', 'RequestMetrics', 'RepositoryAnalyzer',
+           'MirrorCache', 'BlobCache', 'Deadline', 'CheckpointStore', 'RankingStateStore', 'AcquisitionPipeline']
@@ -1,17 +1,37 @@
 """Data acquisition pipeline for orchestrating repository data collection."""
 
+import asyncio
 import re
-from typing import Tuple, Optional
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from typing import Any, Collection, Dict, List, Tuple, Optional
 from datetime import datetime
 
 from models.repository_data import RepositoryData
 from data_acquisition.github_client import GitHubClient, GitHubAPIError
+from data_acquisition.async_github_client import AsyncGitHubClient
 from data_acquisition.repo_analyzer import RepositoryAnalyzer
+from data_acquisition.checkpoint import RepositoryCheckpoint
+from data_acquisition.deadline import DeadlineExceeded, current_deadline, deadline_scope, record_degradation
+from data_acquisition.incremental import CHANGED, NEW, UNCHANGED, RankingStateStore
+from data_acquisition.stage_executor import Stage, StageExecutor
 from utils.logger import get_logger
 
 
 logger = get_logger(__name__)
 
+# Stages whose data comes from the metadata fetch, named like its result keys
+METADATA_STAGES = ('repository_info', 'commit_activity', 'contributors', 'languages', 'readme', 'security_files')
+
+# RepositoryData fields set from /repos/{owner}/{repo}
+REPOSITORY_INFO_FIELDS = (
+    'description', 'created_date', 'last_updated', 'default_branch',
+    'primary_language', 'stars', 'forks', 'license', 'pushed_at'
+)
+
+# Repository info fields that decide between METADATA_CHANGED and UNCHANGED
+# (updated_at moves with every star, so it is not compared)
+RANKED_METADATA_FIELDS = ('description', 'primary_language', 'stars', 'forks', 'license', 'default_branch')
+
 
 class AcquisitionPipeline:
     """
@@ -24,7 +44,14 @@ class AcquisitionPipeline:
     def __init__(
         self,
         github_client: GitHubClient,
-        repo_analyzer: RepositoryAnalyzer
+        repo_analyzer: RepositoryAnalyzer,
+        max_concurrency: int = 6,
+        backend: str = "rest",
+        stats_deadline: float = 60.0,
+        max_stage_workers: int = 6,
+        state_store: Optional[RankingStateStore] = None,
+        stage_budgets: Optional[Dict[str, float]] = None,
+        local_analysis: str = "clone"
     ):
         """
         Initialize acquisition pipeline.
@@ -32,9 +59,36 @@ class AcquisitionPipeline:
         Args:
             github_client: GitHub API client instance
             repo_analyzer: Repository analyzer instance
+            max_concurrency: Maximum concurrent API requests (1 disables fan-out)
+            backend: Metadata backend, "rest" or "graphql"
+            stats_deadline: Seconds to keep polling GitHub stats that answer 202
+            max_stage_workers: Maximum number of pipeline stages running at once
+            state_store: Optional store of earlier rankings; enables incremental
+                re-ranking (see execute())
+            stage_budgets: Optional seconds allowed per stage, by stage name
+                (see execute())
+            local_analysis: "clone" to clone the repository for local analysis,
+                or "tarball" to stream its tarball instead (see build_stages())
         """
         self.github_client = github_client
         self.repo_analyzer = repo_analyzer
+        self.backend = backend
+        self.stats_deadline = stats_deadline
+        self.max_stage_workers = max_stage_workers
+        self.state_store = state_store
+        self.stage_budgets = dict(stage_budgets or {})
+        self.local_analysis = local_analysis
+        self.async_client = (
+            AsyncGitHubClient(github_client, max_concurrency=max_concurrency)
+            if max_concurrency > 1 else None
+        )
+    
+    def close(self) -> None:
+        """Shut down the worker pools of the API clients and close their HTTP session."""
+        if self.async_client is not None:
+            self.async_client.close()
+            self.async_client = None
+        self.github_client.close()
     
     @staticmethod
     def parse_github_url(url: str) -> Tuple[str, str]:
@@ -82,22 +136,223 @@ class AcquisitionPipeline:
             "Expected formats: 'https://github.com/owner/repo', 'github.com/owner/repo', or 'owner/repo'"
         )
     
-    def execute(self, github_url: str) -> RepositoryData:
+    def fetch_metadata(
+        self,
+        owner: str,
+        repo_name: str,
+        include_commit_activity: bool = True,
+        keys: Optional[Collection[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch the GitHub API data for stages 2-7.
+        
+        With an async client the requests run concurrently, so the wall-clock
+        cost is roughly that of the slowest call; otherwise they run in order.
+        
+        Args:
+            owner: Repository owner
+            repo_name: Repository name
+            include_commit_activity: Set False when the stats are requested
+                separately via GitHubClient.request_commit_activity()
+            keys: Only fetch these results (REST backend), e.g. when the
+                other stages are restored; None fetches everything
+            
+        Returns:
+            Dictionary mapping stage keys to results or the raised exception
+        """
+        if self.backend == "graphql":
+            if self.github_client.token:
+                try:
+                    return self._fetch_metadata_graphql(owner, repo_name)
+                except GitHubAPIError as e:
+                    logger.warning(f"⚠ GraphQL acquisition failed, falling back to REST: {e}")
+            else:
+                logger.warning("⚠ GraphQL backend requires a GitHub token, falling back to REST")
+        
+        if self.async_client is not None and keys is None:
+            logger.info(
+                f"Fetching API metadata concurrently "
+                f"(max {self.async_client.max_concurrency} requests in flight)"
+            )
+            return asyncio.run(self.async_client.gather_repository_metadata(
+                owner, repo_name, include_commit_activity=include_commit_activity
+            ))
+        
+        calls = {
+            'repository_info': self.github_client.get_repository_info,
+            'contributors': self.github_client.count_contributors,
+            'languages': self.github_client.get_languages,
+            'readme': self.github_client.get_readme_content,
+            'security_files': self.github_client.check_security_files,
+        }
+        if include_commit_activity:
+            calls['commit_activity'] = self.github_client.get_commit_activity
+        if keys is not None:
+            calls = {key: method for key, method in calls.items() if key in keys}
+        results: Dict[str, Any] = {}
+        for key, method in calls.items():
+            try:
+                results[key] = method(owner, repo_name)
+            except Exception as e:
+                results[key] = e
+        return results
+    
+    def _fetch_metadata_graphql(self, owner: str, repo_name: str) -> Dict[str, Any]:
+        """
+        Fetch stage 2-7 data with one GraphQL query plus the contributor count.
+        
+        Args:
+            owner: Repository owner
+            repo_name: Repository name
+            
+        Returns:
+            Dictionary shaped like fetch_metadata() output
+            
+        Raises:
+            GitHubAPIError: If the GraphQL query fails
+        """
+        logger.info("Fetching API metadata via GraphQL")
+        metadata: Dict[str, Any] = self.github_client.get_repository_snapshot(owner, repo_name)
+        try:
+            metadata['contributors'] = self.github_client.count_contributors(owner, repo_name)
+        except Exception as e:
+            metadata['contributors'] = e
+        return metadata
+    
+    def _resolve_stats(self, stats_future: Future) -> Dict[str, Any]:
+        """
+        Wait for deferred commit stats, bounded by the polling deadline and
+        the current deadline.
+        
+        Raises:
+            GitHubAPIError: If the stats request failed or did not finish in time
+        """
+        if not stats_future.done():
+            logger.info("Waiting for commit stats still being polled in the background")
+        timeout = self.stats_deadline + self.github_client.timeout
+        try:
+            deadline = current_deadline()
+            if deadline is not None:
+                timeout = deadline.timeout(timeout)
+            return stats_future.result(timeout=timeout)
+        except (FuturesTimeoutError, DeadlineExceeded) as e:
+            # A poll still queued behind other repositories' polls would only spend requests
+            stats_future.cancel()
+            raise GitHubAPIError("Timed out waiting for commit statistics") from e
+    
+    @staticmethod
+    def _stage_result(metadata: Dict[str, Any], key: str) -> Any:
+        """Return a fetched result, re-raising the exception if the call failed."""
+        result = metadata[key]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+    
+    @staticmethod
+    def _apply_repository_info(repo_data: RepositoryData, repo_info: Dict[str, Any]) -> None:
+        """Populate metadata fields from a /repos/{owner}/{repo} response."""
+        repo_data.description = repo_info.get('description', '') or ''
+        repo_data.created_date = repo_info.get('created_at', '')
+        repo_data.last_updated = repo_info.get('updated_at', '')
+        repo_data.default_branch = repo_info.get('default_branch', 'main')
+        repo_data.primary_language = repo_info.get('language', '') or ''
+        repo_data.stars = repo_info.get('stargazers_count', 0)
+        repo_data.forks = repo_info.get('forks_count', 0)
+        repo_data.license = repo_info.get('license', {}).get('name', '') if repo_info.get('license') else ''
+        repo_data.pushed_at = repo_info.get('pushed_at', '') or ''
+    
+    @staticmethod
+    def _apply_commit_activity(repo_data: RepositoryData, commit_data: Dict[str, Any]) -> None:
+        """Populate commit fields from get_commit_activity() output."""
+        repo_data.total_commits = commit_data.get('total_commits', 0)
+        
+        # Process weekly commit activity into monthly
+        commit_activity = commit_data.get('commit_activity', [])
+        if commit_activity:
+            # Get the most recent commit timestamp
+            # commit_activity is a list of weeks with 'week' (timestamp) and 'total' (commits)
+            latest_week = max(commit_activity, key=lambda x: x.get('week', 0))
+            repo_data.last_commit = datetime.fromtimestamp(
+                latest_week.get('week', 0)
+            ).isoformat() if latest_week.get('week') else ''
+            
+            # Aggregate weekly data into monthly
+            monthly_commits = {}
+            for week_data in commit_activity:
+                week_timestamp = week_data.get('week', 0)
+                if week_timestamp:
+                    month_key = datetime.fromtimestamp(week_timestamp).strftime('%Y-%m')
+                    monthly_commits[month_key] = monthly_commits.get(month_key, 0) + week_data.get('total', 0)
+            
+            repo_data.monthly_commits = monthly_commits
+        
+        # The GraphQL backend reports monthly counts and the last commit directly
+        if commit_data.get('monthly_commits'):
+            repo_data.monthly_commits = commit_data['monthly_commits']
+        if commit_data.get('last_commit'):
+            repo_data.last_commit = commit_data['last_commit']
+    
+    @staticmethod
+    def _apply_languages(repo_data: RepositoryData, languages: Dict[str, int]) -> None:
+        """Convert language byte counts into a percentage breakdown."""
+        if languages:
+            total_bytes = sum(languages.values())
+            repo_data.language_breakdown = {
+                lang: round((bytes_count / total_bytes) * 100, 2)
+                for lang, bytes_count in languages.items()
+            }
+    
+    def execute(
+        self,
+        github_url: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        checkpoint: Optional[RepositoryCheckpoint] = None
+    ) -> RepositoryData:
         """
         Execute the complete data acquisition workflow.
         
         Stages:
         1. Parse GitHub URL
         2. Fetch repository metadata from GitHub API
-        3. Fetch commit activity and contributors
-        4. Clone repository for local analysis
-        5. Analyze file extensions and structure
-        6. Select representative files for quality analysis
-        7. Extract dependencies
-        8. Populate Repository Data Model
+        3. Fetch commit activity
+        4. Fetch contributors
+        5. Fetch language statistics
+        6. Fetch README content
+        7. Check security files
+        8. Clone repository for local analysis (8a: git history), or
+           stream its tarball (see build_stages())
+        9. Analyze file extensions
+        10. Select and read representative files
+        11. Extract dependencies
+        12. Clean up temporary files
+        
+        Stages are run as a dependency graph (see build_stages()): the clone
+        starts right after URL parsing and overlaps the API calls, and local
+        analysis stages run side by side once the clone is available. Timings
+        and the critical path are stored in ``repo_data.stage_timings``.
+        
+        With a checkpoint, each completed stage's fields are persisted as it
+        finishes, and stages completed in an earlier attempt are restored
+        instead of run (see StageExecutor.plan_resume()).
+        
+        With a state store, the pushed_at and HEAD SHA of the last ranking are
+        compared first. If the code is unchanged, the earlier results are
+        reused and only repository info is refreshed, so no clone, local
+        analysis or other metadata calls happen; ``repo_data.change_status``
+        tells the analysis step what it may reuse (see incremental.py).
+        
+        Stages run under the caller's current deadline (see deadline.py),
+        narrowed by their entry in ``stage_budgets``. API calls, the clone and
+        filesystem walks honor it; when it runs out, the clone falls back to
+        API-only analysis and walks to partial (sampled) results. Each
+        fallback is recorded in ``repo_data.degradations``, and degraded
+        stages are not checkpointed so a resumed run retries them.
         
         Args:
             github_url: GitHub repository URL
+            metadata: Optional prefetched stage 2-7 data, e.g. one entry of
+                GitHubClient.get_repositories_bulk(); skips the metadata calls
+            checkpoint: Optional checkpoint to resume from and record to
             
         Returns:
             RepositoryData instance populated with acquired data
@@ -126,208 +381,448 @@ class AcquisitionPipeline:
             logger.error(f"✗ Failed to parse GitHub URL: {e}")
             raise
         
-        # Stage 2: Fetch repository metadata
-        logger.info("Stage 2: Fetching repository metadata from GitHub API")
+        # Incremental re-ranking: reuse everything but repository info when the code is unchanged
+        reuse = False
+        if self.state_store is not None:
+            repo_info = self._check_for_changes(repo_data)
+            if repo_data.change_status not in (NEW, CHANGED):
+                metadata = {'repository_info': repo_info}
+                reuse = True
+        
+        stages = self.build_stages(repo_data, metadata)
+        executor = StageExecutor(stages, max_workers=self.max_stage_workers)
+        reusable = {stage.name for stage in stages if stage.name != 'repository_info'} if reuse else set()
+        checkpointed = checkpoint.completed() if checkpoint is not None else set()
+        restored = executor.plan_resume(checkpointed | reusable)
+        if checkpoint is not None and restored & checkpointed:
+            checkpoint.restore(repo_data, [stage.name for stage in stages if stage.name in restored & checkpointed])
+            logger.info(f"✓ Restored {len(restored & checkpointed)} completed stages from checkpoint")
+        
+        def record(stage: Stage) -> None:
+            degraded = any(entry['stage'] == stage.name for entry in repo_data.degradations)
+            if checkpoint is not None and not degraded:
+                checkpoint.record_from(stage.name, repo_data, stage.fields)
+        
+        state: Dict[str, Any] = {'owner': owner, 'repo_name': repo_name}
+        if restored:
+            state['metadata_keys'] = {name for name in METADATA_STAGES if name not in restored}
+        report = executor.run(state, restored=restored, on_complete=record)
+        repo_data.stage_timings = report.to_dict()
+        
+        logger.info("=" * 80)
+        logger.info("Data Acquisition Pipeline Complete")
+        logger.info(f"Repository: {owner}/{repo_name}")
+        logger.info(f"Stars: {repo_data.stars}, Forks: {repo_data.forks}, Contributors: {repo_data.contributors}")
+        logger.info(f"Total Commits: {repo_data.total_commits}")
+        logger.info(f"File Extensions: {len(repo_data.file_extension_counts)}")
+        logger.info(f"Analyzed Files: {len(repo_data.analyzed_files)}")
+        logger.info(f"Dependencies: {len(repo_data.core_dependencies)}")
+        logger.info(
+            f"Wall time: {report.wall_time:.2f}s, critical path: {' -> '.join(report.critical_path)}"
+        )
+        logger.info("=" * 80)
+        
+        return repo_data
+    
+    def _check_for_changes(self, repo_data: RepositoryData) -> Optional[Dict[str, Any]]:
+        """
+        Set change_status and head_sha by comparing with the stored ranking.
+        
+        If the code did not change, the stored results are copied onto
+        repo_data. Probe failures fall back to a full run.
+        
+        Returns:
+            The /repos/{owner}/{repo} response, or None if the probe failed
+        """
+        owner, repo_name = repo_data.owner, repo_data.repo_name
+        previous = self.state_store.get(owner, repo_name)
         try:
             repo_info = self.github_client.get_repository_info(owner, repo_name)
-            
-            # Populate metadata fields
-            repo_data.description = repo_info.get('description', '') or ''
-            repo_data.created_date = repo_info.get('created_at', '')
-            repo_data.last_updated = repo_info.get('updated_at', '')
-            repo_data.default_branch = repo_info.get('default_branch', 'main')
-            repo_data.primary_language = repo_info.get('language', '') or ''
-            repo_data.stars = repo_info.get('stargazers_count', 0)
-            repo_data.forks = repo_info.get('forks_count', 0)
-            repo_data.license = repo_info.get('license', {}).get('name', '') if repo_info.get('license') else ''
-            
-            logger.info(f"✓ Successfully fetched metadata: {repo_data.stars} stars, {repo_data.forks} forks")
+            repo_data.head_sha = self.github_client.get_head_sha(
+                owner, repo_name, repo_info.get('default_branch') or 'HEAD'
+            )
         except GitHubAPIError as e:
-            logger.error(f"✗ Failed to fetch repository metadata: {e}")
-            raise
+            logger.warning(f"⚠ Failed to check {owner}/{repo_name} for changes, running in full: {e}")
+            repo_data.change_status = NEW if previous is None else CHANGED
+            return None
         
-        # Stage 3: Fetch commit activity
-        logger.info("Stage 3: Fetching commit activity")
-        try:
-            commit_data = self.github_client.get_commit_activity(owner, repo_name)
-            repo_data.total_commits = commit_data.get('total_commits', 0)
+        if previous is None:
+            repo_data.change_status = NEW
+            return repo_info
+        
+        current = RepositoryData()
+        self._apply_repository_info(current, repo_info)
+        repo_data.change_status = previous.classify(
+            current.pushed_at, repo_data.head_sha,
+            {name: getattr(current, name) for name in RANKED_METADATA_FIELDS}
+        )
+        if repo_data.change_status != CHANGED:
+            head_sha = repo_data.head_sha
+            previous.apply_to(repo_data)
+            repo_data.head_sha = head_sha
+            logger.info(
+                f"✓ {owner}/{repo_name} unchanged since {previous.ranked_at} "
+                f"(HEAD {head_sha[:12]}): reusing earlier results"
+                + ("" if repo_data.change_status == UNCHANGED else ", refreshing metadata")
+            )
+        else:
+            logger.info(f"{owner}/{repo_name} changed since {previous.ranked_at}, running in full")
+        return repo_info
+    
+    def build_stages(
+        self,
+        repo_data: RepositoryData,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> List[Stage]:
+        """
+        Describe stages 2-12 as a dependency graph.
+        
+        Each stage applies its result to ``repo_data`` (stages write disjoint
+        fields, or are ordered with ``after`` where they overlap) and passes
+        values to later stages through the executor state:
+        
+        - metadata: results of the API calls for stages 2-7
+        - repo_path: local clone, needed by stages 8a and 10-12
+        - snapshot: TarballSnapshot, used by stages 9-11 instead of a clone
+        
+        With ``local_analysis="tarball"`` stage 8 streams the default-branch
+        tarball and computes stages 9-11 on the fly, so nothing is written to
+        disk; git history (8a) then comes from the API and there is nothing
+        to clean up (12).
+        
+        Args:
+            repo_data: Repository data model being populated
+            metadata: Optional prefetched stage 2-7 data
             
-            # Process weekly commit activity into monthly
-            commit_activity = commit_data.get('commit_activity', [])
-            if commit_activity:
-                # Get the most recent commit timestamp
-                # commit_activity is a list of weeks with 'week' (timestamp) and 'total' (commits)
-                if commit_activity:
-                    latest_week = max(commit_activity, key=lambda x: x.get('week', 0))
-                    repo_data.last_commit = datetime.fromtimestamp(
-                        latest_week.get('week', 0)
-                    ).isoformat() if latest_week.get('week') else ''
-                
-                # Aggregate weekly data into monthly
-                monthly_commits = {}
-                for week_data in commit_activity:
-                    week_timestamp = week_data.get('week', 0)
-                    if week_timestamp:
-                        month_key = datetime.fromtimestamp(week_timestamp).strftime('%Y-%m')
-                        monthly_commits[month_key] = monthly_commits.get(month_key, 0) + week_data.get('total', 0)
-                
-                repo_data.monthly_commits = monthly_commits
+        Returns:
+            List of stages for StageExecutor
+        """
+        prefetched = metadata is not None
+        # Input of the local analysis stages
+        local_source = 'snapshot' if self.local_analysis == "tarball" else 'repo_path'
+        
+        def fetch(state: Dict[str, Any]) -> Dict[str, Any]:
+            owner, repo_name = state['owner'], state['repo_name']
+            # Results needed by the stages that run (None: all of them)
+            needed = state.get('metadata_keys')
             
-            logger.info(f"✓ Successfully fetched commit activity: {repo_data.total_commits} total commits")
-        except GitHubAPIError as e:
-            logger.warning(f"⚠ Failed to fetch commit activity: {e}")
-            # Continue with partial data
+            def wanted(key: str) -> bool:
+                return needed is None or key in needed
+            
+            # The stats endpoints may answer 202 while GitHub computes them, so
+            # they are requested first and re-polled in the background
+            stats_future = None
+            if prefetched:
+                logger.info("Using prefetched API metadata")
+                fetched = dict(metadata)
+                if 'contributors' not in fetched and wanted('contributors'):
+                    # Contributor counts are not part of GraphQL snapshots
+                    try:
+                        fetched['contributors'] = self.github_client.count_contributors(owner, repo_name)
+                    except Exception as e:
+                        fetched['contributors'] = e
+            elif needed is not None:
+                fetched = {}
+                if any(key != 'commit_activity' for key in needed):
+                    fetched = self.fetch_metadata(
+                        owner, repo_name, include_commit_activity=False, keys=needed
+                    )
+            else:
+                if not (self.backend == "graphql" and self.github_client.token):
+                    stats_future = self.github_client.request_commit_activity(
+                        owner, repo_name, deadline=self.stats_deadline
+                    )
+                fetched = self.fetch_metadata(owner, repo_name, include_commit_activity=False)
+            if 'commit_activity' not in fetched and stats_future is None and wanted('commit_activity'):
+                stats_future = self.github_client.request_commit_activity(
+                    owner, repo_name, deadline=self.stats_deadline
+                )
+            if stats_future is not None:
+                fetched['commit_activity'] = stats_future
+            return {'metadata': fetched}
         
-        # Stage 4: Fetch contributors
-        logger.info("Stage 4: Fetching contributors")
-        try:
-            contributors = self.github_client.get_contributors(owner, repo_name)
-            repo_data.contributors = len(contributors)
-            logger.info(f"✓ Successfully fetched contributors: {repo_data.contributors} contributors")
-        except GitHubAPIError as e:
-            logger.warning(f"⚠ Failed to fetch contributors: {e}")
-            # Continue with partial data
+        def repository_info(state: Dict[str, Any]) -> None:
+            logger.info("Stage 2: Fetching repository metadata from GitHub API")
+            try:
+                repo_info = self._stage_result(state['metadata'], 'repository_info')
+                self._apply_repository_info(repo_data, repo_info)
+                logger.info(f"✓ Successfully fetched metadata: {repo_data.stars} stars, {repo_data.forks} forks")
+            except GitHubAPIError as e:
+                logger.error(f"✗ Failed to fetch repository metadata: {e}")
+                raise
         
-        # Stage 5: Fetch language statistics
-        logger.info("Stage 5: Fetching language statistics")
-        try:
-            languages = self.github_client.get_languages(owner, repo_name)
-            if languages:
-                total_bytes = sum(languages.values())
-                repo_data.language_breakdown = {
-                    lang: round((bytes_count / total_bytes) * 100, 2)
-                    for lang, bytes_count in languages.items()
-                }
-            logger.info(f"✓ Successfully fetched language statistics: {len(languages)} languages")
-        except GitHubAPIError as e:
-            logger.warning(f"⚠ Failed to fetch language statistics: {e}")
-            # Continue with partial data
+        def commit_activity(state: Dict[str, Any]) -> None:
+            logger.info("Stage 3: Collecting commit activity")
+            try:
+                commit_data = state['metadata']['commit_activity']
+                if isinstance(commit_data, Future):
+                    commit_data = self._resolve_stats(commit_data)
+                else:
+                    commit_data = self._stage_result(state['metadata'], 'commit_activity')
+                self._apply_commit_activity(repo_data, commit_data)
+                if commit_data.get('stats_pending'):
+                    logger.warning("⚠ GitHub stats were still being computed at the deadline; commit data may be partial")
+                logger.info(f"✓ Successfully fetched commit activity: {repo_data.total_commits} total commits")
+            except GitHubAPIError as e:
+                logger.warning(f"⚠ Failed to fetch commit activity: {e}")
+                # Continue with partial data
         
-        # Stage 6: Fetch README content
-        logger.info("Stage 6: Fetching README content")
-        try:
-            readme_content = self.github_client.get_readme_content(owner, repo_name)
-            # Store README content for later quality analysis
-            # We'll add this to code_samples for now
-            if readme_content:
-                repo_data.code_samples['README.md'] = readme_content
-            logger.info(f"✓ Successfully fetched README: {len(readme_content)} characters")
-        except GitHubAPIError as e:
-            logger.warning(f"⚠ Failed to fetch README: {e}")
-            # Continue without README
+        def contributors(state: Dict[str, Any]) -> None:
+            logger.info("Stage 4: Fetching contributors")
+            try:
+                repo_data.contributors = self._stage_result(state['metadata'], 'contributors')
+                logger.info(f"✓ Successfully fetched contributors: {repo_data.contributors} contributors")
+            except GitHubAPIError as e:
+                logger.warning(f"⚠ Failed to fetch contributors: {e}")
+                # Continue with partial data
         
-        # Stage 7: Fetch security files
-        logger.info("Stage 7: Checking security files")
-        try:
-            security_status = self.github_client.check_security_files(owner, repo_name)
-            # Store security status for later analysis
-            # We'll use this in the analysis pipeline
-            logger.info(f"✓ Successfully checked security files: {security_status}")
-        except GitHubAPIError as e:
-            logger.warning(f"⚠ Failed to check security files: {e}")
-            # Continue without security info
+        def languages(state: Dict[str, Any]) -> None:
+            logger.info("Stage 5: Fetching language statistics")
+            try:
+                language_bytes = self._stage_result(state['metadata'], 'languages')
+                self._apply_languages(repo_data, language_bytes)
+                logger.info(f"✓ Successfully fetched language statistics: {len(language_bytes)} languages")
+            except GitHubAPIError as e:
+                logger.warning(f"⚠ Failed to fetch language statistics: {e}")
+                # Continue with partial data
         
-        # Stage 8: Clone repository for local analysis
-        logger.info("Stage 8: Cloning repository for local analysis")
-        repo_path = None
-        try:
-            clone_url = f"https://github.com/{owner}/{repo_name}.git"
-            # Clone with full history to analyze commit activity
-            repo_path = self.repo_analyzer.clone_repository(clone_url, shallow=False)
-            logger.info(
-                f"✓ Successfully cloned repository to {repo_path}",
-                extra={'stage': 'clone', 'status': 'success'}
-            )
-        except Exception as e:
-            logger.warning(
-                f"⚠ Failed to clone repository: {str(e)}",
-                extra={
-                    'stage': 'clone',
-                    'status': 'failed',
-                    'error_type': type(e).__name__,
-                    'fallback_mode': 'API-only'
-                }
-            )
-            logger.warning(
-                "Continuing with API-only analysis (without local file inspection). "
-                "Some metrics like file extension analysis and code quality sampling will be limited."
-            )
-            # Continue without local analysis - graceful degradation
+        def readme(state: Dict[str, Any]) -> None:
+            logger.info("Stage 6: Fetching README content")
+            try:
+                readme_content = self._stage_result(state['metadata'], 'readme')
+                # Store README content for later quality analysis
+                # We'll add this to code_samples for now
+                if readme_content:
+                    repo_data.code_samples['README.md'] = readme_content
+                logger.info(f"✓ Successfully fetched README: {len(readme_content)} characters")
+            except GitHubAPIError as e:
+                logger.warning(f"⚠ Failed to fetch README: {e}")
+                # Continue without README
         
-        # Stage 8a: Analyze git history (if cloned)
-        if repo_path:
+        def security_files(state: Dict[str, Any]) -> None:
+            logger.info("Stage 7: Checking security files")
+            try:
+                security_status = self._stage_result(state['metadata'], 'security_files')
+                # Store security status for later analysis
+                # We'll use this in the analysis pipeline
+                logger.info(f"✓ Successfully checked security files: {security_status}")
+            except GitHubAPIError as e:
+                logger.warning(f"⚠ Failed to check security files: {e}")
+                # Continue without security info
+        
+        def clone(state: Dict[str, Any]) -> Dict[str, Any]:
+            logger.info("Stage 8: Cloning repository for local analysis")
+            try:
+                clone_url = f"https://github.com/{state['owner']}/{state['repo_name']}.git"
+                size_hint = None
+                if self.repo_analyzer.clone_strategy == 'blobless':
+                    # Blob sizes let a blobless clone fetch only the files selection can pick;
+                    # the security check shares the index, so this is usually no extra request
+                    try:
+                        size_hint = self.github_client.get_tree_index(state['owner'], state['repo_name'])
+                    except GitHubAPIError as e:
+                        logger.debug(f"Tree index unavailable, fetching every selection candidate: {e}")
+                # Clone with full history to analyze commit activity
+                repo_path = self.repo_analyzer.clone_repository(
+                    clone_url, shallow=False, size_hint=size_hint, max_files=5
+                )
+                logger.info(
+                    f"✓ Successfully cloned repository to {repo_path}",
+                    extra={'stage': 'clone', 'status': 'success'}
+                )
+                return {'repo_path': repo_path}
+            except Exception as e:
+                reason = 'clone budget exhausted' if isinstance(e, TimeoutError) else f"clone failed: {e}"
+                record_degradation(repo_data, 'clone', reason, 'API-only')
+                logger.warning(
+                    f"⚠ Failed to clone repository: {str(e)}",
+                    extra={
+                        'stage': 'clone',
+                        'status': 'failed',
+                        'error_type': type(e).__name__,
+                        'fallback_mode': 'API-only'
+                    }
+                )
+                logger.warning(
+                    "Continuing with API-only analysis (without local file inspection). "
+                    "Code quality sampling and dependency extraction will be skipped; file extensions come from the API tree."
+                )
+                # Continue without local analysis - graceful degradation
+                return {}
+        
+        def tarball(state: Dict[str, Any]) -> Dict[str, Any]:
+            logger.info("Stage 8: Streaming repository tarball for local analysis")
+            try:
+                ref = repo_data.head_sha or 'HEAD'
+                with self.github_client.open_tarball(state['owner'], state['repo_name'], ref) as stream:
+                    snapshot = self.repo_analyzer.analyze_tarball(stream, max_files=5)
+                if snapshot.truncated:
+                    record_degradation(repo_data, 'tarball', 'tarball budget exhausted', 'sampled stream')
+                logger.info(f"✓ Successfully analyzed tarball: {snapshot.files} files, {snapshot.bytes_read} bytes read")
+                return {'snapshot': snapshot}
+            except Exception as e:
+                reason = 'tarball budget exhausted' if isinstance(e, TimeoutError) else f"tarball failed: {e}"
+                record_degradation(repo_data, 'tarball', reason, 'API-only')
+                logger.warning(
+                    "Continuing with API-only analysis (without local file inspection). "
+                    "Code quality sampling and dependency extraction will be skipped; file extensions come from the API tree."
+                )
+                return {}
+        
+        def git_history(state: Dict[str, Any]) -> None:
             logger.info("Stage 8a: Analyzing git commit history")
             try:
-                git_history = self.repo_analyzer.analyze_git_history(repo_path)
+                history = self.repo_analyzer.analyze_git_history(state['repo_path'])
+                if history.get('truncated') == 'history':
+                    record_degradation(repo_data, 'git_history', 'history budget exhausted', 'API commit data')
+                elif history.get('truncated') == 'analytics':
+                    record_degradation(repo_data, 'git_history', 'history budget exhausted', 'partial analytics')
                 
                 # Override GitHub API data with accurate git history data
-                if git_history['total_commits'] > 0:
-                    repo_data.total_commits = git_history['total_commits']
-                    repo_data.monthly_commits = git_history['monthly_commits']
-                    if git_history['last_commit_date']:
-                        repo_data.last_commit = git_history['last_commit_date']
+                if history['total_commits'] > 0:
+                    repo_data.total_commits = history['total_commits']
+                    repo_data.monthly_commits = history['monthly_commits']
+                    if history['last_commit_date']:
+                        repo_data.last_commit = history['last_commit_date']
+                    repo_data.git_analytics = history['analytics']
                     
                     logger.info(f"✓ Successfully analyzed git history: {repo_data.total_commits} total commits")
-                else:
+                elif not history.get('truncated'):
                     logger.warning("⚠ Git history analysis returned 0 commits")
             except Exception as e:
                 logger.warning(f"⚠ Failed to analyze git history: {e}")
         
-        # Stage 9: Analyze file extensions (if cloned)
-        if repo_path:
+        def file_extensions(state: Dict[str, Any]) -> None:
+            # From the clone, or the API tree index when cloning failed
             logger.info("Stage 9: Analyzing file extensions")
             try:
-                extension_counts = self.repo_analyzer.analyze_file_extensions(repo_path)
+                if state.get('snapshot'):
+                    extension_counts = state['snapshot'].extension_counts
+                elif state.get('repo_path'):
+                    extension_counts = self.repo_analyzer.analyze_file_extensions(state['repo_path'])
+                    deadline = current_deadline()
+                    if deadline is not None and deadline.expired:
+                        extension_counts = self._extensions_after_budget(repo_data, state, extension_counts)
+                else:
+                    extension_counts = self.github_client.get_tree_index(
+                        state['owner'], state['repo_name']
+                    ).extension_counts()
                 repo_data.file_extension_counts = extension_counts
                 logger.info(f"✓ Successfully analyzed file extensions: {len(extension_counts)} unique extensions")
             except Exception as e:
                 logger.warning(f"⚠ Failed to analyze file extensions: {e}")
         
-        # Stage 10: Select files for quality analysis (if cloned)
-        if repo_path:
+        def select_files(state: Dict[str, Any]) -> None:
             logger.info("Stage 10: Selecting files for quality analysis")
+            if 'snapshot' in state:
+                repo_data.analyzed_files = state['snapshot'].selected_files
+                repo_data.code_samples.update(state['snapshot'].code_samples)
+                logger.info(f"✓ Selected {len(repo_data.analyzed_files)} files from the tarball")
+                return
             try:
-                selected_files = self.repo_analyzer.select_files_for_analysis(repo_path, max_files=5)
+                selected_files = self.repo_analyzer.select_files_for_analysis(state['repo_path'], max_files=5)
+                deadline = current_deadline()
+                if deadline is not None and deadline.expired:
+                    record_degradation(repo_data, 'select_files', 'walk budget exhausted', 'sampled walk')
                 repo_data.analyzed_files = selected_files
                 logger.info(f"✓ Successfully selected {len(selected_files)} files for analysis")
                 
                 # Read file contents
                 if selected_files:
                     logger.info("Stage 10a: Reading file contents")
-                    file_contents = self.repo_analyzer.read_file_contents(repo_path, selected_files)
+                    file_contents = self.repo_analyzer.read_file_contents(state['repo_path'], selected_files)
                     # Merge with existing code_samples (README)
                     repo_data.code_samples.update(file_contents)
                     logger.info(f"✓ Successfully read {len(file_contents)} files")
             except Exception as e:
                 logger.warning(f"⚠ Failed to select/read files: {e}")
         
-        # Stage 11: Extract dependencies (if cloned)
-        if repo_path:
+        def dependencies(state: Dict[str, Any]) -> None:
             logger.info("Stage 11: Extracting dependencies")
             try:
-                dependencies = self.repo_analyzer.extract_dependencies(repo_path)
-                repo_data.core_dependencies = dependencies
-                logger.info(f"✓ Successfully extracted {len(dependencies)} dependencies")
+                if 'snapshot' in state:
+                    extracted = state['snapshot'].dependencies
+                else:
+                    extracted = self.repo_analyzer.extract_dependencies(state['repo_path'])
+                repo_data.core_dependencies = extracted
+                logger.info(f"✓ Successfully extracted {len(extracted)} dependencies")
             except Exception as e:
                 logger.warning(f"⚠ Failed to extract dependencies: {e}")
         
-        # Stage 12: Cleanup temporary files
-        if repo_path:
+        def cleanup(state: Dict[str, Any]) -> None:
             logger.info("Stage 12: Cleaning up temporary files")
             try:
-                self.repo_analyzer.cleanup(repo_path)
+                self.repo_analyzer.cleanup(state['repo_path'])
                 logger.info("✓ Successfully cleaned up temporary files")
             except Exception as e:
                 logger.warning(f"⚠ Failed to cleanup temporary files: {e}")
         
-        logger.info("=" * 80)
-        logger.info("Data Acquisition Pipeline Complete")
-        logger.info(f"Repository: {owner}/{repo_name}")
-        logger.info(f"Stars: {repo_data.stars}, Forks: {repo_data.forks}, Contributors: {repo_data.contributors}")
-        logger.info(f"Total Commits: {repo_data.total_commits}")
-        logger.info(f"File Extensions: {len(repo_data.file_extension_counts)}")
-        logger.info(f"Analyzed Files: {len(repo_data.analyzed_files)}")
-        logger.info(f"Dependencies: {len(repo_data.core_dependencies)}")
-        logger.info("=" * 80)
+        stages = [
+            Stage('fetch_metadata', fetch, provides=('metadata',)),
+            Stage(
+                'repository_info', repository_info, requires=('metadata',), critical=True,
+                fields=REPOSITORY_INFO_FIELDS
+            ),
+            Stage(
+                'commit_activity', commit_activity, requires=('metadata',),
+                fields=('total_commits', 'last_commit', 'monthly_commits')
+            ),
+            Stage('contributors', contributors, requires=('metadata',), fields=('contributors',)),
+            Stage('languages', languages, requires=('metadata',), fields=('language_breakdown',)),
+            Stage('readme', readme, requires=('metadata',), fields=('code_samples',)),
+            Stage('security_files', security_files, requires=('metadata',)),
+            Stage('clone', clone, provides=('repo_path',)),
+            Stage('tarball', tarball, provides=('snapshot',)),
+            # Local history overrides the API commit data, so it applies last
+            Stage(
+                'git_history', git_history, requires=('repo_path',), after=('commit_activity',),
+                fields=('total_commits', 'last_commit', 'monthly_commits', 'git_analytics')
+            ),
+            Stage(
+                'file_extensions', file_extensions, optional=('repo_path', 'snapshot'),
+                fields=('file_extension_counts',)
+            ),
+            # README goes first in code_samples
+            Stage(
+                'select_files', select_files, requires=(local_source,), after=('readme',),
+                fields=('analyzed_files', 'code_samples')
+            ),
+            Stage('dependencies', dependencies, requires=(local_source,), fields=('core_dependencies',)),
+            Stage(
+                'cleanup', cleanup, requires=('repo_path',),
+                after=('git_history', 'file_extensions', 'select_files', 'dependencies'),
+                always=True
+            ),
+        ]
+        if self.local_analysis == "tarball":
+            stages = [stage for stage in stages if stage.name not in ('clone', 'git_history', 'cleanup')]
+        else:
+            stages = [stage for stage in stages if stage.name != 'tarball']
+        for stage in stages:
+            stage.budget = self.stage_budgets.get(stage.name)
+        return stages
+    
+    def _extensions_after_budget(
+        self,
+        repo_data: RepositoryData,
+        state: Dict[str, Any],
+        partial_counts: Dict[str, int]
+    ) -> Dict[str, int]:
+        """
+        Replace a walk cut short by its budget with the API tree index.
         
-        return repo_data
+        The index call runs under the enclosing deadline rather than the
+        exhausted stage budget; if that fails too, the partial counts are kept.
+        """
+        deadline = current_deadline()
+        try:
+            with deadline_scope(deadline.parent or deadline):
+                extension_counts = self.github_client.get_tree_index(
+                    state['owner'], state['repo_name']
+                ).extension_counts()
+        except GitHubAPIError as e:
+            logger.debug(f"Tree index fallback failed: {e}")
+            record_degradation(repo_data, 'file_extensions', 'walk budget exhausted', 'partial walk')
+            return partial_counts
+        record_degradation(repo_data, 'file_extensions', 'walk budget exhausted', 'API tree index')
+        return extension_counts
@@ -0,0 +1,153 @@
+"""Awaitable wrapper running GitHub API client calls on a thread pool for concurrent fan-out."""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from data_acquisition.file_index import FileIndex
+from data_acquisition.github_client import GitHubClient
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class AsyncGitHubClient:
+    """
+    Awaitable wrapper exposing the same methods as GitHubClient.
+
+    This is not an asyncio-native HTTP client: each call runs the blocking
+    GitHubClient method on a bounded thread pool (``run_in_executor``) that
+    shares one pooled ``requests.Session``, so retries, rate-limit handling
+    and the response cache behave exactly as in the synchronous client while
+    independent calls overlap on the wire. ``max_concurrency`` bounds both
+    the number of threads, hence in-flight requests, and the size of the
+    HTTP connection pool. Call close() (or use ``async with``) to shut the
+    pool down.
+
+    Example:
+        async with AsyncGitHubClient(token=token) as client:
+            info, languages = await asyncio.gather(
+                client.get_repository_info(owner, repo),
+                client.get_languages(owner, repo),
+            )
+    """
+
+    def __init__(
+        self,
+        client: Optional[GitHubClient] = None,
+        max_concurrency: int = 8,
+        **client_kwargs: Any
+    ):
+        """
+        Initialize async GitHub API client.
+
+        Args:
+            client: Existing GitHubClient to share (a new one is created if None)
+            max_concurrency: Maximum number of requests in flight at once
+            **client_kwargs: Arguments for GitHubClient when client is None
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be positive, got {max_concurrency}")
+
+        if client is None:
+            client_kwargs.setdefault('pool_size', max_concurrency)
+            client = GitHubClient(**client_kwargs)
+
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix='github-api'
+        )
+        logger.debug(f"Async GitHub client initialized (max_concurrency={max_concurrency})")
+
+    async def _call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking client method on the worker pool, in the caller's context (deadline)."""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, functools.partial(context.run, func, *args, **kwargs))
+
+    async def get_repository_info(self, owner: str, repo: str) -> Dict[str, Any]:
+        """Fetch repository metadata. See GitHubClient.get_repository_info."""
+        return await self._call(self.client.get_repository_info, owner, repo)
+
+    async def get_commit_activity(self, owner: str, repo: str, wait: float = 0.0) -> Dict[str, Any]:
+        """Fetch commit activity statistics. See GitHubClient.get_commit_activity."""
+        return await self._call(self.client.get_commit_activity, owner, repo, wait)
+
+    async def get_contributors(self, owner: str, repo: str, max_contributors: int = 100) -> List[Dict[str, Any]]:
+        """Fetch repository contributors. See GitHubClient.get_contributors."""
+        return await self._call(self.client.get_contributors, owner, repo, max_contributors)
+
+    async def count_contributors(self, owner: str, repo: str, anon: bool = True) -> int:
+        """Count repository contributors. See GitHubClient.count_contributors."""
+        return await self._call(self.client.count_contributors, owner, repo, anon)
+
+    async def count_commits(self, owner: str, repo: str, sha: Optional[str] = None) -> int:
+        """Count commits on a branch. See GitHubClient.count_commits."""
+        return await self._call(self.client.count_commits, owner, repo, sha)
+
+    async def get_languages(self, owner: str, repo: str) -> Dict[str, int]:
+        """Fetch language statistics. See GitHubClient.get_languages."""
+        return await self._call(self.client.get_languages, owner, repo)
+
+    async def check_security_files(self, owner: str, repo: str) -> Dict[str, bool]:
+        """Check for security files. See GitHubClient.check_security_files."""
+        return await self._call(self.client.check_security_files, owner, repo)
+
+    async def get_tree_index(self, owner: str, repo: str, ref: str = 'HEAD') -> FileIndex:
+        """Fetch and index the repository tree. See GitHubClient.get_tree_index."""
+        return await self._call(self.client.get_tree_index, owner, repo, ref)
+
+    async def get_readme_content(self, owner: str, repo: str, max_bytes: Optional[int] = None) -> str:
+        """Fetch README content. See GitHubClient.get_readme_content."""
+        return await self._call(self.client.get_readme_content, owner, repo, max_bytes)
+
+    async def gather_repository_metadata(
+        self,
+        owner: str,
+        repo: str,
+        include_commit_activity: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Fetch all API metadata for a repository concurrently.
+
+        Failures don't cancel the other requests; the exception is returned
+        in place of the result so callers can degrade per stage.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            include_commit_activity: Set False when stats are fetched separately,
+                e.g. with GitHubClient.request_commit_activity()
+
+        Returns:
+            Dictionary with 'repository_info', 'commit_activity', 'contributors'
+            (a count), 'languages', 'readme' and 'security_files' keys mapping to
+            either the method result or the exception it raised
+        """
+        calls = {
+            'repository_info': self.get_repository_info(owner, repo),
+            'contributors': self.count_contributors(owner, repo),
+            'languages': self.get_languages(owner, repo),
+            'readme': self.get_readme_content(owner, repo),
+            'security_files': self.check_security_files(owner, repo),
+        }
+        if include_commit_activity:
+            calls['commit_activity'] = self.get_commit_activity(owner, repo)
+        results = await asyncio.gather(*calls.values(), return_exceptions=True)
+        return dict(zip(calls.keys(), results))
+
+    def close(self) -> None:
+        """Shut down the worker pool and close the HTTP session."""
+        self._executor.shutdown(wait=True)
+        self.client.session.close()
+
+    async def __aenter__(self) -> "AsyncGitHubClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,265 @@
+"""Persistent per-file analysis facts keyed by git blob SHA."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Bumped when stored facts change meaning; older databases are recreated
+SCHEMA_VERSION = 1
+
+# SHAs per SELECT ... IN (...) query, below SQLite's host parameter limit
+QUERY_CHUNK = 500
+
+# Stores between checks of the entry limit
+EVICTION_INTERVAL = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_facts (
+    sha TEXT PRIMARY KEY,
+    line_count INTEGER,
+    language TEXT NOT NULL DEFAULT '',
+    binary INTEGER NOT NULL DEFAULT 0,
+    accessed REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS file_metrics (
+    sha TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (sha, name)
+);
+CREATE INDEX IF NOT EXISTS file_facts_accessed ON file_facts (accessed);
+CREATE INDEX IF NOT EXISTS file_metrics_accessed ON file_metrics (accessed);
+"""
+
+
+@dataclass
+class FileFacts:
+    """What is known about one file content (blob)."""
+
+    line_count: Optional[int] = None
+    language: str = ''  # From the extension of the path the blob was first seen at
+    binary: bool = False
+
+
+@dataclass
+class BlobCacheStats:
+    """Counters describing cache effectiveness."""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert counters to a dictionary including the hit ratio."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class BlobCache:
+    """
+    SQLite store of per-file facts, keyed by git blob SHA.
+
+    A blob SHA names file contents, so a fact computed once holds for every
+    repository, fork, mirror and run that contains the same file, wherever
+    it sits in the tree. ``file_facts`` holds the line count, language and
+    binary flag; ``file_metrics`` holds any other per-file result as JSON
+    under a name (e.g. the dependencies parsed from a manifest).
+
+    The database is shared by threads (one connection behind a lock) and by
+    concurrent runs (WAL journal). Least recently used rows are deleted
+    beyond ``max_entries`` per table. A broken database never fails an
+    analysis: errors are logged and count as misses.
+
+    Example:
+        cache = BlobCache('/tmp/reporank/blob_cache.sqlite')
+        cache.get_facts(['3b18e512dba79e4c8300dd08aeb37f8e728b8dad'])
+        cache.stats.to_dict()
+    """
+
+    def __init__(self, path: str, max_entries: int = 1000000):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite database file
+            max_entries: Rows kept per table before the least recently used are evicted
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = BlobCacheStats()
+        self._lock = threading.Lock()
+        self._stores_since_eviction = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        try:
+            self._db.execute('PRAGMA journal_mode=WAL')
+            if self._db.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                self._db.executescript(
+                    'DROP TABLE IF EXISTS file_facts; DROP TABLE IF EXISTS file_metrics;'
+                )
+            self._db.executescript(SCHEMA)
+            self._db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            self._db.commit()
+            self._evict()
+            entries = self._db.execute('SELECT COUNT(*) FROM file_facts').fetchone()[0]
+        except sqlite3.Error:
+            self._db.close()
+            raise
+        logger.info(f"Blob cache at {path} ({entries} files)")
+
+    def get_facts(self, shas: Iterable[str]) -> Dict[str, FileFacts]:
+        """
+        Look up the facts of several blobs.
+
+        Args:
+            shas: Blob SHAs
+
+        Returns:
+            Dictionary mapping each cached SHA to its FileFacts
+        """
+        shas = list(dict.fromkeys(sha for sha in shas if sha))
+        found: Dict[str, FileFacts] = {}
+        with self._lock:
+            try:
+                for start in range(0, len(shas), QUERY_CHUNK):
+                    chunk = shas[start:start + QUERY_CHUNK]
+                    placeholders = ','.join('?' * len(chunk))
+                    rows = self._db.execute(
+                        f'SELECT sha, line_count, language, binary FROM file_facts WHERE sha IN ({placeholders})',
+                        chunk
+                    ).fetchall()
+                    for sha, line_count, language, binary in rows:
+                        found[sha] = FileFacts(line_count=line_count, language=language, binary=bool(binary))
+                    self._touch('file_facts', [row[0] for row in rows])
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.debug(f"Blob cache lookup failed: {e}")
+            self.stats.hits += len(found)
+            self.stats.misses += len(shas) - len(found)
+        return found
+
+    def put_facts(self, facts: Dict[str, FileFacts]) -> None:
+        """
+        Store the facts of several blobs.
+
+        Args:
+            facts: Blob SHA -> FileFacts
+        """
+        now = time.time()
+        rows = [
+            (sha, fact.line_count, fact.language, int(fact.binary), now)
+            for sha, fact in facts.items() if sha
+        ]
+        if rows:
+            self._write(
+                'INSERT OR REPLACE INTO file_facts (sha, line_count, language, binary, accessed) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+
+    def get_metric(self, sha: str, name: str) -> Optional[Any]:
+        """
+        Look up a per-file metric.
+
+        Args:
+            sha: Blob SHA
+            name: Metric name, e.g. 'dependencies:package.json'
+
+        Returns:
+            The stored value, or None if it is not cached
+        """
+        value = None
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    'SELECT value FROM file_metrics WHERE sha = ? AND name = ?', (sha, name)
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._db.execute(
+                        'UPDATE file_metrics SET accessed = ? WHERE sha = ? AND name = ?', (time.time(), sha, name)
+                    )
+                    self._db.commit()
+            except (sqlite3.Error, ValueError) as e:
+                logger.debug(f"Blob cache lookup failed: {e}")
+            if value is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return value
+
+    def put_metric(self, sha: str, name: str, value: Any) -> None:
+        """
+        Store a per-file metric.
+
+        Args:
+            sha: Blob SHA
+            name: Metric name
+            value: JSON-serializable value
+        """
+        self._write(
+            'INSERT OR REPLACE INTO file_metrics (sha, name, value, accessed) VALUES (?, ?, ?, ?)',
+            [(sha, name, json.dumps(value), time.time())]
+        )
+
+    def _touch(self, table: str, shas: List[str]) -> None:
+        if shas:
+            self._db.execute(
+                f"UPDATE {table} SET accessed = ? WHERE sha IN ({','.join('?' * len(shas))})",
+                [time.time()] + shas
+            )
+
+    def _write(self, statement: str, rows: List[tuple]) -> None:
+        with self._lock:
+            try:
+                self._db.executemany(statement, rows)
+                self._db.commit()
+                self.stats.stores += len(rows)
+                self._stores_since_eviction += len(rows)
+                if self._stores_since_eviction >= EVICTION_INTERVAL:
+                    self._evict()
+            except sqlite3.Error as e:
+                logger.debug(f"Blob cache store failed: {e}")
+
+    def _evict(self) -> None:
+        """Delete the least recently used rows beyond max_entries (caller holds the lock)."""
+        self._stores_since_eviction = 0
+        for table in ('file_facts', 'file_metrics'):
+            excess = self._db.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._db.execute(
+                    f'DELETE FROM {table} WHERE rowid IN '
+                    f'(SELECT rowid FROM {table} ORDER BY accessed LIMIT ?)',
+                    (excess,)
+                )
+                self.stats.evictions += excess
+        self._db.commit()
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
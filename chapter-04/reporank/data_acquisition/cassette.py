@@ -0,0 +1,324 @@
+"""Record/replay transport for GitHub API requests (offline and load testing)."""
+
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+CASSETTE_VERSION = 1
+
+# Request headers that select a different representation of the same URL
+_KEY_HEADERS = ('Accept',)
+
+
+@dataclass
+class Interaction:
+    """One recorded request/response pair."""
+
+    method: str
+    path: str
+    accept: str
+    body_hash: str
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    elapsed: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'request': {
+                'method': self.method,
+                'path': self.path,
+                'accept': self.accept,
+                'body_hash': self.body_hash,
+            },
+            'response': {
+                'status': self.status_code,
+                'headers': self.headers,
+                'body': base64.b64encode(self.body).decode('ascii'),
+                'elapsed': round(self.elapsed, 4),
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Interaction":
+        request, response = data['request'], data['response']
+        return cls(
+            method=request['method'],
+            path=request['path'],
+            accept=request.get('accept', ''),
+            body_hash=request.get('body_hash', ''),
+            status_code=response['status'],
+            headers=response.get('headers', {}),
+            body=base64.b64decode(response.get('body', '')),
+            elapsed=response.get('elapsed', 0.0),
+        )
+
+
+@dataclass
+class FaultInjector:
+    """
+    Deterministic fault injection for replayed responses.
+
+    Each rate is the probability of replacing a response with that status:
+    202 (stats still computing, only for /stats/ endpoints), 403 (secondary
+    rate limit with Retry-After) or any 5xx. Decisions are derived from the
+    seed, the request and how often it was seen, so the same run replays the
+    same faults regardless of thread scheduling.
+    """
+
+    rates: Dict[int, float] = field(default_factory=dict)
+    seed: int = 0
+    retry_after: int = 1
+
+    @classmethod
+    def parse(cls, spec: str, seed: int = 0) -> "FaultInjector":
+        """
+        Build an injector from a "status:rate,..." string.
+
+        Example:
+            FaultInjector.parse("202:0.2,403:0.01,502:0.05")
+        """
+        rates = {}
+        for item in filter(None, (part.strip() for part in spec.split(','))):
+            status, _, rate = item.partition(':')
+            rates[int(status)] = float(rate)
+        return cls(rates=rates, seed=seed)
+
+    def pick(self, key: str, occurrence: int) -> Optional[int]:
+        """Return the status to inject for this request occurrence, if any."""
+        for status, rate in sorted(self.rates.items()):
+            if status == 202 and '/stats/' not in key:
+                continue
+            digest = hashlib.sha256(f"{self.seed}:{status}:{key}:{occurrence}".encode()).digest()
+            if int.from_bytes(digest[:8], 'big') / 2 ** 64 < rate:
+                return status
+        return None
+
+    def response_for(self, status: int) -> Tuple[Dict[str, str], bytes]:
+        """Build the headers and body GitHub sends with an injected status."""
+        if status == 202:
+            return {'Content-Type': 'application/json'}, b'{}'
+        if status == 403:
+            body = {'message': 'You have exceeded a secondary rate limit. Please wait a few minutes before you try again.'}
+            return {'Content-Type': 'application/json', 'Retry-After': str(self.retry_after)}, json.dumps(body).encode()
+        return {'Content-Type': 'application/json'}, json.dumps({'message': 'Server Error'}).encode()
+
+
+class CassetteAdapter(HTTPAdapter):
+    """
+    Transport adapter that records real responses or replays recorded ones.
+
+    Mounted on ``GitHubClient.session`` it sits below retries, rate limiting
+    and the response cache, so the client behaves exactly as against GitHub.
+
+    In ``record`` mode requests go to the network and every response
+    (status, headers, body, latency) is kept; the cassette is written as
+    gzipped JSON on close/exit. In ``replay`` mode no network is used:
+    requests are matched on method, path, sorted query string, Accept header
+    and body hash (falling back to method and path only, so GraphQL queries
+    built for another date still match). Repeated requests step through the
+    recorded responses in order and then repeat the last one, so a recorded
+    202 -> 200 sequence replays faithfully.
+
+    Example:
+        client = GitHubClient()
+        install_cassette(client.session, 'fixtures/psf-requests.json.gz', mode='replay',
+                         latency=0.05, faults=FaultInjector.parse('202:0.2'))
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = 'replay',
+        latency: Optional[float] = None,
+        faults: Optional[FaultInjector] = None,
+        strict: bool = False,
+        **kwargs: Any
+    ):
+        """
+        Initialize the cassette.
+
+        Args:
+            path: Cassette file (gzipped JSON)
+            mode: 'record' or 'replay'
+            latency: Replay delay per request in seconds; None replays the
+                recorded latency, 0 disables delays
+            faults: Optional fault injector applied in replay mode
+            strict: Raise ConnectionError for unrecorded requests instead of
+                answering 404
+            **kwargs: HTTPAdapter arguments (pool sizes) used when recording
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Cassette mode must be 'record' or 'replay', got '{mode}'")
+        super().__init__(**kwargs)
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.faults = faults
+        self.strict = strict
+        self.interactions: List[Interaction] = []
+        self._exact: Dict[Tuple[str, ...], List[Interaction]] = {}
+        self._loose: Dict[Tuple[str, str], List[Interaction]] = {}
+        self._seen: Dict[Tuple[str, ...], int] = {}
+        self._lock = threading.Lock()
+
+        if mode == 'replay':
+            self._load()
+        else:
+            atexit.register(self.save)
+
+    @staticmethod
+    def _request_key(request: requests.PreparedRequest) -> Tuple[str, str, str, str]:
+        parts = urlsplit(request.url)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        path = parts.path + (f"?{query}" if query else '')
+        accept = ','.join(request.headers.get(name, '') for name in _KEY_HEADERS)
+        body = request.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        body_hash = hashlib.sha1(body).hexdigest() if body else ''
+        return request.method.upper(), path, accept, body_hash
+
+    def _load(self) -> None:
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {self.path}: {data.get('version')}")
+        self.interactions = [Interaction.from_dict(item) for item in data.get('interactions', [])]
+        for interaction in self.interactions:
+            exact = (interaction.method, interaction.path, interaction.accept, interaction.body_hash)
+            self._exact.setdefault(exact, []).append(interaction)
+            self._loose.setdefault((interaction.method, interaction.path.split('?', 1)[0]), []).append(interaction)
+        logger.info(f"Loaded cassette {self.path} ({len(self.interactions)} interactions)")
+
+    def save(self) -> None:
+        """Write recorded interactions to the cassette file (record mode only)."""
+        if self.mode != 'record':
+            return
+        with self._lock:
+            payload = {
+                'version': CASSETTE_VERSION,
+                'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'interactions': [interaction.to_dict() for interaction in self.interactions],
+            }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, separators=(',', ':'))
+        logger.info(f"Saved cassette {self.path} ({len(payload['interactions'])} interactions)")
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        if self.mode == 'record':
+            return self._record(request, **kwargs)
+        return self._replay(request)
+
+    def _record(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        body = response.content  # Recording needs the whole body, even for streamed requests
+        method, path, accept, body_hash = self._request_key(request)
+        interaction = Interaction(
+            method=method,
+            path=path,
+            accept=accept,
+            body_hash=body_hash,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            body=body,
+            elapsed=time.perf_counter() - started,
+        )
+        with self._lock:
+            self.interactions.append(interaction)
+        return response
+
+    def _replay(self, request: requests.PreparedRequest) -> requests.Response:
+        key = self._request_key(request)
+        candidates = self._exact.get(key) or self._loose.get((key[0], key[1].split('?', 1)[0]))
+        with self._lock:
+            occurrence = self._seen.get(key, 0)
+            self._seen[key] = occurrence + 1
+
+        if not candidates:
+            if self.strict:
+                raise requests.exceptions.ConnectionError(f"No recorded response for {key[0]} {key[1]}")
+            logger.warning(f"Cassette miss: {key[0]} {key[1]}")
+            return self._build(request, 404, {'X-Cassette-Miss': '1'}, b'{"message": "Not Found"}', 0.0)
+
+        interaction = candidates[min(occurrence, len(candidates) - 1)]
+        delay = interaction.elapsed if self.latency is None else self.latency
+        if delay > 0:
+            time.sleep(delay)
+
+        injected = self.faults.pick('|'.join(key), occurrence) if self.faults else None
+        if injected is not None:
+            headers, body = self.faults.response_for(injected)
+            return self._build(request, injected, headers, body, delay)
+        return self._build(request, interaction.status_code, interaction.headers, interaction.body, delay)
+
+    def _build(
+        self,
+        request: requests.PreparedRequest,
+        status_code: int,
+        headers: Dict[str, str],
+        body: bytes,
+        elapsed: float
+    ) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        try:
+            response.reason = HTTPStatus(status_code).phrase
+        except ValueError:
+            response.reason = ''
+
+        response.elapsed = timedelta(seconds=elapsed)
+        response.connection = self
+        return response
+
+    def close(self) -> None:
+        self.save()
+        super().close()
+
+
+def install_cassette(session: requests.Session, path: str, mode: str = 'replay', **kwargs: Any) -> CassetteAdapter:
+    """
+    Mount a CassetteAdapter for all HTTP(S) traffic of a session.
+
+    Args:
+        session: Session to patch (e.g. ``GitHubClient.session``)
+        path: Cassette file
+        mode: 'record' or 'replay'
+        **kwargs: Further CassetteAdapter arguments
+
+    Returns:
+        The mounted adapter
+    """
+    adapter = CassetteAdapter(path, mode=mode, **kwargs)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    logger.info(f"Cassette {mode} mode: {path}")
+    return adapter
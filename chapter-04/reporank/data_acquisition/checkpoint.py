@@ -0,0 +1,287 @@
+"""Stage checkpoints for resuming interrupted analyses."""
+
+import copy
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from datetime import datetime
+from typing import Any, Callable, Collection, Dict, Iterable, Optional, Sequence, Set, Tuple
+
+from data_acquisition.deadline import Deadline, current_deadline, deadline_scope, record_degradation
+from models.repository_data import RepositoryData
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def _make_private_dir(path: str) -> None:
+    """Create ``path`` readable by this user only, restricting it if it already exists."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    try:
+        os.chmod(path, 0o700)
+    except OSError as e:
+        logger.warning(f"⚠ Could not restrict permissions of {path}: {e}")
+
+CHECKPOINT_VERSION = 1
+
+# Prefix of analysis steps in a checkpoint (acquisition stages use bare names)
+ANALYSIS_PREFIX = 'analysis:'
+
+
+class RepositoryCheckpoint:
+    """
+    Completed stages of one repository in one run, persisted as JSON.
+
+    For each completed stage the checkpoint keeps the RepositoryData fields
+    it wrote; restoring a stage sets them again. The file is rewritten
+    atomically after every stage, so a crash loses at most the stage that
+    was running. ``result`` marks the repository as finished (reports
+    written) and holds its fleet result.
+    """
+
+    def __init__(self, path: str, run_id: str, repository: str):
+        """
+        Initialize the checkpoint, loading it if the file exists.
+
+        Args:
+            path: Checkpoint file
+            run_id: Run the checkpoint belongs to
+            repository: "owner/repo"
+        """
+        self.path = path
+        self.run_id = run_id
+        self.repository = repository
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._directory_ready = False
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠ Ignoring unreadable checkpoint {self.path}: {e}")
+            return
+        if data.get('version') != CHECKPOINT_VERSION:
+            logger.warning(f"⚠ Ignoring checkpoint {self.path} with version {data.get('version')}")
+            return
+        self.stages = data.get('stages', {})
+        self.result = data.get('result')
+
+    def _save(self) -> None:
+        payload = {
+            'version': CHECKPOINT_VERSION,
+            'run_id': self.run_id,
+            'repository': self.repository,
+            'updated_at': datetime.now().isoformat(),
+            'stages': self.stages,
+            'result': self.result,
+        }
+        if not self._directory_ready:
+            # Checkpoints hold repository data, which may be private: the
+            # checkpoint directory and the run directory are for this user only
+            run_dir = os.path.dirname(self.path)
+            _make_private_dir(os.path.dirname(run_dir))
+            _make_private_dir(run_dir)
+            self._directory_ready = True
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, default=str)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def finished(self) -> bool:
+        return self.result is not None
+
+    def completed(self) -> Set[str]:
+        """Names of the stages recorded as completed."""
+        with self._lock:
+            return set(self.stages)
+
+    def record(self, stage: str, fields: Dict[str, Any]) -> None:
+        """
+        Persist a completed stage.
+
+        Args:
+            stage: Stage name
+            fields: RepositoryData attributes the stage wrote, with their values
+        """
+        with self._lock:
+            self.stages[stage] = {
+                'completed_at': datetime.now().isoformat(),
+                'fields': copy.deepcopy(fields),
+            }
+            self._save()
+
+    def record_from(self, stage: str, repo_data: RepositoryData, fields: Iterable[str]) -> None:
+        """Persist a completed stage with the current values of ``fields``."""
+        self.record(stage, {name: getattr(repo_data, name) for name in fields})
+
+    def restore(self, repo_data: RepositoryData, stages: Sequence[str]) -> None:
+        """
+        Apply the recorded fields of ``stages`` to repo_data, in the given order.
+
+        Args:
+            repo_data: Repository data to update in place
+            stages: Stage names, ordered so later stages override earlier ones
+        """
+        with self._lock:
+            recorded = [copy.deepcopy(self.stages[name]['fields']) for name in stages if name in self.stages]
+        for fields in recorded:
+            for name, value in fields.items():
+                if hasattr(repo_data, name):
+                    setattr(repo_data, name, value)
+                else:
+                    logger.debug(f"Checkpoint field {name} no longer exists, ignoring")
+
+    def finish(self, result: Dict[str, Any]) -> None:
+        """Mark the repository as finished."""
+        with self._lock:
+            self.result = copy.deepcopy(result)
+            self._save()
+
+
+class CheckpointStore:
+    """
+    Checkpoint files of a run: ``<directory>/<run_id>/<owner>__<repo>.json``.
+
+    A new run gets a fresh run id; resuming reuses the id of an earlier run
+    (by default the latest one) so completed stages are found again. Once
+    every repository of a run has finished there is nothing left to resume,
+    and discard() deletes the run's checkpoints (which hold READMEs and code
+    samples) instead of leaving them in the temp directory.
+
+    Example:
+        store = CheckpointStore('/tmp/reporank/checkpoints', run_id='latest')
+        checkpoint = store.for_repository('django', 'django')
+        repo_data = pipeline.execute('django/django', checkpoint=checkpoint)
+    """
+
+    def __init__(self, directory: str, run_id: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Base directory for all runs
+            run_id: Run to resume, 'latest' for the most recent run, or None
+                to start a new run
+
+        Raises:
+            FileNotFoundError: If a run to resume does not exist
+        """
+        self.directory = directory
+        self.resumed = run_id is not None
+        if run_id == 'latest':
+            run_id = self.latest_run_id(directory)
+            if run_id is None:
+                raise FileNotFoundError(f"No checkpointed runs found in {directory}")
+        elif run_id is not None and not os.path.isdir(os.path.join(directory, run_id)):
+            raise FileNotFoundError(f"No checkpoints for run '{run_id}' in {directory}")
+        self.run_id = run_id or self.new_run_id()
+        self._checkpoints: Dict[Tuple[str, str], RepositoryCheckpoint] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_run_id() -> str:
+        return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+    @staticmethod
+    def latest_run_id(directory: str) -> Optional[str]:
+        """Return the most recently modified run in ``directory``, if any."""
+        try:
+            runs = [entry for entry in os.scandir(directory) if entry.is_dir()]
+        except FileNotFoundError:
+            return None
+        if not runs:
+            return None
+        return max(runs, key=lambda entry: entry.stat().st_mtime).name
+
+    @property
+    def run_dir(self) -> str:
+        return os.path.join(self.directory, self.run_id)
+
+    def for_repository(self, owner: str, repo_name: str) -> RepositoryCheckpoint:
+        """Return the (shared) checkpoint of one repository in this run."""
+        key = (owner.lower(), repo_name.lower())
+        with self._lock:
+            if key not in self._checkpoints:
+                path = os.path.join(self.run_dir, f"{key[0]}__{key[1]}.json")
+                self._checkpoints[key] = RepositoryCheckpoint(path, self.run_id, f"{owner}/{repo_name}")
+            return self._checkpoints[key]
+
+    def discard(self) -> None:
+        """Delete the checkpoints of this run, e.g. once every repository in it finished."""
+        with self._lock:
+            self._checkpoints.clear()
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+        logger.debug(f"Discarded checkpoints of finished run {self.run_id}")
+
+
+def run_analysis_steps(
+    repo_data: RepositoryData,
+    steps: Sequence[Tuple[str, Callable[[RepositoryData], RepositoryData]]],
+    checkpoint: Optional[RepositoryCheckpoint] = None,
+    call: Optional[Callable[..., RepositoryData]] = None,
+    budgets: Optional[Dict[str, float]] = None,
+    optional_steps: Collection[str] = ()
+) -> RepositoryData:
+    """
+    Run named analysis steps, skipping those completed in a checkpoint.
+
+    Steps run one after another, so the fields each one wrote are found by
+    comparing the data before and after it.
+
+    Each step runs under the current deadline narrowed by its budget (see
+    deadline.py), which ``call`` can use to bound its wait. An optional step
+    (e.g. LLM evaluation) whose time is up is skipped, and one that times
+    out is dropped, both recorded in ``repo_data.degradations``; other
+    steps re-raise the timeout.
+
+    Args:
+        repo_data: Repository data from acquisition
+        steps: (name, function) pairs, e.g. analysis_engine.ANALYSIS_STEPS
+        checkpoint: Optional checkpoint to restore from and record to
+        call: Runs ``call(step, repo_data)`` instead of ``step(repo_data)``,
+            e.g. to submit the step to a process pool
+        budgets: Optional seconds allowed per step, by step name
+        optional_steps: Steps that may be skipped when out of time
+
+    Returns:
+        The analyzed repository data
+    """
+    completed = checkpoint.completed() if checkpoint is not None else set()
+    deadline = current_deadline()
+    budgets = budgets or {}
+    for name, step in steps:
+        key = ANALYSIS_PREFIX + name
+        if key in completed:
+            checkpoint.restore(repo_data, [key])
+            logger.info(f"✓ Restored analysis step {name} from checkpoint")
+            continue
+        scope = deadline
+        if budgets.get(name):
+            scope = deadline.child(budgets[name]) if deadline is not None else Deadline(budgets[name])
+        optional = name in optional_steps
+        if optional and scope is not None and scope.expired:
+            record_degradation(repo_data, name, 'analysis deadline exhausted', 'skipped')
+            continue
+        before = repo_data.to_dict() if checkpoint is not None else None
+        try:
+            with deadline_scope(scope):
+                repo_data = call(step, repo_data) if call is not None else step(repo_data)
+        except (TimeoutError, FuturesTimeoutError) as e:
+            if not optional:
+                raise
+            record_degradation(repo_data, name, f"budget exhausted: {e or type(e).__name__}", 'skipped')
+            continue
+        if checkpoint is not None:
+            after = repo_data.to_dict()
+            checkpoint.record(key, {field: value for field, value in after.items() if before.get(field) != value})
+    return repo_data
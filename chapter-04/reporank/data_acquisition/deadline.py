@@ -0,0 +1,120 @@
+"""Deadlines and time budgets propagated through an analysis."""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from models.repository_data import RepositoryData
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when work is started after its deadline has passed."""
+    pass
+
+
+class Deadline:
+    """
+    A point in time by which some work must finish.
+
+    Deadlines nest: a stage budget is a child of the analysis deadline and
+    expires at whichever of the two comes first. Code that blocks (HTTP
+    requests, the clone, filesystem walks) bounds its own timeout with
+    timeout() and checks ``expired`` between units of work.
+
+    Example:
+        deadline = Deadline(600)
+        with deadline_scope(deadline.child(120)):
+            client.get_repository_info('django', 'django')  # timeout <= 120s
+    """
+
+    def __init__(self, seconds: Optional[float] = None, parent: Optional["Deadline"] = None):
+        """
+        Initialize the deadline.
+
+        Args:
+            seconds: Seconds from now; None or 0 means no limit of its own
+            parent: Enclosing deadline, which this one never outlasts
+        """
+        self.parent = parent
+        expires_at = time.monotonic() + seconds if seconds else None
+        if parent is not None and parent.expires_at is not None:
+            expires_at = parent.expires_at if expires_at is None else min(expires_at, parent.expires_at)
+        self.expires_at = expires_at
+
+    def child(self, seconds: Optional[float]) -> "Deadline":
+        """Return a budget of ``seconds`` that also ends with this deadline."""
+        return Deadline(seconds, parent=self)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (0 once expired), or None without a limit."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """
+        Bound a timeout by the time left.
+
+        Args:
+            default: The operation's own timeout (None = none)
+
+        Returns:
+            The smaller of ``default`` and the remaining time
+
+        Raises:
+            DeadlineExceeded: If the deadline has already passed
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if remaining <= 0:
+            raise DeadlineExceeded("Deadline exceeded")
+        return remaining if default is None else min(default, remaining)
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar('reporank_deadline', default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the running analysis or stage, if any."""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """
+    Make ``deadline`` the current deadline inside the block.
+
+    The deadline follows the context into threads only when the work is
+    submitted through contextvars.copy_context().run, as StageExecutor and
+    AsyncGitHubClient do.
+    """
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def record_degradation(repo_data: RepositoryData, stage: str, reason: str, fallback: str) -> None:
+    """
+    Note on repo_data that a stage fell back to a cheaper result.
+
+    Args:
+        repo_data: Repository data being populated
+        stage: Stage or analysis step name
+        reason: Why it degraded, e.g. "budget exhausted"
+        fallback: What was used instead, e.g. "API-only"
+    """
+    repo_data.degradations.append({'stage': stage, 'reason': reason, 'fallback': fallback})
+    logger.warning(f"⚠ Stage {stage} degraded to {fallback}: {reason}")
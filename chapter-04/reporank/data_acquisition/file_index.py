@@ -0,0 +1,251 @@
+"""In-memory index of the files in a repository tree."""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from data_acquisition import graphql_queries
+from data_acquisition.deadline import current_deadline
+
+
+# Directories excluded from extension statistics (same as RepositoryAnalyzer)
+SKIP_DIRS = {
+    '.git', 'node_modules', 'venv', '__pycache__',
+    'dist', 'build', '.venv', 'env', '.env',
+    'target', 'bin', 'obj', '.idea', '.vscode'
+}
+
+# Dependency manifests understood by RepositoryAnalyzer.extract_dependencies()
+MANIFEST_FILES = {
+    'requirements.txt', 'pyproject.toml', 'Pipfile', 'package.json', 'package-lock.json',
+    'go.mod', 'Cargo.toml', 'pom.xml', 'build.gradle', 'build.gradle.kts'
+}
+
+# Extensions of files that are never read as text
+BINARY_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.webp', '.tiff', '.psd',
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.tar', '.jar', '.war', '.whl',
+    '.exe', '.dll', '.so', '.dylib', '.o', '.a', '.lib', '.class', '.pyc', '.wasm',
+    '.pdf', '.woff', '.woff2', '.ttf', '.otf', '.eot',
+    '.mp3', '.mp4', '.wav', '.ogg', '.avi', '.mov', '.webm',
+    '.bin', '.dat', '.db', '.sqlite', '.npy', '.pkl', '.parquet',
+})
+
+# Language of source files by extension
+LANGUAGES = {
+    '.py': 'Python', '.js': 'JavaScript', '.jsx': 'JavaScript', '.mjs': 'JavaScript',
+    '.ts': 'TypeScript', '.tsx': 'TypeScript', '.java': 'Java', '.kt': 'Kotlin',
+    '.go': 'Go', '.rs': 'Rust', '.c': 'C', '.h': 'C', '.cc': 'C++', '.cpp': 'C++',
+    '.hpp': 'C++', '.cs': 'C#', '.rb': 'Ruby', '.php': 'PHP', '.swift': 'Swift',
+    '.scala': 'Scala', '.sh': 'Shell', '.html': 'HTML', '.css': 'CSS',
+}
+
+
+@dataclass
+class IndexedFile:
+    """A file (blob) in the index."""
+
+    path: str
+    size: int = 0
+    sha: str = ''
+    binary: bool = False
+
+    @property
+    def extension(self) -> str:
+        """Lower-cased extension of the file name, e.g. '.py' ('' if none)."""
+        return file_extension(self.path.rsplit('/', 1)[-1])
+
+
+class FileIndex:
+    """
+    Path index of a repository tree.
+
+    Answers existence, size and extension questions from one listing of the
+    tree instead of one request or filesystem probe per path. Paths are
+    relative to the repository root and use forward slashes.
+
+    Example:
+        index = client.get_tree_index(owner, repo)
+        index.first_existing(['SECURITY.md', '.github/SECURITY.md'])
+        index.extension_counts()
+    """
+
+    def __init__(self, files: Iterable[IndexedFile], truncated: bool = False):
+        """
+        Initialize the index.
+
+        Args:
+            files: Files (blobs) of the tree
+            truncated: True if the listing is incomplete, so a missing path
+                does not prove the file doesn't exist
+        """
+        self.files: Dict[str, IndexedFile] = {f.path: f for f in files}
+        self.truncated = truncated
+
+    @classmethod
+    def from_git_tree(cls, tree: Dict[str, Any]) -> "FileIndex":
+        """
+        Build an index from a recursive ``/git/trees/{ref}`` API response.
+
+        Args:
+            tree: Parsed JSON of the trees endpoint
+
+        Returns:
+            FileIndex of the blobs in the tree (submodules and directories skipped)
+        """
+        files = [
+            IndexedFile(
+                path=entry['path'], size=entry.get('size', 0), sha=entry.get('sha', ''),
+                binary=is_binary_path(entry['path'])
+            )
+            for entry in tree.get('tree', [])
+            if entry.get('type') == 'blob'
+        ]
+        return cls(files, truncated=bool(tree.get('truncated')))
+
+    @classmethod
+    def from_directory(cls, root: str) -> "FileIndex":
+        """
+        Build an index of a checked-out repository in one os.scandir() pass.
+
+        Directories in SKIP_DIRS are not entered, so the index answers
+        extension, selection and manifest questions for the clone without
+        further filesystem walks. Files are classified as binary by
+        extension, without being opened. If the current deadline passes,
+        the scan stops and the index is marked ``truncated``.
+
+        Args:
+            root: Repository root directory
+
+        Returns:
+            FileIndex of the files under root
+        """
+        files: List[IndexedFile] = []
+        deadline = current_deadline()
+        truncated = False
+        pending = ['']  # Directories to scan, relative to root
+        while pending:
+            if deadline is not None and deadline.expired:
+                truncated = True
+                break
+            relative_dir = pending.pop()
+            try:
+                entries = list(os.scandir(os.path.join(root, relative_dir) if relative_dir else root))
+            except OSError:
+                continue
+            for entry in entries:
+                path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    # Like os.walk: symlinked directories are neither entered nor counted as files
+                    if entry.name not in SKIP_DIRS and not entry.is_symlink():
+                        pending.append(path)
+                    continue
+                try:
+                    size = entry.stat().st_size
+                except OSError:
+                    size = 0  # Broken symlink
+                files.append(IndexedFile(path=path, size=size, binary=is_binary_path(entry.name)))
+        return cls(files, truncated=truncated)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.files
+
+    def __iter__(self) -> Iterator[IndexedFile]:
+        return iter(self.files.values())
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def first_existing(self, paths: Iterable[str]) -> Optional[str]:
+        """Return the first of the candidate paths present in the index, or None."""
+        for path in paths:
+            if path in self.files:
+                return path
+        return None
+
+    def size(self, path: str) -> Optional[int]:
+        """Return the size of a file in bytes, or None if it isn't indexed."""
+        entry = self.files.get(path)
+        return entry.size if entry else None
+
+    def _skipped(self, path: str) -> bool:
+        return any(part in SKIP_DIRS for part in path.split('/')[:-1])
+
+    def extension_counts(self) -> Dict[str, int]:
+        """
+        Count file extensions like RepositoryAnalyzer.analyze_file_extensions().
+
+        Returns:
+            Dictionary mapping extensions to counts, e.g., {'.py': 150, '.js': 45}
+        """
+        extension_counts: Dict[str, int] = {}
+        for path in self.files:
+            if self._skipped(path):
+                continue
+            ext = self.files[path].extension
+            if ext:
+                extension_counts[ext] = extension_counts.get(ext, 0) + 1
+        return extension_counts
+
+    def manifests(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Find dependency manifests anywhere in the tree.
+
+        Args:
+            names: File names to look for (defaults to MANIFEST_FILES)
+
+        Returns:
+            Sorted manifest paths, excluding vendored/skipped directories
+        """
+        wanted = set(names) if names is not None else MANIFEST_FILES
+        return sorted(
+            path for path in self.files
+            if path.rsplit('/', 1)[-1] in wanted and not self._skipped(path)
+        )
+
+    def security_files(self) -> Dict[str, bool]:
+        """
+        Answer check_security_files() from the index (without code scanning).
+
+        Returns:
+            Dictionary with has_security_md, has_security_policy and has_dependabot
+        """
+        has_security_md = self.first_existing(graphql_queries.SECURITY_MD_PATHS) is not None
+        return {
+            'has_security_md': has_security_md,
+            'has_security_policy': has_security_md,
+            'has_dependabot': self.first_existing(graphql_queries.DEPENDABOT_PATHS) is not None,
+        }
+
+
+def file_extension(name: str) -> str:
+    """
+    Lower-cased extension of a file name, as os.path.splitext() finds it.
+
+    Cheaper than splitext() on large trees; leading dots are not an
+    extension ('.bashrc' -> '').
+    """
+    dot = name.rfind('.')
+    if dot <= 0 or not name[:dot].lstrip('.'):
+        return ''
+    return name[dot:].lower()
+
+
+def is_binary_path(path: str) -> bool:
+    """True if the file name has an extension of BINARY_EXTENSIONS."""
+    return file_extension(path.rsplit('/', 1)[-1]) in BINARY_EXTENSIONS
+
+
+def language_for_path(path: str) -> str:
+    """Language of a file by its extension (see LANGUAGES), or '' if unknown."""
+    return LANGUAGES.get(file_extension(path.rsplit('/', 1)[-1]), '')
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Content hash of a file as git computes it, i.e. the blob id IndexedFile.sha holds."""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
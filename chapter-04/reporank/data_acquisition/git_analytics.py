@@ -0,0 +1,163 @@
+"""Contributor and churn analytics accumulated from a streamed git log."""
+
+import random
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+
+# Files whose churn is tracked at once; above this the least-churned half is dropped
+HOT_SPOT_TRACKED = 10000
+
+# Files reported as churn hot spots
+HOT_SPOT_COUNT = 10
+
+# Commits whose author-to-commit delay is sampled for the latency percentiles
+LATENCY_SAMPLE_SIZE = 2000
+
+# Share of the window's commits the bus-factor authors must account for
+BUS_FACTOR_SHARE = 0.5
+
+
+class GitAnalytics:
+    """
+    Contributor, churn and bus-factor statistics over a window of git history.
+
+    Fed one commit at a time by RepositoryAnalyzer.analyze_git_history() as
+    it streams ``git log``, so memory is bounded by the number of authors,
+    HOT_SPOT_TRACKED files and LATENCY_SAMPLE_SIZE delays, not by the
+    length of the history. Hot spots are approximate once more than
+    HOT_SPOT_TRACKED files change in the window.
+
+    Without file contents (blobless clones) churn counts commits per file
+    instead of changed lines, and lines added/removed are not reported.
+
+    Example:
+        analytics = GitAnalytics(churn_unit='lines')
+        analytics.add_commit(committed=ts, authored=ts, author='a@example.com')
+        analytics.add_file_change('src/app.py', added=10, removed=2)
+        analytics.result()
+    """
+
+    def __init__(self, churn_unit: str = 'lines', window_days: int = 365):
+        """
+        Initialize the accumulator.
+
+        Args:
+            churn_unit: 'lines' when numstat line counts are fed, else 'commits'
+            window_days: Length of the history window, for the result
+        """
+        self.churn_unit = churn_unit
+        self.window_days = window_days
+        self.commits = 0
+        self._authors_by_month: Dict[str, Set[str]] = defaultdict(set)
+        self._author_commits: Dict[str, int] = defaultdict(int)
+        self._lines_added: Dict[str, int] = defaultdict(int)
+        self._lines_removed: Dict[str, int] = defaultdict(int)
+        self._file_churn: Dict[str, int] = defaultdict(int)
+        self._file_commits: Dict[str, int] = defaultdict(int)
+        self._latencies: List[float] = []
+        self._latencies_seen = 0
+        self._random = random.Random(0)  # Reproducible latency sample
+        self._month: Optional[str] = None
+
+    def add_commit(self, committed: int, authored: int, author: str) -> None:
+        """
+        Count a commit inside the window.
+
+        Args:
+            committed: Committer timestamp (when it landed on the branch)
+            authored: Author timestamp (when it was written)
+            author: Author identity, e.g. the mailmapped email
+        """
+        self.commits += 1
+        self._month = datetime.fromtimestamp(committed).strftime('%Y-%m')
+        self._authors_by_month[self._month].add(author)
+        self._author_commits[author] += 1
+
+        # Reservoir sample of author-to-commit delays
+        self._latencies_seen += 1
+        delay = max(0, committed - authored) / 3600
+        if len(self._latencies) < LATENCY_SAMPLE_SIZE:
+            self._latencies.append(delay)
+        else:
+            slot = self._random.randrange(self._latencies_seen)
+            if slot < LATENCY_SAMPLE_SIZE:
+                self._latencies[slot] = delay
+
+    def add_file_change(self, path: str, added: Optional[int] = None, removed: Optional[int] = None) -> None:
+        """
+        Count a file changed by the last commit passed to add_commit().
+
+        Args:
+            path: Changed file
+            added: Lines added (None without line counts or for binary files)
+            removed: Lines removed
+        """
+        if self._month is None:
+            return
+        self._file_commits[path] += 1
+        if self.churn_unit == 'lines':
+            self._lines_added[self._month] += added or 0
+            self._lines_removed[self._month] += removed or 0
+            self._file_churn[path] += (added or 0) + (removed or 0)
+        else:
+            self._file_churn[path] += 1
+        if len(self._file_churn) > HOT_SPOT_TRACKED:
+            self._prune_files()
+
+    def _prune_files(self) -> None:
+        keep = sorted(self._file_churn, key=self._file_churn.get, reverse=True)[:HOT_SPOT_TRACKED // 2]
+        self._file_churn = defaultdict(int, {path: self._file_churn[path] for path in keep})
+        self._file_commits = defaultdict(int, {path: self._file_commits[path] for path in keep})
+
+    def bus_factor(self) -> int:
+        """Fewest authors who together made BUS_FACTOR_SHARE of the window's commits."""
+        covered, factor = 0, 0
+        for count in sorted(self._author_commits.values(), reverse=True):
+            if covered >= self.commits * BUS_FACTOR_SHARE:
+                break
+            covered += count
+            factor += 1
+        return factor
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Summarize the window.
+
+        Returns:
+            Dictionary with window_days, commits, authors,
+            active_authors_by_month, lines_added_by_month and
+            lines_removed_by_month (empty without line counts), churn_unit,
+            hot_spots, bus_factor and time_to_land_hours (median and p90 of
+            the delay between authoring and committing, a proxy for review
+            and merge response time)
+        """
+        hot_spots = sorted(self._file_churn.items(), key=lambda item: item[1], reverse=True)[:HOT_SPOT_COUNT]
+        latencies = sorted(self._latencies)
+        return {
+            'window_days': self.window_days,
+            'commits': self.commits,
+            'authors': len(self._author_commits),
+            'active_authors_by_month': {
+                month: len(authors) for month, authors in sorted(self._authors_by_month.items())
+            },
+            'lines_added_by_month': dict(sorted(self._lines_added.items())),
+            'lines_removed_by_month': dict(sorted(self._lines_removed.items())),
+            'churn_unit': self.churn_unit,
+            'hot_spots': [
+                {'path': path, 'churn': churn, 'commits': self._file_commits[path]}
+                for path, churn in hot_spots
+            ],
+            'bus_factor': self.bus_factor(),
+            'time_to_land_hours': {
+                'median': round(_percentile(latencies, 0.5), 1) if latencies else None,
+                'p90': round(_percentile(latencies, 0.9), 1) if latencies else None,
+            },
+        }
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
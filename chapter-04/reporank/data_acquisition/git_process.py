@@ -0,0 +1,102 @@
+"""Running the git executable with timeouts."""
+
+import os
+import shutil
+import signal
+import subprocess
+from typing import Iterator, List, Optional
+
+
+def git_available() -> bool:
+    """Return True if the git executable is on PATH."""
+    return shutil.which('git') is not None
+
+
+def run_git(
+    args: List[str],
+    timeout: Optional[float] = None,
+    cwd: Optional[str] = None,
+    input: Optional[str] = None
+) -> str:
+    """
+    Run a git command, killing it and its helpers on timeout.
+
+    git starts helper processes (git-remote-https, index-pack) that would
+    keep running, and keep the output pipes open, if only git itself were
+    killed, so the command gets its own process group.
+
+    Args:
+        args: Arguments after ``git``, e.g. ['fetch', '--prune', 'origin']
+        timeout: Seconds before the command is killed (None = no limit)
+        cwd: Working directory
+        input: Text written to the command's standard input
+
+    Returns:
+        The command's standard output
+
+    Raises:
+        subprocess.TimeoutExpired: If the command did not finish in time
+        subprocess.CalledProcessError: If the command failed (stderr attached)
+    """
+    command = ['git'] + list(args)
+    # Never block on a credential prompt
+    env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+    process = subprocess.Popen(
+        command, stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        cwd=cwd, env=env, start_new_session=hasattr(os, 'killpg')
+    )
+    try:
+        stdout, stderr = process.communicate(input=input, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        if hasattr(os, 'killpg'):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+        process.communicate()
+        raise
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, output=stdout, stderr=stderr)
+    return stdout
+
+
+def iter_git_lines(args: List[str], cwd: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream the output of a git command line by line.
+
+    Memory stays bounded however long the output is. Closing the iterator
+    early (or breaking out of a for loop over it) kills git.
+
+    Args:
+        args: Arguments after ``git``, e.g. ['log', '--format=%ct']
+        cwd: Working directory
+
+    Yields:
+        Output lines without the trailing newline
+
+    Raises:
+        subprocess.CalledProcessError: If the command failed (stderr attached)
+    """
+    command = ['git'] + list(args)
+    env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+    process = subprocess.Popen(
+        command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, errors='replace', cwd=cwd, env=env, start_new_session=hasattr(os, 'killpg')
+    )
+    finished = False
+    try:
+        for line in process.stdout:
+            yield line.rstrip('\n')
+        finished = True
+    finally:
+        if not finished and process.poll() is None:
+            if hasattr(os, 'killpg'):
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        process.wait()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr)
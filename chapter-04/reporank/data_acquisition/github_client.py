@@ -1,20 +1,72 @@
 """GitHub API client for repository data acquisition."""
 
+import codecs
+import io
+import os
+import threading
 import time
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, urlparse
+from typing import BinaryIO, Callable, Dict, List, Optional, Any, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 
+from data_acquisition import graphql_queries
+from data_acquisition.cassette import FaultInjector, install_cassette
+from data_acquisition.deadline import Deadline, DeadlineExceeded, current_deadline
+from data_acquisition.file_index import FileIndex
+from data_acquisition.http_cache import ResponseCache
+from data_acquisition.telemetry import RequestMetrics
+from data_acquisition.rate_limiter import RateLimitScheduler, RateLimitExhausted, TokenState
 from utils.logger import get_logger
 
 
 logger = get_logger(__name__)
 
+# Number of repository tree indexes kept in memory
+TREE_INDEX_CACHE_SIZE = 16
+
 
 class GitHubAPIError(Exception):
     """Base exception for GitHub API errors."""
     pass
 
 
+class _ResponseStream(io.RawIOBase):
+    """Readable file object over a streamed response body, e.g. for tarfile stream mode."""
+    
+    def __init__(self, response: requests.Response, on_close: Optional[Callable[[int], None]] = None):
+        self._response = response
+        self._chunks = response.iter_content(chunk_size=64 * 1024)
+        self._pending = b''
+        self._on_close = on_close
+        self.bytes_read = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        self.bytes_read += size
+        return size
+    
+    def close(self) -> None:
+        if not self.closed:
+            self._response.close()
+            if self._on_close is not None:
+                self._on_close(self.bytes_read)
+        super().close()
+
+
 class RateLimitError(GitHubAPIError):
     """Exception raised when GitHub API rate limit is exceeded."""
     
@@ -32,6 +84,8 @@ class GitHubClient:
     - Authenticated: 5,000 requests/hour
     
     Implements retry logic with exponential backoff for transient failures.
+    An optional ResponseCache revalidates GET responses with ETag/Last-Modified
+    so unchanged resources are answered with 304s that don't use rate limit.
     """
     
     def __init__(
@@ -39,7 +93,14 @@ class GitHubClient:
         token: Optional[str] = None,
         base_url: str = "https://api.github.com",
         timeout: int = 30,
-        max_retries: int = 3
+        max_retries: int = 3,
+        cache: Optional[ResponseCache] = None,
+        pool_size: int = 10,
+        tokens: Optional[List[str]] = None,
+        rate_limiter: Optional[RateLimitScheduler] = None,
+        readme_max_bytes: Optional[int] = 256 * 1024,
+        metrics: Optional[RequestMetrics] = None,
+        stats_workers: int = 4
     ):
         """
         Initialize GitHub API client.
@@ -49,25 +110,146 @@ class GitHubClient:
             base_url: GitHub API base URL
             timeout: Request timeout in seconds
             max_retries: Maximum number of retry attempts for failed requests
+            cache: Optional on-disk response cache for conditional requests
+            pool_size: Maximum number of pooled connections kept per host
+            tokens: Optional pool of tokens to rotate across (overrides token)
+            rate_limiter: Optional scheduler; one is created for the token pool if None
+            readme_max_bytes: Bytes of README downloaded at most (None for no cap)
+            metrics: Optional registry to share; a new one is created if None
+            stats_workers: Threads polling deferred commit stats (see
+                request_commit_activity()); one per concurrent repository
+                keeps polls from queueing behind each other
         """
-        self.token = token
+        tokens = [t for t in (tokens or []) if t] or [token]
+        self.token = tokens[0]
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
         self.max_retries = max_retries
+        self.cache = cache
+        # Cached responses are keyed by the token set, never shared across credentials
+        self._cache_principal = ResponseCache.principal_for(tokens)
+        self.readme_max_bytes = readme_max_bytes
+        
+        # Per-endpoint latency, status, retry, byte and rate-limit metrics
+        self.metrics = metrics or RequestMetrics()
+        
+        # Background pool for deferred stats polling (threads start on first use)
+        self._background = ThreadPoolExecutor(max_workers=max(1, stats_workers), thread_name_prefix='github-stats')
+        
+        # GraphQL point-cost accounting (separate budget from REST)
+        self.graphql_points_used = 0
+        self.graphql_rate_limit: Dict[str, Any] = {}
+        
+        # Recently fetched tree indexes, shared by the checks of one repository
+        self._tree_indexes: "OrderedDict[Tuple[str, str, str], FileIndex]" = OrderedDict()
+        self._tree_lock = threading.Lock()
         
         # Set up session with default headers
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'Accept': 'application/vnd.github.v3+json',
             'User-Agent': 'RepoRank/0.1.0'
         })
         
+        # Authorization is set per request by the scheduler's chosen token
+        self.rate_limiter = rate_limiter or RateLimitScheduler(tokens)
+        
         if self.token:
-            self.session.headers['Authorization'] = f'token {self.token}'
-            logger.info("GitHub client initialized with authentication")
+            logger.info(f"GitHub client initialized with authentication ({len(tokens)} token(s))")
         else:
             logger.info("GitHub client initialized without authentication (60 req/hr limit)")
     
+    @classmethod
+    def from_config(
+        cls, config, pool_size: Optional[int] = None, stats_workers: int = 4
+    ) -> "GitHubClient":
+        """
+        Create a client from a Config instance.
+        
+        Args:
+            config: RepoRank configuration
+            pool_size: Pooled connections per host (default: api_concurrency);
+                fleet runs share one client across repositories and need more
+            stats_workers: Threads polling deferred commit stats, at least
+                the number of repositories analyzed at once
+            
+        Returns:
+            Configured GitHubClient (with response cache if enabled, and
+            a record/replay cassette if ``cassette_path`` is set)
+        """
+        cache = None
+        # A cassette must see (and replay) full responses, not cache hits or 304s
+        if config.http_cache_enabled and not config.cassette_path:
+            cache = ResponseCache(
+                cache_dir=config.http_cache_dir or os.path.join(config.temp_dir, 'http_cache'),
+                max_size_bytes=config.http_cache_max_mb * 1024 * 1024,
+                ttls=config.http_cache_ttls
+            )
+        
+        pool_size = pool_size or config.api_concurrency
+        tokens = config.get_github_tokens()
+        rate_limiter = RateLimitScheduler(
+            tokens or [None],
+            reserve_fraction=config.rate_limit_reserve_fraction,
+            max_wait=config.rate_limit_max_wait
+        )
+        
+        client = cls(
+            token=config.github_token,
+            tokens=tokens,
+            rate_limiter=rate_limiter,
+            base_url=config.github_api_base_url,
+            timeout=config.api_timeout,
+            max_retries=config.max_retries,
+            cache=cache,
+            pool_size=pool_size,
+            readme_max_bytes=config.readme_max_kb * 1024 if config.readme_max_kb else None,
+            stats_workers=stats_workers
+        )
+        
+        if config.cassette_path:
+            faults = None
+            if config.cassette_faults:
+                faults = FaultInjector.parse(config.cassette_faults, seed=config.cassette_seed)
+            install_cassette(
+                client.session,
+                config.cassette_path,
+                mode=config.cassette_mode,
+                latency=config.cassette_latency,
+                faults=faults,
+                pool_connections=pool_size,
+                pool_maxsize=pool_size
+            )
+        return client
+    
+    @property
+    def cache_hits(self) -> int:
+        """Number of requests answered from the response cache."""
+        return self.cache.stats.hits if self.cache is not None else 0
+    
+    @property
+    def cache_misses(self) -> int:
+        """Number of cacheable requests that had to be downloaded."""
+        return self.cache.stats.misses if self.cache is not None else 0
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get response cache counters.
+        
+        Returns:
+            Dictionary with hits, misses, revalidations, evictions and hit ratio
+            (empty if caching is disabled)
+        """
+        if self.cache is None:
+            return {}
+        stats = self.cache.stats.to_dict()
+        stats['entries'] = len(self.cache)
+        stats['size_bytes'] = self.cache.size_bytes
+        return stats
+    
     def _make_request(
         self,
         method: str,
@@ -77,30 +259,91 @@ class GitHubClient:
         """
         Make HTTP request with retry logic and rate limit handling.
         
+        Under a deadline (see deadline.py) each attempt's timeout, the wait
+        for rate-limit headroom and retry backoff are bounded by the time
+        left, and the request fails instead of starting after the deadline.
+        
         Args:
             method: HTTP method (GET, POST, etc.)
             endpoint: API endpoint path
-            **kwargs: Additional arguments to pass to requests
+            **kwargs: Additional arguments to pass to requests; ``max_bytes``
+                streams the body and keeps at most that many bytes of it
             
         Returns:
             Response object
             
         Raises:
             RateLimitError: When rate limit is exceeded
-            GitHubAPIError: For other API errors
+            GitHubAPIError: For other API errors, or when the deadline passed
         """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         kwargs.setdefault('timeout', self.timeout)
+        request_timeout = kwargs['timeout']
+        deadline = current_deadline()
+        max_bytes = kwargs.pop('max_bytes', None)
+        if max_bytes is not None:
+            kwargs['stream'] = True
+        
+        # Serve fresh entries from the cache, revalidate stale ones
+        # (capped bodies are read before storing, so they are cacheable, keyed by their cap)
+        cache_key = None
+        cached = None
+        if self.cache is not None and method.upper() == 'GET' and (not kwargs.get('stream') or max_bytes is not None):
+            cache_key = self.cache.make_key(
+                method, url, kwargs.get('params'), kwargs.get('headers'), principal=self._cache_principal,
+                max_bytes=max_bytes
+            )
+            cached = self.cache.get(cache_key)
+            if cached and self.cache.is_fresh(cached):
+                self.cache.record_hit(cache_key)
+                self.metrics.record_cache(method, endpoint, 'hit')
+                logger.debug(f"Cache hit for {endpoint}")
+                return cached.to_response(url)
+            if cached:
+                headers = dict(kwargs.get('headers') or {})
+                headers.update(cached.validators())
+                kwargs['headers'] = headers
+        
+        resource = 'graphql' if endpoint.strip('/') == 'graphql' else 'core'
         
         for attempt in range(self.max_retries):
             try:
                 logger.debug(f"Making {method} request to {endpoint} (attempt {attempt + 1}/{self.max_retries})")
-                response = self.session.request(method, url, **kwargs)
+                if deadline is not None:
+                    kwargs['timeout'] = self._deadline_timeout(deadline, request_timeout, endpoint)
+                token_state = self._acquire_token(resource, deadline)
+                response = None
+                started = time.perf_counter()
+                try:
+                    response = self.session.request(method, url, **self._with_auth(kwargs, token_state))
+                finally:
+                    self.rate_limiter.release(
+                        token_state, resource,
+                        response.headers if response is not None else None
+                    )
+                    self._observe(method, endpoint, resource, response, time.perf_counter() - started, kwargs)
+                
+                # Secondary rate limits: pause only this token and retry
+                if response.status_code in (403, 429):
+                    retry_after = self._secondary_retry_after(response)
+                    if retry_after is not None:
+                        self.rate_limiter.block(token_state, retry_after)
+                        if attempt < self.max_retries - 1:
+                            self.metrics.record_retry(method, endpoint, 'secondary_rate_limit')
+                            continue
+                        raise GitHubAPIError(
+                            f"Secondary rate limit hit for {endpoint}; retry after {retry_after}s"
+                        )
                 
                 # Check for rate limiting
                 if response.status_code == 403:
                     rate_limit_remaining = response.headers.get('X-RateLimit-Remaining', '0')
                     if rate_limit_remaining == '0':
+                        if attempt < self.max_retries - 1 and len(self.rate_limiter.tokens) > 1:
+                            # The scheduler now knows this token is empty and will pick another
+                            logger.warning(f"Rate limit exhausted for {token_state.label}, rotating token")
+                            self.metrics.record_retry(method, endpoint, 'rate_limit_rotate')
+                            continue
                         reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
                         reset_datetime = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(reset_time))
                         error_msg = f"GitHub API rate limit exceeded. Resets at {reset_datetime}"
@@ -127,6 +370,21 @@ class GitHubClient:
                 if rate_limit_remaining and rate_limit_limit:
                     logger.debug(f"Rate limit: {rate_limit_remaining}/{rate_limit_limit} remaining")
                 
+                if max_bytes is not None and response.status_code == 200:
+                    self._read_capped(response, max_bytes)
+                    self.metrics.add_bytes(method, endpoint, len(response.content))
+                
+                if cache_key:
+                    if response.status_code == 304 and cached:
+                        logger.debug(f"Cache revalidated for {endpoint} (304 Not Modified)")
+                        self.cache.revalidated(cached)
+                        self.metrics.record_cache(method, endpoint, 'revalidated')
+                        return cached.to_response(url)
+                    self.cache.record_miss()
+                    self.metrics.record_cache(method, endpoint, 'miss')
+                    if response.status_code == 200:
+                        self.cache.store(cache_key, endpoint, response)
+                
                 return response
                 
             except requests.exceptions.Timeout as e:
@@ -148,7 +406,8 @@ class GitHubClient:
                     )
                     logger.error(error_msg, extra={'endpoint': endpoint})
                     raise GitHubAPIError(error_msg) from e
-                time.sleep(wait_time)  # Exponential backoff
+                self.metrics.record_retry(method, endpoint, 'timeout', wait_time)
+                self._backoff(wait_time, deadline, endpoint, e)
                 
             except requests.exceptions.ConnectionError as e:
                 wait_time = 2 ** attempt
@@ -170,20 +429,118 @@ class GitHubClient:
                     )
                     logger.error(error_msg, extra={'endpoint': endpoint})
                     raise GitHubAPIError(error_msg) from e
-                time.sleep(wait_time)  # Exponential backoff
+                self.metrics.record_retry(method, endpoint, 'connection', wait_time)
+                self._backoff(wait_time, deadline, endpoint, e)
                 
             except requests.exceptions.HTTPError as e:
-                # Don't retry on client errors (4xx except 429)
-                if e.response.status_code == 429:  # Too Many Requests
-                    retry_after = int(e.response.headers.get('Retry-After', 60))
-                    logger.warning(f"Rate limited, waiting {retry_after} seconds")
-                    if attempt < self.max_retries - 1:
-                        time.sleep(retry_after)
-                        continue
+                # Don't retry on client errors (429s are handled above)
                 raise GitHubAPIError(f"HTTP error: {e}") from e
         
         raise GitHubAPIError(f"Request failed after {self.max_retries} attempts")
     
+    def _observe(
+        self,
+        method: str,
+        endpoint: str,
+        resource: str,
+        response: Optional[requests.Response],
+        seconds: float,
+        kwargs: Dict[str, Any]
+    ) -> None:
+        """Record one round trip in the metrics registry."""
+        if response is None:
+            self.metrics.observe_request(method, endpoint, 'error', seconds)
+            return
+        # Streamed bodies are counted when they are read
+        size = 0 if kwargs.get('stream') else len(response.content)
+        self.metrics.observe_request(method, endpoint, response.status_code, seconds, size)
+        self.metrics.record_rate_limit(resource, response.headers)
+    
+    @staticmethod
+    def _read_capped(response: requests.Response, max_bytes: int) -> bool:
+        """
+        Read a streamed body incrementally, stopping after max_bytes.
+        
+        The connection is closed early when the cap is reached, so neither
+        memory nor transfer grows with the size of the resource. The bytes
+        read become ``response.content``.
+        
+        Args:
+            response: Response requested with stream=True
+            max_bytes: Maximum number of body bytes to keep
+            
+        Returns:
+            True if the body was truncated
+        """
+        chunks = []
+        received = 0
+        truncated = False
+        for chunk in response.iter_content(chunk_size=min(max(max_bytes, 1), 64 * 1024)):
+            chunks.append(chunk[:max_bytes - received])
+            received += len(chunks[-1])
+            if received >= max_bytes:
+                truncated = True
+                break
+        response.close()
+        response._content = b''.join(chunks)
+        response._content_consumed = True
+        return truncated
+    
+    def _acquire_token(self, resource: str, deadline: Optional[Deadline] = None) -> TokenState:
+        """Reserve a request slot from the scheduler, mapping exhaustion to RateLimitError."""
+        max_wait = deadline.remaining() if deadline is not None else None
+        try:
+            return self.rate_limiter.acquire(resource, max_wait=max_wait)
+        except RateLimitExhausted as e:
+            logger.error(str(e), extra={'reset_time': e.reset_time})
+            raise RateLimitError(str(e), e.reset_time) from e
+    
+    @staticmethod
+    def _deadline_timeout(deadline: Deadline, timeout: Any, endpoint: str) -> Any:
+        """Bound a request timeout (seconds or a (connect, read) tuple) by the deadline."""
+        try:
+            if isinstance(timeout, tuple):
+                return tuple(deadline.timeout(part) for part in timeout)
+            return deadline.timeout(timeout)
+        except DeadlineExceeded as e:
+            raise GitHubAPIError(f"Deadline exceeded before requesting {endpoint}") from e
+    
+    @staticmethod
+    def _backoff(wait_time: float, deadline: Optional[Deadline], endpoint: str, error: Exception) -> None:
+        """Sleep before a retry (exponential backoff), unless the deadline comes first."""
+        remaining = deadline.remaining() if deadline is not None else None
+        if remaining is not None and remaining <= wait_time:
+            raise GitHubAPIError(f"Deadline exceeded while retrying {endpoint}: {error}") from error
+        time.sleep(wait_time)
+    
+    @staticmethod
+    def _with_auth(kwargs: Dict[str, Any], token_state: TokenState) -> Dict[str, Any]:
+        """Return request kwargs carrying the Authorization header of the chosen token."""
+        if not token_state.token:
+            return kwargs
+        headers = dict(kwargs.get('headers') or {})
+        headers['Authorization'] = f'token {token_state.token}'
+        return dict(kwargs, headers=headers)
+    
+    @staticmethod
+    def _secondary_retry_after(response: requests.Response) -> Optional[int]:
+        """
+        Detect a secondary rate limit response.
+        
+        Returns:
+            Seconds to wait (Retry-After, or 60 as GitHub recommends when absent),
+            or None if this is not a secondary rate limit
+        """
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                return int(retry_after)
+            except ValueError:
+                return 60
+        if response.status_code == 429 or 'secondary rate limit' in response.text.lower():
+            return 60
+        return None
+    
     def get_repository_info(self, owner: str, repo: str) -> Dict[str, Any]:
         """
         Fetch repository metadata from GitHub API.
@@ -217,18 +574,24 @@ class GitHubClient:
             logger.error(f"Failed to fetch repository info for {owner}/{repo}: {e}")
             raise
     
-    def get_commit_activity(self, owner: str, repo: str) -> Dict[str, Any]:
+    def get_commit_activity(self, owner: str, repo: str, wait: float = 0.0) -> Dict[str, Any]:
         """
         Fetch commit activity statistics for a repository.
         
+        GitHub answers the stats endpoints with 202 Accepted while it computes
+        them for a cold repository. With ``wait`` > 0 the endpoints are
+        re-polled with backoff until data is ready or the time is up.
+        
         Args:
             owner: Repository owner
             repo: Repository name
+            wait: Seconds to keep re-polling 202 responses (0 polls once)
             
         Returns:
             Dictionary containing:
-            - total_commits: Total number of commits
+            - total_commits: Number of commits on the default branch
             - commit_activity: Weekly commit activity for the past year
+            - stats_pending: True if GitHub was still computing when polling stopped
             
         Raises:
             GitHubAPIError: If the request fails
@@ -236,52 +599,227 @@ class GitHubClient:
         logger.info(f"Fetching commit activity for {owner}/{repo}")
         
         try:
-            # Get total commit count from contributors endpoint
-            contributors_response = self._make_request(
-                'GET',
-                f'/repos/{owner}/{repo}/contributors',
-                params={'per_page': 1, 'anon': 'true'}
+            # Total commits on the default branch in one per_page=1 request;
+            # weekly activity is a fall back for when we can't analyze a clone
+            total_commits = self.count_commits(owner, repo)
+            stats, pending = self._poll_stats(
+                {'commit_activity': f'/repos/{owner}/{repo}/stats/commit_activity'},
+                wait=wait
             )
             
-            # Total commits is sum of all contributor commits
-            # For efficiency, we'll get it from the first page link header
-            total_commits = 0
-            try:
-                # Try to get from stats/contributors for more accurate count
-                stats_response = self._make_request(
-                    'GET',
-                    f'/repos/{owner}/{repo}/stats/contributors'
-                )
-                if stats_response.status_code == 200:
-                    stats_data = stats_response.json()
-                    if stats_data:
-                        total_commits = sum(contributor.get('total', 0) for contributor in stats_data)
-            except Exception as e:
-                logger.warning(f"Could not fetch detailed commit stats: {e}")
-            
-            # Get weekly commit activity
-            # This is like a fall back coz we will do an analysis of the repo
-            # and get the commits
-            activity_response = self._make_request(
-                'GET',
-                f'/repos/{owner}/{repo}/stats/commit_activity'
-            )
-            
-            commit_activity = []
-            if activity_response.status_code == 200:
-                commit_activity = activity_response.json() or []
+            commit_activity = stats.get('commit_activity') or []
             
+            if pending:
+                logger.warning(f"GitHub is still computing stats for {owner}/{repo}: {sorted(pending)}")
             logger.info(f"Successfully fetched commit activity for {owner}/{repo}")
             
             return {
                 'total_commits': total_commits,
-                'commit_activity': commit_activity
+                'commit_activity': commit_activity,
+                'stats_pending': bool(pending)
             }
             
         except Exception as e:
             logger.error(f"Failed to fetch commit activity for {owner}/{repo}: {e}")
             raise
     
+    def request_commit_activity(self, owner: str, repo: str, deadline: float = 60.0) -> Future:
+        """
+        Start fetching commit activity in the background.
+        
+        The stats requests are fired immediately; 202 responses are re-polled
+        with backoff on a background thread so the caller can continue with
+        other work and collect the result later.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            deadline: Seconds after which polling stops and partial data is returned
+            
+        Returns:
+            Future resolving to the get_commit_activity() dictionary
+        """
+        return self._background.submit(self.get_commit_activity, owner, repo, deadline)
+    
+    def close(self) -> None:
+        """Cancel queued stats polls, shut down the background pool and close the HTTP session."""
+        self._background.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+    
+    def _poll_stats(
+        self,
+        endpoints: Dict[str, str],
+        wait: float = 0.0,
+        optional: Optional[set] = None
+    ) -> Tuple[Dict[str, Any], set]:
+        """
+        Poll statistics endpoints until they stop answering 202 Accepted.
+        
+        Every round requests all still-pending endpoints, so GitHub computes
+        them in parallel, then backs off (1s, 2s, 4s, ... capped at 8s).
+        
+        Args:
+            endpoints: Mapping of result key to endpoint path
+            wait: Total seconds to keep polling (0 polls once)
+            optional: Keys whose request errors are logged instead of raised
+            
+        Returns:
+            Tuple of (results by key, keys still pending at the deadline)
+        """
+        optional = optional or set()
+        deadline_at = time.monotonic() + wait
+        results: Dict[str, Any] = {}
+        pending = set(endpoints)
+        backoff = 1.0
+        
+        while True:
+            for key in sorted(pending):
+                try:
+                    response = self._make_request('GET', endpoints[key])
+                except Exception as e:
+                    if key not in optional:
+                        raise
+                    logger.warning(f"Could not fetch detailed commit stats: {e}")
+                    pending.discard(key)
+                    continue
+                if response.status_code == 202:
+                    logger.debug(f"Stats not ready yet for {endpoints[key]} (202 Accepted)")
+                    continue
+                if response.status_code == 200:
+                    results[key] = response.json()
+                pending.discard(key)
+            
+            remaining = deadline_at - time.monotonic()
+            if not pending or remaining <= 0:
+                return results, pending
+            time.sleep(min(backoff, remaining))
+            backoff = min(backoff * 2, 8.0)
+    
+    def _count_items(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Count the items of a paginated list endpoint with a single request.
+        
+        Requests one item per page; the page number of the ``rel="last"``
+        link in the Link header is then the total item count. Lists that fit
+        on one page have no Link header and are counted directly.
+        
+        Args:
+            endpoint: API endpoint of a list resource
+            params: Additional query parameters
+            
+        Returns:
+            Total number of items
+            
+        Raises:
+            GitHubAPIError: If the request fails
+        """
+        response = self._make_request('GET', endpoint, params={**(params or {}), 'per_page': 1})
+        last = response.links.get('last', {}).get('url')
+        if last:
+            pages = parse_qs(urlparse(last).query).get('page')
+            if pages and pages[0].isdigit():
+                return int(pages[0])
+        if response.status_code == 204 or not response.content:
+            return 0
+        return len(response.json())
+    
+    def count_contributors(self, owner: str, repo: str, anon: bool = True) -> int:
+        """
+        Count repository contributors without fetching the contributor list.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            anon: Include anonymous (no GitHub account) contributors
+            
+        Returns:
+            Exact number of contributors
+            
+        Raises:
+            GitHubAPIError: If the request fails
+        """
+        logger.info(f"Counting contributors for {owner}/{repo}")
+        
+        try:
+            count = self._count_items(
+                f'/repos/{owner}/{repo}/contributors',
+                params={'anon': 'true'} if anon else None
+            )
+            logger.info(f"Successfully counted {count} contributors for {owner}/{repo}")
+            return count
+            
+        except Exception as e:
+            logger.error(f"Failed to count contributors for {owner}/{repo}: {e}")
+            raise
+    
+    def count_commits(self, owner: str, repo: str, sha: Optional[str] = None) -> int:
+        """
+        Count the commits reachable from a branch without listing them.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            sha: Branch name or commit SHA (defaults to the default branch)
+            
+        Returns:
+            Exact number of commits (0 for an empty repository)
+            
+        Raises:
+            GitHubAPIError: If the request fails
+        """
+        logger.info(f"Counting commits for {owner}/{repo}")
+        
+        try:
+            count = self._count_items(
+                f'/repos/{owner}/{repo}/commits',
+                params={'sha': sha} if sha else None
+            )
+        except GitHubAPIError as e:
+            # GitHub answers 409 Conflict for repositories without commits
+            http_error = e.__cause__
+            if isinstance(http_error, requests.exceptions.HTTPError) and \
+                    getattr(http_error.response, 'status_code', None) == 409:
+                logger.info(f"Repository {owner}/{repo} is empty")
+                return 0
+            logger.error(f"Failed to count commits for {owner}/{repo}: {e}")
+            raise
+        
+        logger.info(f"Successfully counted {count} commits for {owner}/{repo}")
+        return count
+    
+    def get_head_sha(self, owner: str, repo: str, ref: str = 'HEAD') -> str:
+        """
+        Resolve a branch (or other ref) to its commit SHA.
+        
+        Uses the SHA media type, so the response body is only the 40-character
+        SHA instead of the full commit with its diff stats.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            ref: Branch, tag or 'HEAD' for the default branch
+        
+        Returns:
+            Commit SHA ('' for an empty repository)
+        
+        Raises:
+            GitHubAPIError: If the request fails
+        """
+        try:
+            response = self._make_request(
+                'GET', f'/repos/{owner}/{repo}/commits/{ref}',
+                headers={'Accept': 'application/vnd.github.sha'}
+            )
+        except GitHubAPIError as e:
+            http_error = e.__cause__
+            if isinstance(http_error, requests.exceptions.HTTPError) and \
+                    getattr(http_error.response, 'status_code', None) == 409:
+                logger.info(f"Repository {owner}/{repo} is empty")
+                return ''
+            logger.error(f"Failed to resolve {ref} for {owner}/{repo}: {e}")
+            raise
+        return response.text.strip()
+    
     def get_contributors(self, owner: str, repo: str, max_contributors: int = 100) -> List[Dict[str, Any]]:
         """
         Fetch list of repository contributors.
@@ -380,52 +918,19 @@ class GitHubClient:
         }
         
         try:
-            # Check for SECURITY.md in common locations
-            security_paths = ['SECURITY.md', '.github/SECURITY.md', 'docs/SECURITY.md']
-            for path in security_paths:
-                try:
-                    response = self._make_request(
-                        'GET',
-                        f'/repos/{owner}/{repo}/contents/{path}'
-                    )
-                    if response.status_code == 200:
-                        security_status['has_security_md'] = True
-                        security_status['has_security_policy'] = True
-                        logger.debug(f"Found SECURITY.md at {path}")
-                        break
-                except GitHubAPIError:
-                    continue
+            index = None
+            try:
+                index = self.get_tree_index(owner, repo)
+            except GitHubAPIError as e:
+                logger.debug(f"Tree index unavailable for {owner}/{repo}, probing paths: {e}")
             
-            # Check for Dependabot configuration
-            dependabot_paths = ['.github/dependabot.yml', '.github/dependabot.yaml']
-            for path in dependabot_paths:
-                try:
-                    response = self._make_request(
-                        'GET',
-                        f'/repos/{owner}/{repo}/contents/{path}'
-                    )
-                    if response.status_code == 200:
-                        security_status['has_dependabot'] = True
-                        logger.debug(f"Found Dependabot config at {path}")
-                        break
-                except GitHubAPIError:
-                    continue
+            if index is not None and not index.truncated:
+                security_status.update(index.security_files())
+            else:
+                security_status.update(self._probe_security_files(owner, repo))
             
             # Check for code scanning alerts (requires authentication)
-            if self.token:
-                try:
-                    response = self._make_request(
-                        'GET',
-                        f'/repos/{owner}/{repo}/code-scanning/alerts',
-                        params={'per_page': 1}
-                    )
-                    # If we get a 200, code scanning is enabled (even if no alerts)
-                    if response.status_code == 200:
-                        security_status['has_code_scanning'] = True
-                        logger.debug("Code scanning is enabled")
-                except GitHubAPIError:
-                    # 404 or 403 means code scanning is not enabled or not accessible
-                    pass
+            security_status['has_code_scanning'] = self._check_code_scanning(owner, repo)
             
             logger.info(f"Security check complete for {owner}/{repo}: {security_status}")
             return security_status
@@ -435,41 +940,206 @@ class GitHubClient:
             # Return partial results rather than failing completely
             return security_status
     
-    def get_readme_content(self, owner: str, repo: str) -> str:
+    def _probe_security_files(self, owner: str, repo: str) -> Dict[str, bool]:
+        """
+        Check security files with one contents request per candidate path.
+        
+        Used when the tree index is unavailable or truncated.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            
+        Returns:
+            Dictionary with has_security_md, has_security_policy and has_dependabot
+        """
+        security_status = {
+            'has_security_md': False,
+            'has_security_policy': False,
+            'has_dependabot': False
+        }
+        
+        # Check for SECURITY.md in common locations
+        for path in graphql_queries.SECURITY_MD_PATHS:
+            try:
+                response = self._make_request(
+                    'GET',
+                    f'/repos/{owner}/{repo}/contents/{path}'
+                )
+                if response.status_code == 200:
+                    security_status['has_security_md'] = True
+                    security_status['has_security_policy'] = True
+                    logger.debug(f"Found SECURITY.md at {path}")
+                    break
+            except GitHubAPIError:
+                continue
+        
+        # Check for Dependabot configuration
+        for path in graphql_queries.DEPENDABOT_PATHS:
+            try:
+                response = self._make_request(
+                    'GET',
+                    f'/repos/{owner}/{repo}/contents/{path}'
+                )
+                if response.status_code == 200:
+                    security_status['has_dependabot'] = True
+                    logger.debug(f"Found Dependabot config at {path}")
+                    break
+            except GitHubAPIError:
+                continue
+        
+        return security_status
+    
+    def open_tarball(self, owner: str, repo: str, ref: str = 'HEAD') -> BinaryIO:
+        """
+        Stream the gzipped tarball of a ref (redirected to codeload.github.com).
+        
+        The body is not buffered or cached: it is read from the connection as
+        the caller consumes the returned stream, e.g. with
+        RepositoryAnalyzer.analyze_tarball(). Close the stream when done; the
+        compressed bytes read are added to the request metrics.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            ref: Branch, tag or commit SHA (HEAD is the default branch)
+            
+        Returns:
+            Readable binary stream of the .tar.gz body
+            
+        Raises:
+            GitHubAPIError: If the request fails (e.g. 404 for an empty repository)
+        """
+        endpoint = f'/repos/{owner}/{repo}/tarball/{ref}'
+        logger.info(f"Streaming tarball of {owner}/{repo}@{ref}")
+        response = self._make_request('GET', endpoint, stream=True)
+        
+        def count_bytes(bytes_read: int) -> None:
+            self.metrics.add_bytes('GET', endpoint, bytes_read)
+        
+        return io.BufferedReader(_ResponseStream(response, on_close=count_bytes), buffer_size=64 * 1024)
+    
+    def get_tree_index(self, owner: str, repo: str, ref: str = 'HEAD') -> FileIndex:
+        """
+        Fetch the recursive git tree of a ref and index its files.
+        
+        One request lists every path with its size, replacing per-file
+        contents probes. The index is kept in memory so the security check,
+        extension counts and manifest discovery of a repository share it.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            ref: Branch, tag or commit SHA (HEAD is the default branch)
+            
+        Returns:
+            FileIndex of the tree (check ``truncated`` for very large trees)
+            
+        Raises:
+            GitHubAPIError: If the request fails (e.g. 409 for an empty repository)
+        """
+        key = (owner, repo, ref)
+        with self._tree_lock:
+            if key in self._tree_indexes:
+                self._tree_indexes.move_to_end(key)
+                return self._tree_indexes[key]
+        
+        logger.info(f"Fetching file tree for {owner}/{repo}@{ref}")
+        response = self._make_request(
+            'GET',
+            f'/repos/{owner}/{repo}/git/trees/{ref}',
+            params={'recursive': 1}
+        )
+        index = FileIndex.from_git_tree(response.json())
+        if index.truncated:
+            logger.warning(f"File tree for {owner}/{repo} is truncated ({len(index)} files listed)")
+        else:
+            logger.info(f"Indexed {len(index)} files for {owner}/{repo}")
+        
+        with self._tree_lock:
+            self._tree_indexes[key] = index
+            while len(self._tree_indexes) > TREE_INDEX_CACHE_SIZE:
+                self._tree_indexes.popitem(last=False)
+        return index
+    
+    def _check_code_scanning(self, owner: str, repo: str) -> bool:
+        """
+        Check whether code scanning is enabled (requires authentication).
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            
+        Returns:
+            True if the code scanning alerts endpoint is accessible
+        """
+        if not self.token:
+            return False
+        
+        try:
+            response = self._make_request(
+                'GET',
+                f'/repos/{owner}/{repo}/code-scanning/alerts',
+                params={'per_page': 1}
+            )
+            # If we get a 200, code scanning is enabled (even if no alerts)
+            if response.status_code == 200:
+                logger.debug("Code scanning is enabled")
+                return True
+        except GitHubAPIError:
+            # 404 or 403 means code scanning is not enabled or not accessible
+            pass
+        return False
+    
+    def get_readme_content(self, owner: str, repo: str, max_bytes: Optional[int] = None) -> str:
         """
         Fetch README content for quality analysis.
         
+        The README is requested as raw media and streamed, keeping only the
+        first ``max_bytes`` bytes, so a multi-megabyte README costs no more
+        memory or transfer than the part used for scoring.
+        
         Args:
             owner: Repository owner
             repo: Repository name
+            max_bytes: Byte cap (defaults to the client's readme_max_bytes)
             
         Returns:
-            README content as string (decoded from base64)
+            README content as string (possibly truncated at the byte cap)
             Returns empty string if README not found
             
         Raises:
             GitHubAPIError: If the request fails (except 404)
         """
         logger.info(f"Fetching README content for {owner}/{repo}")
+        if max_bytes is None:
+            max_bytes = self.readme_max_bytes
         
         try:
-            response = self._make_request('GET', f'/repos/{owner}/{repo}/readme')
+            kwargs: Dict[str, Any] = {'headers': {'Accept': 'application/vnd.github.raw'}}
+            if max_bytes is not None:
+                kwargs['max_bytes'] = max_bytes + 1  # one extra byte detects truncation
+            response = self._make_request('GET', f'/repos/{owner}/{repo}/readme', **kwargs)
             
             if response.status_code == 404:
                 logger.warning(f"No README found for {owner}/{repo}")
                 return ""
             
-            readme_data = response.json()
+            content = response.content
+            truncated = max_bytes is not None and len(content) > max_bytes
+            if truncated:
+                content = content[:max_bytes]
             
-            # README content is base64 encoded
-            import base64
-            content = readme_data.get('content', '')
-            if content:
-                decoded_content = base64.b64decode(content).decode('utf-8', errors='ignore')
+            # A character split by the cap is dropped rather than mangled
+            decoded_content = codecs.getincrementaldecoder('utf-8')(errors='ignore').decode(content)
+            if truncated:
+                logger.info(
+                    f"Successfully fetched README for {owner}/{repo} "
+                    f"(truncated to {max_bytes} bytes, {len(decoded_content)} characters)"
+                )
+            else:
                 logger.info(f"Successfully fetched README for {owner}/{repo} ({len(decoded_content)} characters)")
-                return decoded_content
-            
-            return ""
+            return decoded_content
             
         except GitHubAPIError as e:
             # If it's a 404, return empty string
@@ -481,3 +1151,197 @@ class GitHubClient:
         except Exception as e:
             logger.error(f"Failed to fetch README for {owner}/{repo}: {e}")
             raise
+    
+    def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Execute a GitHub GraphQL query.
+        
+        GraphQL requires authentication. Partial failures are returned in the
+        'errors' list alongside 'data'; only a response without data raises.
+        
+        Args:
+            query: GraphQL query document
+            variables: Query variables
+            
+        Returns:
+            Full GraphQL response with 'data' and optional 'errors' keys
+            
+        Raises:
+            GitHubAPIError: If unauthenticated, the request fails, or no data is returned
+        """
+        if not self.token:
+            raise GitHubAPIError("GitHub GraphQL API requires an authentication token")
+        
+        response = self._make_request(
+            'POST',
+            '/graphql',
+            json={'query': query, 'variables': variables or {}}
+        )
+        payload = response.json()
+        
+        if payload.get('errors'):
+            messages = '; '.join(error.get('message', '') for error in payload['errors'])
+            if not payload.get('data'):
+                raise GitHubAPIError(f"GraphQL query failed: {messages}")
+            logger.warning(f"GraphQL query returned partial errors: {messages}")
+        
+        rate_limit = (payload.get('data') or {}).get('rateLimit')
+        if rate_limit:
+            self.graphql_points_used += rate_limit.get('cost') or 0
+            self.graphql_rate_limit = rate_limit
+            logger.debug(
+                f"GraphQL cost: {rate_limit.get('cost')} points, "
+                f"{rate_limit.get('remaining')} remaining"
+            )
+        
+        return payload
+    
+    def get_repository_snapshot(self, owner: str, repo: str) -> Dict[str, Any]:
+        """
+        Fetch repository metadata with a single GraphQL query.
+        
+        Returns the same shapes as the REST methods so callers can populate
+        RepositoryData identically. Contributor lists are not available over
+        GraphQL and must still be fetched with get_contributors().
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            
+        Returns:
+            Dictionary with keys:
+            - repository_info: as get_repository_info()
+            - commit_activity: as get_commit_activity(), plus 'monthly_commits',
+              'last_commit' and 'head_sha'
+            - languages: as get_languages()
+            - readme: as get_readme_content()
+            - security_files: as check_security_files()
+            
+        Raises:
+            GitHubAPIError: If the query fails or the repository is not found
+        """
+        logger.info(f"Fetching repository snapshot via GraphQL for {owner}/{repo}")
+        
+        now = datetime.now()
+        payload = self.graphql(
+            graphql_queries.repository_query(now),
+            {'owner': owner, 'name': repo}
+        )
+        node = payload['data'].get('repository')
+        if not node:
+            raise GitHubAPIError(f"Repository {owner}/{repo} not found via GraphQL")
+        
+        snapshot = graphql_queries.to_snapshot(node, now)
+        snapshot['security_files']['has_code_scanning'] = self._check_code_scanning(owner, repo)
+        
+        logger.info(f"Successfully fetched GraphQL snapshot for {owner}/{repo}")
+        return snapshot
+    
+    def get_repositories_bulk(
+        self,
+        repositories: List[Tuple[str, str]],
+        chunk_size: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Fetch metadata for many repositories with aliased GraphQL queries.
+        
+        Repositories are requested in chunks of up to ``chunk_size`` (max 100)
+        per query. A chunk that fails as a whole (e.g. a server-side timeout)
+        is split in half and retried; per-repository errors such as
+        NOT_FOUND only affect that repository. Code scanning status is not
+        checked in bulk mode.
+        
+        Args:
+            repositories: List of (owner, repo) pairs
+            chunk_size: Repositories per query (1-100)
+            
+        Returns:
+            Dictionary mapping "owner/repo" to a snapshot shaped like
+            get_repository_snapshot(), or to the GitHubAPIError for that repo
+            
+        Raises:
+            RateLimitError: If the GraphQL point budget is exhausted
+        """
+        chunk_size = max(1, min(chunk_size, 100))
+        unique = list(dict.fromkeys((owner, repo) for owner, repo in repositories))
+        logger.info(
+            f"Fetching metadata for {len(unique)} repositories via GraphQL "
+            f"({chunk_size} per query)"
+        )
+        
+        points_before = self.graphql_points_used
+        results: Dict[str, Any] = {}
+        pending = [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+        
+        while pending:
+            chunk = pending.pop(0)
+            try:
+                results.update(self._fetch_bulk_chunk(chunk))
+            except RateLimitError:
+                raise
+            except GitHubAPIError as e:
+                if len(chunk) > 1:
+                    middle = len(chunk) // 2
+                    logger.warning(
+                        f"Bulk query for {len(chunk)} repositories failed, "
+                        f"retrying as two chunks of {middle} and {len(chunk) - middle}: {e}"
+                    )
+                    pending[:0] = [chunk[:middle], chunk[middle:]]
+                else:
+                    owner, repo = chunk[0]
+                    results[f"{owner}/{repo}"] = e
+        
+        failed = sum(1 for value in results.values() if isinstance(value, Exception))
+        logger.info(
+            f"Bulk fetch complete: {len(results) - failed} succeeded, {failed} failed, "
+            f"{self.graphql_points_used - points_before} GraphQL points used"
+        )
+        return results
+    
+    def _fetch_bulk_chunk(self, chunk: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Fetch one chunk of repositories in a single aliased query.
+        
+        Args:
+            chunk: List of (owner, repo) pairs
+            
+        Returns:
+            Dictionary mapping "owner/repo" to snapshot or GitHubAPIError
+            
+        Raises:
+            GitHubAPIError: If the query returns no data at all
+        """
+        remaining = self.graphql_rate_limit.get('remaining')
+        last_cost = self.graphql_rate_limit.get('cost') or 1
+        if remaining is not None and remaining < last_cost:
+            reset_at = self.graphql_rate_limit.get('resetAt', '')
+            reset_time = int(datetime.fromisoformat(reset_at.replace('Z', '+00:00')).timestamp()) if reset_at else None
+            raise RateLimitError(
+                f"GraphQL point budget exhausted ({remaining} remaining). Resets at {reset_at}",
+                reset_time
+            )
+        
+        now = datetime.now()
+        payload = self.graphql(
+            graphql_queries.bulk_repository_query(len(chunk), now),
+            graphql_queries.bulk_variables(chunk)
+        )
+        data = payload.get('data') or {}
+        
+        # Map per-alias errors (path[0] is the alias) to their repository
+        alias_errors: Dict[str, str] = {}
+        for error in payload.get('errors') or []:
+            path = error.get('path') or []
+            if path:
+                alias_errors.setdefault(path[0], error.get('message', 'Unknown GraphQL error'))
+        
+        results: Dict[str, Any] = {}
+        for i, (owner, repo) in enumerate(chunk):
+            alias = f"r{i}"
+            node = data.get(alias)
+            if node:
+                results[f"{owner}/{repo}"] = graphql_queries.to_snapshot(node, now)
+            else:
+                message = alias_errors.get(alias, 'Repository not found')
+                results[f"{owner}/{repo}"] = GitHubAPIError(f"{owner}/{repo}: {message}")
+        return results
@@ -0,0 +1,275 @@
+"""GraphQL queries and response shaping for repository metadata acquisition."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Candidate README locations, checked in order (REST /readme is case-insensitive)
+README_PATHS = ['README.md', 'readme.md', 'Readme.md', 'README.rst', 'README.txt', 'README', 'README.markdown']
+
+SECURITY_MD_PATHS = ['SECURITY.md', '.github/SECURITY.md', 'docs/SECURITY.md']
+DEPENDABOT_PATHS = ['.github/dependabot.yml', '.github/dependabot.yaml']
+
+RATE_LIMIT_FIELDS = "rateLimit { cost remaining resetAt }"
+
+
+def month_windows(now: Optional[datetime] = None, months: int = 12) -> List[Tuple[str, str, str]]:
+    """
+    Build calendar-month windows ending with the current month.
+
+    Months are local-time calendar months, the same buckets as the git
+    history and REST commit activity (datetime.fromtimestamp), and the
+    bounds carry the local UTC offset so GitHub compares the right instants.
+
+    Args:
+        now: Reference time (defaults to now), local time
+        months: Number of months to include
+
+    Returns:
+        List of (month_key, since_iso, until_iso) tuples, oldest first
+    """
+    now = now or datetime.now()
+    year, month = now.year, now.month
+    windows = []
+    for _ in range(months):
+        # astimezone() on a naive datetime attaches the local offset in effect on that day
+        start = datetime(year, month, 1).astimezone()
+        end = (datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)).astimezone()
+        windows.append((
+            start.strftime('%Y-%m'),
+            start.isoformat(),
+            end.isoformat()
+        ))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return list(reversed(windows))
+
+
+def _object_alias(prefix: str, index: int) -> str:
+    return f"{prefix}{index}"
+
+
+def repository_fields(now: Optional[datetime] = None) -> str:
+    """
+    Build the selection set fetched for every repository.
+
+    Covers the data of the REST metadata endpoints: repository info,
+    languages with sizes, README text, security file presence, total commit
+    count and per-month commit counts on the default branch.
+
+    Args:
+        now: Reference time for the monthly commit windows
+
+    Returns:
+        GraphQL selection set (without surrounding braces)
+    """
+    readme_objects = "\n".join(
+        f'{_object_alias("readme", i)}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}'
+        for i, path in enumerate(README_PATHS)
+    )
+    security_objects = "\n".join(
+        f'{_object_alias("security", i)}: object(expression: "HEAD:{path}") {{ __typename }}'
+        for i, path in enumerate(SECURITY_MD_PATHS)
+    )
+    dependabot_objects = "\n".join(
+        f'{_object_alias("dependabot", i)}: object(expression: "HEAD:{path}") {{ __typename }}'
+        for i, path in enumerate(DEPENDABOT_PATHS)
+    )
+    monthly_history = "\n".join(
+        f'm{i}: history(since: "{since}", until: "{until}") {{ totalCount }}'
+        for i, (_, since, until) in enumerate(month_windows(now))
+    )
+
+    return f"""
+    name
+    nameWithOwner
+    description
+    url
+    createdAt
+    updatedAt
+    pushedAt
+    isFork
+    isArchived
+    stargazerCount
+    forkCount
+    primaryLanguage {{ name }}
+    licenseInfo {{ name spdxId }}
+    languages(first: 100, orderBy: {{field: SIZE, direction: DESC}}) {{
+      edges {{ size node {{ name }} }}
+    }}
+    defaultBranchRef {{
+      name
+      target {{
+        ... on Commit {{
+          oid
+          committedDate
+          history {{ totalCount }}
+          {monthly_history}
+        }}
+      }}
+    }}
+    {readme_objects}
+    {security_objects}
+    {dependabot_objects}
+    """
+
+
+def repository_query(now: Optional[datetime] = None) -> str:
+    """
+    Build the single-repository metadata query.
+
+    Args:
+        now: Reference time for the monthly commit windows
+
+    Returns:
+        GraphQL query taking $owner and $name variables
+    """
+    return f"""
+    query RepositoryMetadata($owner: String!, $name: String!) {{
+      {RATE_LIMIT_FIELDS}
+      repository(owner: $owner, name: $name) {{
+        {repository_fields(now)}
+      }}
+    }}
+    """
+
+
+def bulk_repository_query(count: int, now: Optional[datetime] = None) -> str:
+    """
+    Build an aliased query fetching several repositories at once.
+
+    Each repository is requested as alias ``r{i}`` with variables ``$o{i}``
+    (owner) and ``$n{i}`` (name), sharing one fragment for the fields.
+
+    Args:
+        count: Number of repositories in the query
+        now: Reference time for the monthly commit windows
+
+    Returns:
+        GraphQL query document
+    """
+    variables = ", ".join(f"$o{i}: String!, $n{i}: String!" for i in range(count))
+    selections = "\n".join(
+        f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...RepositoryFields }}"
+        for i in range(count)
+    )
+    return f"""
+    query BulkRepositoryMetadata({variables}) {{
+      {RATE_LIMIT_FIELDS}
+      {selections}
+    }}
+
+    fragment RepositoryFields on Repository {{
+      {repository_fields(now)}
+    }}
+    """
+
+
+def bulk_variables(repositories: List[Tuple[str, str]]) -> Dict[str, str]:
+    """Build variables for bulk_repository_query() from (owner, name) pairs."""
+    variables = {}
+    for i, (owner, name) in enumerate(repositories):
+        variables[f"o{i}"] = owner
+        variables[f"n{i}"] = name
+    return variables
+
+
+def to_repository_info(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a GraphQL repository node like a REST /repos/{owner}/{repo} response."""
+    license_info = node.get('licenseInfo')
+    default_branch = node.get('defaultBranchRef') or {}
+    return {
+        'name': node.get('name'),
+        'full_name': node.get('nameWithOwner'),
+        'description': node.get('description'),
+        'html_url': node.get('url'),
+        'created_at': node.get('createdAt', ''),
+        'updated_at': node.get('updatedAt', ''),
+        'pushed_at': node.get('pushedAt', ''),
+        'fork': node.get('isFork', False),
+        'archived': node.get('isArchived', False),
+        'default_branch': default_branch.get('name') or 'main',
+        'language': (node.get('primaryLanguage') or {}).get('name'),
+        'stargazers_count': node.get('stargazerCount', 0),
+        'forks_count': node.get('forkCount', 0),
+        'license': {
+            'name': license_info.get('name'),
+            'spdx_id': license_info.get('spdxId'),
+        } if license_info else None,
+    }
+
+
+def to_languages(node: Dict[str, Any]) -> Dict[str, int]:
+    """Shape GraphQL language edges like a REST /languages response."""
+    edges = (node.get('languages') or {}).get('edges') or []
+    return {edge['node']['name']: edge['size'] for edge in edges}
+
+
+def to_readme(node: Dict[str, Any]) -> str:
+    """Return the first README blob text found, or an empty string."""
+    for i in range(len(README_PATHS)):
+        blob = node.get(_object_alias('readme', i))
+        if blob and blob.get('text'):
+            return blob['text']
+    return ""
+
+
+def to_security_files(node: Dict[str, Any]) -> Dict[str, bool]:
+    """Shape object lookups like check_security_files() output (without code scanning)."""
+    has_security_md = any(node.get(_object_alias('security', i)) for i in range(len(SECURITY_MD_PATHS)))
+    has_dependabot = any(node.get(_object_alias('dependabot', i)) for i in range(len(DEPENDABOT_PATHS)))
+    return {
+        'has_security_md': has_security_md,
+        'has_security_policy': has_security_md,
+        'has_dependabot': has_dependabot,
+        'has_code_scanning': False,
+    }
+
+
+def to_commit_activity(node: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Shape default-branch history like get_commit_activity() output.
+
+    Weekly stats are not available over GraphQL, so the monthly breakdown and
+    last commit date are included directly.
+    """
+    target = (node.get('defaultBranchRef') or {}).get('target') or {}
+    monthly_commits = {}
+    for i, (month_key, _, _) in enumerate(month_windows(now)):
+        count = (target.get(f'm{i}') or {}).get('totalCount', 0)
+        if count:
+            monthly_commits[month_key] = count
+
+    last_commit = ''
+    if target.get('committedDate'):
+        last_commit = datetime.fromisoformat(
+            target['committedDate'].replace('Z', '+00:00')
+        ).astimezone().replace(tzinfo=None).isoformat()
+
+    return {
+        'total_commits': (target.get('history') or {}).get('totalCount', 0),
+        'commit_activity': [],
+        'monthly_commits': monthly_commits,
+        'last_commit': last_commit,
+        'head_sha': target.get('oid', ''),
+    }
+
+
+def to_snapshot(node: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Convert a GraphQL repository node into REST-shaped metadata.
+
+    Args:
+        node: Repository object from a GraphQL response
+        now: Reference time used when the query was built
+
+    Returns:
+        Dictionary with 'repository_info', 'commit_activity', 'languages',
+        'readme' and 'security_files' keys
+    """
+    return {
+        'repository_info': to_repository_info(node),
+        'commit_activity': to_commit_activity(node, now),
+        'languages': to_languages(node),
+        'readme': to_readme(node),
+        'security_files': to_security_files(node),
+    }
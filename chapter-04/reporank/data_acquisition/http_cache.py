@@ -0,0 +1,420 @@
+"""On-disk HTTP response cache for the GitHub API client."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Default freshness lifetimes (seconds) keyed by endpoint fragment.
+# The longest fragment contained in the endpoint wins; '' is the fallback.
+DEFAULT_TTLS: Dict[str, int] = {
+    '': 3600,
+    '/languages': 86400,
+    '/readme': 86400,
+    '/contributors': 21600,
+    '/contents/': 86400,
+    '/stats/': 21600,
+}
+
+
+@dataclass
+class CachedResponse:
+    """A cached response body together with its validators."""
+
+    key: str
+    endpoint: str
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    stored_at: float
+    size: int = 0
+
+    def age(self) -> float:
+        """Seconds since the entry was stored or last revalidated."""
+        return time.time() - self.stored_at
+
+    def validators(self) -> Dict[str, str]:
+        """
+        Build conditional request headers from the stored validators.
+
+        Returns:
+            Dictionary with If-None-Match and/or If-Modified-Since headers
+        """
+        conditional = {}
+        etag = self.headers.get('ETag')
+        last_modified = self.headers.get('Last-Modified')
+        if etag:
+            conditional['If-None-Match'] = etag
+        if last_modified:
+            conditional['If-Modified-Since'] = last_modified
+        return conditional
+
+    def to_response(self, url: str) -> requests.Response:
+        """
+        Rebuild a requests.Response from the cached entry.
+
+        Args:
+            url: URL the response is served for
+
+        Returns:
+            Response object equivalent to the original 200 response
+        """
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.url = url
+        response.encoding = 'utf-8'
+        return response
+
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness."""
+
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    evictions: int = 0
+    stores: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert counters to a dictionary including the hit ratio."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'evictions': self.evictions,
+            'stores': self.stores,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ResponseCache:
+    """
+    Size-bounded, on-disk cache of GitHub API GET responses.
+
+    Each entry is stored as a body file plus a small JSON metadata file that
+    keeps the ETag/Last-Modified validators. Fresh entries (younger than the
+    endpoint TTL) are served without touching the network; stale entries are
+    revalidated with a conditional request, and a 304 answer - which GitHub
+    does not count against the rate limit - serves the cached body.
+
+    Eviction is least-recently-used once the total body size exceeds
+    ``max_size_bytes``.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_size_bytes: int = 100 * 1024 * 1024,
+        ttls: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialize the response cache.
+
+        Args:
+            cache_dir: Directory where cache entries are stored
+            max_size_bytes: Upper bound for the total size of cached bodies
+            ttls: Freshness lifetimes in seconds keyed by endpoint fragment
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.stats = CacheStats()
+
+        self._lock = threading.Lock()
+        # key -> body size, ordered from least to most recently used
+        self._lru: "OrderedDict[str, int]" = OrderedDict()
+        self._total_size = 0
+
+        # Entries may hold private repository data: readable by this user only
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        try:
+            os.chmod(self.cache_dir, 0o700)
+        except OSError as e:
+            logger.warning(f"⚠ Could not restrict permissions of {self.cache_dir}: {e}")
+        self._load_index()
+        logger.info(
+            f"HTTP response cache at {self.cache_dir} "
+            f"({len(self._lru)} entries, {self._total_size} bytes)"
+        )
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.body")
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU order from metadata file access times."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-5]
+            try:
+                meta_mtime = os.path.getmtime(self._meta_path(key))
+                size = os.path.getsize(self._body_path(key))
+            except OSError:
+                continue
+            entries.append((meta_mtime, key, size))
+
+        for _, key, size in sorted(entries):
+            self._lru[key] = size
+            self._total_size += size
+
+    @staticmethod
+    def make_key(
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        principal: str = '',
+        max_bytes: Optional[int] = None
+    ) -> str:
+        """
+        Build a stable cache key for a request.
+
+        Args:
+            method: HTTP method
+            url: Absolute request URL
+            params: Query parameters
+            headers: Per-request headers (only Accept affects the key)
+            principal: Identifies the credentials the request is made with
+                (see principal_for()), so responses fetched with one token
+                are never served to a run with another token or none
+            max_bytes: Body cap of the request, if any; capped bodies may be
+                truncated, so each cap gets its own entry
+
+        Returns:
+            Hex digest identifying the request
+        """
+        accept = (headers or {}).get('Accept', '')
+        canonical = json.dumps(
+            [method.upper(), url, sorted((params or {}).items()), accept, principal, max_bytes],
+            default=str
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def principal_for(tokens: List[Optional[str]]) -> str:
+        """
+        Derive a cache principal from the tokens a client rotates across.
+
+        Args:
+            tokens: GitHub tokens (None or empty for unauthenticated access)
+
+        Returns:
+            Hex digest of the token set, or '' without tokens
+        """
+        tokens = sorted(token for token in tokens if token)
+        if not tokens:
+            return ''
+        return hashlib.sha256('\n'.join(tokens).encode('utf-8')).hexdigest()
+
+    def ttl_for(self, endpoint: str) -> int:
+        """
+        Resolve the freshness lifetime for an endpoint.
+
+        Args:
+            endpoint: API endpoint path
+
+        Returns:
+            TTL in seconds (longest matching fragment wins)
+        """
+        matches = [fragment for fragment in self.ttls if fragment in endpoint]
+        return self.ttls[max(matches, key=len)] if matches else self.ttls.get('', 0)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Load a cached entry without updating counters.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            CachedResponse or None if the key is not cached
+        """
+        with self._lock:
+            if key not in self._lru:
+                return None
+
+        try:
+            with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(self._body_path(key), 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError) as e:
+            logger.debug(f"Dropping unreadable cache entry {key}: {e}")
+            self._remove(key)
+            return None
+
+        return CachedResponse(
+            key=key,
+            endpoint=meta.get('endpoint', ''),
+            status_code=meta.get('status_code', 200),
+            headers=meta.get('headers', {}),
+            body=body,
+            stored_at=meta.get('stored_at', 0.0),
+            size=len(body)
+        )
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        """Check whether an entry is still within its endpoint TTL."""
+        return entry.age() < self.ttl_for(entry.endpoint)
+
+    def record_hit(self, key: str) -> None:
+        """Count a cache hit and mark the entry as most recently used."""
+        with self._lock:
+            self.stats.hits += 1
+            if key in self._lru:
+                self._lru.move_to_end(key)
+        try:
+            os.utime(self._meta_path(key))
+        except OSError:
+            pass
+
+    def record_miss(self) -> None:
+        """Count a cache miss."""
+        with self._lock:
+            self.stats.misses += 1
+
+    def revalidated(self, entry: CachedResponse) -> None:
+        """
+        Mark an entry as revalidated by a 304 response.
+
+        Resets its age so it is fresh for another TTL period.
+
+        Args:
+            entry: Entry confirmed by the server
+        """
+        entry.stored_at = time.time()
+        try:
+            self._write_meta(entry)
+        except OSError as e:
+            # The cached body is still valid; only its age is not reset
+            logger.warning(f"Failed to refresh cache entry for {entry.endpoint}: {e}")
+        with self._lock:
+            self.stats.revalidations += 1
+        self.record_hit(entry.key)
+
+    def store(self, key: str, endpoint: str, response: requests.Response) -> None:
+        """
+        Store a successful response.
+
+        Only responses carrying a validator (ETag or Last-Modified) are kept,
+        since they are the ones that can be revalidated cheaply.
+
+        Args:
+            key: Cache key from make_key()
+            endpoint: API endpoint path, used for TTL lookup
+            response: Response with status 200
+        """
+        headers = dict(response.headers)
+        if 'ETag' not in response.headers and 'Last-Modified' not in response.headers:
+            return
+
+        body = response.content
+        if len(body) > self.max_size_bytes:
+            return
+
+        entry = CachedResponse(
+            key=key,
+            endpoint=endpoint,
+            status_code=response.status_code,
+            headers=headers,
+            body=body,
+            stored_at=time.time(),
+            size=len(body)
+        )
+
+        try:
+            self._write_atomic(self._body_path(key), body)
+            self._write_meta(entry)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry for {endpoint}: {e}")
+            return
+
+        with self._lock:
+            self._total_size -= self._lru.pop(key, 0)
+            self._lru[key] = entry.size
+            self._total_size += entry.size
+            self.stats.stores += 1
+
+        self._evict()
+
+    def _write_meta(self, entry: CachedResponse) -> None:
+        meta = {
+            'endpoint': entry.endpoint,
+            'status_code': entry.status_code,
+            'headers': entry.headers,
+            'stored_at': entry.stored_at,
+        }
+        self._write_atomic(self._meta_path(entry.key), json.dumps(meta).encode('utf-8'))
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        """Replace ``path`` with ``data`` so readers (threads or other processes) never see a partial file."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _remove(self, key: str) -> None:
+        with self._lock:
+            self._total_size -= self._lru.pop(key, 0)
+        for path in (self._meta_path(key), self._body_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until under the size bound."""
+        while True:
+            with self._lock:
+                if self._total_size <= self.max_size_bytes or not self._lru:
+                    return
+                key = next(iter(self._lru))
+                self.stats.evictions += 1
+            logger.debug(f"Evicting cache entry {key}")
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            keys = list(self._lru)
+        for key in keys:
+            self._remove(key)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of cached bodies in bytes."""
+        return self._total_size
+
+    def __len__(self) -> int:
+        return len(self._lru)
@@ -0,0 +1,175 @@
+"""Incremental re-ranking: reuse earlier results for repositories that did not change."""
+
+import copy
+import json
+import os
+import threading
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from models.repository_data import RepositoryData
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+STATE_VERSION = 1
+
+# Change statuses stored in RepositoryData.change_status
+NEW = 'new'  # No earlier ranking
+CHANGED = 'changed'  # Pushed since the earlier ranking: full run
+METADATA_CHANGED = 'metadata_changed'  # Same code, stars/forks/description moved
+UNCHANGED = 'unchanged'  # Same code and metadata
+
+# Fields describing a run rather than the repository, never carried over
+RUN_FIELDS = ('github_url', 'analysis_date', 'stage_timings', 'change_status', 'degradations')
+
+
+@dataclass
+class RepositoryState:
+    """What a repository looked like when it was last ranked."""
+
+    repository: str
+    pushed_at: str
+    head_sha: str
+    ranked_at: str
+    data: Dict[str, Any] = field(default_factory=dict)  # RepositoryData.to_dict()
+
+    def apply_to(self, repo_data: RepositoryData) -> None:
+        """Copy the stored results onto repo_data, except per-run fields."""
+        known = {f.name for f in fields(RepositoryData)}
+        for name, value in self.data.items():
+            if name in known and name not in RUN_FIELDS:
+                setattr(repo_data, name, copy.deepcopy(value))
+
+    def classify(self, pushed_at: str, head_sha: str, metadata: Dict[str, Any]) -> str:
+        """
+        Compare the stored state with the current one.
+
+        Args:
+            pushed_at: Current pushed_at of the repository
+            head_sha: Current default branch SHA
+            metadata: Current values of the metadata fields to compare
+
+        Returns:
+            CHANGED, METADATA_CHANGED or UNCHANGED
+        """
+        if not head_sha or pushed_at != self.pushed_at or head_sha != self.head_sha:
+            return CHANGED
+        if any(self.data.get(name) != value for name, value in metadata.items()):
+            return METADATA_CHANGED
+        return UNCHANGED
+
+
+class RankingStateStore:
+    """
+    Last ranking of each repository: ``<directory>/<owner>__<repo>.json``.
+
+    Unlike checkpoints, which belong to one run, the state outlives runs: it
+    is written after a repository's reports are generated and read by the
+    next scheduled run to decide how much work can be skipped.
+
+    Example:
+        store = RankingStateStore('/var/lib/reporank/state')
+        pipeline = AcquisitionPipeline(client, analyzer, state_store=store)
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory for state files (created on first write)
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._directory_ready = False
+
+    def _path(self, owner: str, repo_name: str) -> str:
+        return os.path.join(self.directory, f"{owner.lower()}__{repo_name.lower()}.json")
+
+    def get(self, owner: str, repo_name: str) -> Optional[RepositoryState]:
+        """Return the stored state of a repository, or None if it was never ranked."""
+        path = self._path(owner, repo_name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠ Ignoring unreadable ranking state {path}: {e}")
+            return None
+        if data.get('version') != STATE_VERSION:
+            return None
+        return RepositoryState(
+            repository=data.get('repository', f"{owner}/{repo_name}"),
+            pushed_at=data.get('pushed_at', ''),
+            head_sha=data.get('head_sha', ''),
+            ranked_at=data.get('ranked_at', ''),
+            data=data.get('data', {}),
+        )
+
+    def put(self, repo_data: RepositoryData) -> None:
+        """
+        Store the finished ranking of a repository.
+
+        Repositories without a known HEAD SHA (e.g. the probe failed) are not
+        stored, since the next run could not tell whether they changed, and
+        neither are degraded results, which the next run should redo in full.
+
+        Args:
+            repo_data: Fully analyzed repository data
+        """
+        if not repo_data.head_sha or repo_data.degradations:
+            return
+        payload = {
+            'version': STATE_VERSION,
+            'repository': f"{repo_data.owner}/{repo_data.repo_name}",
+            'pushed_at': repo_data.pushed_at,
+            'head_sha': repo_data.head_sha,
+            'ranked_at': datetime.now().isoformat(),
+            'data': repo_data.to_dict(),
+        }
+        path = self._path(repo_data.owner, repo_data.repo_name)
+        with self._lock:
+            if not self._directory_ready:
+                # State holds repository data, which may be private: readable by this user only
+                os.makedirs(self.directory, mode=0o700, exist_ok=True)
+                try:
+                    os.chmod(self.directory, 0o700)
+                except OSError as e:
+                    logger.warning(f"⚠ Could not restrict permissions of {self.directory}: {e}")
+                self._directory_ready = True
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, default=str)
+        os.replace(tmp_path, path)
+
+
+def select_analysis_steps(
+    repo_data: RepositoryData,
+    steps: Sequence[Tuple[str, Callable[[RepositoryData], RepositoryData]]],
+    content_steps: Sequence[str]
+) -> List[Tuple[str, Callable[[RepositoryData], RepositoryData]]]:
+    """
+    Choose the analysis steps to run for a repository's change status.
+
+    Unchanged repositories keep all earlier results. When only metadata
+    moved, steps that depend only on repository content (README, code,
+    dependencies - typically the LLM evaluations) keep their results and the
+    rest are recomputed. Otherwise every step runs.
+
+    Args:
+        repo_data: Repository data from AcquisitionPipeline.execute()
+        steps: All (name, function) analysis steps
+        content_steps: Names of the steps that depend only on content
+
+    Returns:
+        The steps to run, in order
+    """
+    if repo_data.change_status == UNCHANGED:
+        return []
+    if repo_data.change_status == METADATA_CHANGED:
+        return [(name, step) for name, step in steps if name not in content_steps]
+    return list(steps)
@@ -0,0 +1,344 @@
+"""Persistent bare-mirror cache of cloned repositories."""
+
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: locks only cover threads of this process
+    FCNTL_AVAILABLE = False
+
+from data_acquisition.deadline import Deadline, DeadlineExceeded
+from data_acquisition.git_process import run_git
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Written inside each mirror after a fetch: its size in bytes. The file's
+# mtime is the mirror's last access time, used for LRU eviction.
+ACCESS_FILE = 'reporank-access'
+
+# Partially created mirrors older than this are removed during eviction
+STALE_TMP_SECONDS = 3600
+
+# Only branches and tags are mirrored. A plain `clone --mirror` of a GitHub
+# repository also fetches every refs/pull/* ref, which can be larger than the
+# repository itself.
+MIRROR_REFSPECS = ('+refs/heads/*:refs/heads/*', '+refs/tags/*:refs/tags/*')
+
+_SAFE_NAME = re.compile(r'[^A-Za-z0-9._-]')
+
+
+class _MirrorLock:
+    """
+    Exclusive lock on one mirror, across threads and processes.
+
+    flock() locks belong to the open file, so each acquisition opens the
+    lock file anew and threads of one process exclude each other just like
+    separate processes do. Without fcntl a per-path threading lock is used,
+    which only covers this process.
+    """
+
+    _thread_locks: Dict[str, threading.Lock] = {}
+    _thread_locks_guard = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+        self._thread_lock: Optional[threading.Lock] = None
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Acquire the lock.
+
+        Args:
+            timeout: Seconds to wait; 0 tries once, None waits indefinitely
+
+        Returns:
+            True if the lock was acquired
+        """
+        if not FCNTL_AVAILABLE:
+            with self._thread_locks_guard:
+                lock = self._thread_locks.setdefault(self.path, threading.Lock())
+            acquired = lock.acquire(timeout=-1 if timeout is None else timeout)
+            if acquired:
+                self._thread_lock = lock
+            return acquired
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._fd = fd
+                return True
+            except BlockingIOError:
+                if give_up_at is not None and time.monotonic() >= give_up_at:
+                    os.close(fd)
+                    return False
+                time.sleep(0.05)
+
+    def release(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        if self._thread_lock is not None:
+            self._thread_lock.release()
+            self._thread_lock = None
+
+
+class MirrorCache:
+    """
+    Bare mirrors of analyzed repositories, kept between runs.
+
+    The first analysis of a repository creates a bare mirror (branches and
+    tags only) under the cache directory; later analyses only fetch what
+    was pushed since. Each analysis then gets its own working copy through
+    a local clone, which hard-links the mirror's pack files instead of
+    copying or downloading them, so cleanup and eviction never interfere
+    with an analysis in progress.
+
+    Blobless mirrors (``blobless=True``) hold commits and trees only. Their
+    working copies are partial clones whose missing blobs are fetched from
+    the repository's own URL, see RepositoryAnalyzer's blobless strategy.
+
+    A mirror is updated under an exclusive lock, so fleet workers (threads
+    or processes) that hit the same repository wait for one fetch instead
+    of racing. When the cache grows past ``max_bytes``, the least recently
+    used mirrors that nobody holds are deleted.
+
+    Example:
+        cache = MirrorCache('/tmp/reporank/mirrors', max_bytes=5 * 1024**3)
+        cache.checkout('https://github.com/psf/requests.git', '/tmp/reporank/repo_x')
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 0):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the mirrors
+            max_bytes: Total size above which mirrors are evicted (0 = unlimited)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        """
+        Cache key of a repository URL: ``owner__repo``.
+
+        Example:
+            https://github.com/Django/django.git -> django__django
+        """
+        path = urlparse(url).path if '://' in url else url.split(':', 1)[-1]
+        parts = [p for p in path.strip('/').split('/') if p]
+        if len(parts) < 2:
+            raise ValueError(f"Cannot derive owner/repo from {url}")
+        owner, repo = parts[-2], parts[-1]
+        if repo.endswith('.git'):
+            repo = repo[:-4]
+        return _SAFE_NAME.sub('_', f"{owner}__{repo}".lower())
+
+    def mirror_path(self, url: str, blobless: bool = False) -> str:
+        """Directory of the (full or blobless) mirror for ``url``."""
+        suffix = '.blobless.git' if blobless else '.git'
+        return os.path.join(self.cache_dir, f"{self.key_for(url)}{suffix}")
+
+    def checkout(
+        self,
+        url: str,
+        target_dir: str,
+        deadline: Optional[Deadline] = None,
+        blobless: bool = False
+    ) -> str:
+        """
+        Update the mirror of ``url`` and check it out into ``target_dir``.
+
+        Args:
+            url: Repository URL
+            target_dir: Empty directory for the working copy
+            deadline: Bounds every git command and the wait for the lock
+            blobless: Use a blobless mirror and leave target_dir as a partial
+                clone of ``url`` with no files checked out
+
+        Returns:
+            The mirror's directory
+
+        Raises:
+            subprocess.TimeoutExpired: If a git command ran out of time
+            subprocess.CalledProcessError: If fetching or checking out failed
+            DeadlineExceeded: If the deadline passed while waiting for the lock
+        """
+        deadline = deadline or Deadline()
+        mirror = self.mirror_path(url, blobless)
+
+        with self._locked(mirror, deadline):
+            if os.path.isdir(mirror):
+                logger.info(f"Updating cached mirror {mirror}")
+                self._fetch(mirror, deadline)
+            else:
+                logger.info(f"Creating mirror of {url} in {mirror}")
+                self._create(url, mirror, deadline, blobless)
+            self._touch(mirror, size=_disk_usage(mirror))
+            if blobless:
+                # A local clone of a partial repository is not itself
+                # partial, so commits and trees go through the file://
+                # transport and missing blobs come from the real remote
+                run_git(
+                    ['clone', '--quiet', '--no-checkout', '--single-branch', '--filter=blob:none',
+                     f"file://{os.path.abspath(mirror)}", target_dir],
+                    timeout=deadline.timeout()
+                )
+                run_git(['remote', 'set-url', 'origin', url], timeout=deadline.timeout(), cwd=target_dir)
+            else:
+                # Hard-links objects; the working copy stays valid if the
+                # mirror is fetched into or evicted later
+                run_git(
+                    ['clone', '--quiet', '--local', '--single-branch', mirror, target_dir],
+                    timeout=deadline.timeout()
+                )
+
+        self.evict(keep=mirror)
+        return mirror
+
+    def _create(self, url: str, mirror: str, deadline: Deadline, blobless: bool) -> None:
+        """Create a bare mirror, moving it into place only once complete."""
+        tmp = f"{mirror}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        try:
+            run_git(['init', '--quiet', '--bare', tmp], timeout=deadline.timeout())
+            run_git(['remote', 'add', 'origin', url], timeout=deadline.timeout(), cwd=tmp)
+            run_git(['config', 'remote.origin.mirror', 'true'], timeout=deadline.timeout(), cwd=tmp)
+            run_git(['config', '--unset-all', 'remote.origin.fetch'], timeout=deadline.timeout(), cwd=tmp)
+            for refspec in MIRROR_REFSPECS:
+                run_git(['config', '--add', 'remote.origin.fetch', refspec], timeout=deadline.timeout(), cwd=tmp)
+            if blobless:
+                # Every fetch from origin skips blobs; working copies are
+                # cloned from the mirror with the same filter
+                for key, value in (
+                    ('remote.origin.promisor', 'true'),
+                    ('remote.origin.partialclonefilter', 'blob:none'),
+                    ('uploadpack.allowFilter', 'true'),
+                ):
+                    run_git(['config', key, value], timeout=deadline.timeout(), cwd=tmp)
+            self._fetch(tmp, deadline)
+            os.rename(tmp, mirror)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def _fetch(self, mirror: str, deadline: Deadline) -> None:
+        """Fetch new commits and point HEAD at the remote's default branch."""
+        run_git(['fetch', '--quiet', '--prune', 'origin'], timeout=deadline.timeout(), cwd=mirror)
+        # The default branch may have been renamed since the last fetch
+        output = run_git(['ls-remote', '--symref', 'origin', 'HEAD'], timeout=deadline.timeout(), cwd=mirror)
+        for line in output.splitlines():
+            if line.startswith('ref: ') and line.endswith('\tHEAD'):
+                head = line[len('ref: '):-len('\tHEAD')]
+                run_git(['symbolic-ref', 'HEAD', head], timeout=deadline.timeout(), cwd=mirror)
+                break
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Delete least recently used mirrors until the cache fits max_bytes.
+
+        Mirrors locked by another worker are skipped, as is ``keep``.
+
+        Args:
+            keep: Mirror directory never to evict (the one just used)
+
+        Returns:
+            Directories of the evicted mirrors
+        """
+        self._remove_stale_tmp()
+        if not self.max_bytes:
+            return []
+
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = []
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            lock = _MirrorLock(f"{path}.lock")
+            if not lock.acquire(timeout=0):
+                continue
+            try:
+                # Rename first so a crash never leaves a half-deleted mirror
+                trash = f"{path}.tmp-evict-{os.getpid()}-{threading.get_ident()}"
+                os.rename(path, trash)
+                shutil.rmtree(trash, ignore_errors=True)
+            finally:
+                lock.release()
+            total -= size
+            evicted.append(path)
+            logger.info(f"Evicted cached mirror {path} ({size / 1024 / 1024:.1f} MB)")
+
+        if total > self.max_bytes:
+            logger.warning(
+                f"⚠ Mirror cache is {total / 1024 / 1024:.1f} MB, "
+                f"above its {self.max_bytes / 1024 / 1024:.1f} MB limit; remaining mirrors are in use"
+            )
+        return evicted
+
+    def _entries(self) -> List[Tuple[str, int, float]]:
+        """(path, size, last access) of every complete mirror."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith('.git') or not entry.is_dir():
+                continue
+            access_file = os.path.join(entry.path, ACCESS_FILE)
+            try:
+                with open(access_file) as f:
+                    size = int(f.read().strip() or 0)
+                last_used = os.path.getmtime(access_file)
+            except (OSError, ValueError):
+                size, last_used = _disk_usage(entry.path), entry.stat().st_mtime
+            entries.append((entry.path, size, last_used))
+        return entries
+
+    def _remove_stale_tmp(self) -> None:
+        """Remove leftovers of mirrors whose creation was interrupted."""
+        cutoff = time.time() - STALE_TMP_SECONDS
+        for entry in os.scandir(self.cache_dir):
+            if '.git.tmp-' in entry.name and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    @staticmethod
+    def _touch(mirror: str, size: int) -> None:
+        with open(os.path.join(mirror, ACCESS_FILE), 'w') as f:
+            f.write(str(size))
+
+    @contextmanager
+    def _locked(self, mirror: str, deadline: Deadline) -> Iterator[None]:
+        lock = _MirrorLock(f"{mirror}.lock")
+        if not lock.acquire(timeout=deadline.remaining()):
+            raise DeadlineExceeded(f"Deadline exceeded waiting for the lock on {mirror}")
+        try:
+            yield
+        finally:
+            lock.release()
+
+
+def _disk_usage(path: str) -> int:
+    """Total size in bytes of the files under ``path``."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
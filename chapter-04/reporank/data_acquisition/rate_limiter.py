@@ -0,0 +1,245 @@
+"""Proactive GitHub rate-limit scheduling across a pool of tokens."""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Limits assumed before the first response reports the real values
+DEFAULT_LIMITS = {
+    'authenticated': {'core': 5000, 'graphql': 5000},
+    'anonymous': {'core': 60, 'graphql': 0},
+}
+
+
+@dataclass
+class BucketState:
+    """Rate-limit bucket of one token for one API resource (core, graphql, ...)."""
+
+    limit: int
+    remaining: int
+    reset_at: float = 0.0
+    next_slot: float = 0.0
+    in_flight: int = 0
+
+    def headroom(self) -> int:
+        """Requests still available once in-flight requests are accounted for."""
+        return self.remaining - self.in_flight
+
+
+@dataclass
+class TokenState:
+    """Scheduling state for one token of the pool."""
+
+    token: Optional[str]
+    buckets: Dict[str, BucketState] = field(default_factory=dict)
+    blocked_until: float = 0.0
+
+    @property
+    def label(self) -> str:
+        """Non-sensitive name for logs."""
+        return f"token ...{self.token[-4:]}" if self.token else "anonymous"
+
+
+class RateLimitExhausted(Exception):
+    """Raised when no token has headroom within the allowed wait time."""
+
+    def __init__(self, message: str, reset_time: Optional[int] = None):
+        super().__init__(message)
+        self.reset_time = reset_time
+
+
+class RateLimitScheduler:
+    """
+    Token-bucket scheduler for GitHub API requests.
+
+    Every response updates the bucket of the token that made it from the
+    X-RateLimit-Remaining/Reset/Resource headers. Before each request the
+    scheduler picks the token with the most headroom; while a bucket is above
+    the reserve it is used freely, below it requests are spaced evenly over
+    the time left until reset so a long fleet run never hits zero.
+
+    Secondary rate limits (Retry-After) block only the affected token, so
+    other tokens - and requests already in flight - are unaffected. Waits
+    happen in the calling thread, never while holding the lock.
+    """
+
+    def __init__(
+        self,
+        tokens: Optional[List[Optional[str]]] = None,
+        reserve_fraction: float = 0.1,
+        max_wait: float = 900.0
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            tokens: Pool of GitHub tokens (None or [None] for anonymous access)
+            reserve_fraction: Fraction of the limit below which requests are paced
+            max_wait: Longest a caller may wait for headroom before failing (seconds)
+        """
+        self.tokens = [TokenState(token=token) for token in (tokens or [None])]
+        self.reserve_fraction = reserve_fraction
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+
+    def _bucket(self, state: TokenState, resource: str) -> BucketState:
+        bucket = state.buckets.get(resource)
+        if bucket is None:
+            kind = 'authenticated' if state.token else 'anonymous'
+            limit = DEFAULT_LIMITS[kind].get(resource, DEFAULT_LIMITS[kind]['core'])
+            bucket = BucketState(limit=limit, remaining=limit, reset_at=time.time() + 3600)
+            state.buckets[resource] = bucket
+        return bucket
+
+    def _refresh_expired(self, bucket: BucketState, now: float) -> None:
+        """Assume a full bucket once its reset time has passed."""
+        if bucket.reset_at and now >= bucket.reset_at:
+            bucket.remaining = bucket.limit
+            bucket.reset_at = now + 3600
+            bucket.next_slot = 0.0
+
+    def acquire(self, resource: str = 'core', max_wait: Optional[float] = None) -> TokenState:
+        """
+        Reserve a request slot, waiting if pacing requires it.
+
+        Args:
+            resource: Rate-limit resource ('core' for REST, 'graphql')
+            max_wait: Tighter bound on the wait than the scheduler's, e.g.
+                the time left before the caller's deadline
+
+        Returns:
+            TokenState to use for the request; pass it to release()
+
+        Raises:
+            RateLimitExhausted: If no token has headroom within max_wait
+        """
+        limit = self.max_wait if max_wait is None else min(self.max_wait, max_wait)
+        while True:
+            with self._lock:
+                now = time.time()
+                best = None
+                best_wait = None
+                for state in self.tokens:
+                    bucket = self._bucket(state, resource)
+                    self._refresh_expired(bucket, now)
+                    wait = self._wait_for(state, bucket, now)
+                    if best is None or (wait, -bucket.headroom()) < (best_wait, -self._bucket(best, resource).headroom()):
+                        best, best_wait = state, wait
+
+                bucket = self._bucket(best, resource)
+                if best_wait > limit:
+                    raise RateLimitExhausted(
+                        f"GitHub {resource} rate limit exhausted for all {len(self.tokens)} token(s); "
+                        f"next capacity in {best_wait:.0f}s",
+                        int(bucket.reset_at)
+                    )
+                if best_wait <= 0:
+                    bucket.in_flight += 1
+                    if bucket.headroom() < self._reserve(bucket):
+                        interval = max(bucket.reset_at - now, 0.0) / max(bucket.headroom(), 1)
+                        bucket.next_slot = max(bucket.next_slot, now) + interval
+                    return best
+
+            logger.debug(f"Pacing {resource} request for {best_wait:.2f}s ({best.label})")
+            time.sleep(min(best_wait, 1.0))
+
+    def _reserve(self, bucket: BucketState) -> int:
+        return int(bucket.limit * self.reserve_fraction)
+
+    def _wait_for(self, state: TokenState, bucket: BucketState, now: float) -> float:
+        """Seconds until this token may send its next request."""
+        if state.blocked_until > now:
+            return state.blocked_until - now
+        if bucket.headroom() <= 0:
+            if bucket.in_flight and bucket.remaining > 0:
+                # Capacity returns when in-flight requests report back
+                return 0.05
+            return max(bucket.reset_at - now, 0.0)
+        if bucket.headroom() < self._reserve(bucket):
+            return max(bucket.next_slot - now, 0.0)
+        return 0.0
+
+    def release(
+        self,
+        state: TokenState,
+        resource: str = 'core',
+        headers: Optional[Mapping[str, str]] = None
+    ) -> None:
+        """
+        Return a slot and record the rate-limit headers of the response.
+
+        Args:
+            state: TokenState returned by acquire()
+            resource: Resource passed to acquire()
+            headers: Response headers, or None if the request failed
+        """
+        with self._lock:
+            bucket = self._bucket(state, resource)
+            bucket.in_flight = max(bucket.in_flight - 1, 0)
+            if headers:
+                self._update(state, resource, headers)
+
+    def _update(self, state: TokenState, resource: str, headers: Mapping[str, str]) -> None:
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None:
+            return
+        bucket = self._bucket(state, headers.get('X-RateLimit-Resource') or resource)
+        try:
+            bucket.remaining = int(remaining)
+            bucket.limit = int(headers.get('X-RateLimit-Limit', bucket.limit))
+            bucket.reset_at = float(headers.get('X-RateLimit-Reset', bucket.reset_at))
+        except ValueError:
+            return
+
+    def block(self, state: TokenState, seconds: float) -> None:
+        """
+        Block a token after a secondary rate limit (Retry-After).
+
+        Args:
+            state: Token that received the secondary limit
+            seconds: Retry-After value in seconds
+        """
+        with self._lock:
+            state.blocked_until = max(state.blocked_until, time.time() + seconds)
+        logger.warning(f"Secondary rate limit on {state.label}, pausing it for {seconds:.0f}s")
+
+    def has_headroom(self, resource: str = 'core') -> bool:
+        """Check whether any token could issue a request without waiting for reset."""
+        with self._lock:
+            now = time.time()
+            return any(
+                self._bucket(state, resource).headroom() > 0 and state.blocked_until <= now
+                for state in self.tokens
+            )
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Describe the current headroom of every token.
+
+        Returns:
+            List of per-token dictionaries (tokens are masked)
+        """
+        with self._lock:
+            return [
+                {
+                    'token': state.label,
+                    'blocked_until': state.blocked_until,
+                    'buckets': {
+                        resource: {
+                            'limit': bucket.limit,
+                            'remaining': bucket.remaining,
+                            'reset_at': bucket.reset_at,
+                            'in_flight': bucket.in_flight,
+                        }
+                        for resource, bucket in state.buckets.items()
+                    },
+                }
+                for state in self.tokens
+            ]
@@ -1,22 +1,182 @@
 """Repository analyzer for local repository analysis."""
 
+import heapq
+import io
+import json
 import os
+import re
 import shutil
+import subprocess
+import tarfile
 import tempfile
+import threading
+import tomllib
 import logging
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, Iterable, List, Optional, TextIO, Tuple
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
-try:
-    from git import Repo, GitCommandError
-    GIT_AVAILABLE = True
-except ImportError:
-    GIT_AVAILABLE = False
+from data_acquisition.deadline import Deadline, DeadlineExceeded, current_deadline
+from data_acquisition.blob_cache import BlobCache, FileFacts
+from data_acquisition.file_index import FileIndex, IndexedFile, git_blob_sha, is_binary_path, language_for_path
+from data_acquisition.git_analytics import GitAnalytics
+from data_acquisition.git_process import git_available, iter_git_lines, run_git
+from data_acquisition.mirror_cache import MirrorCache
+from utils.line_counter import LineCounter, count_bytes_lines
 
 logger = logging.getLogger(__name__)
 
+# Directories skipped when counting file extensions
+EXTENSION_SKIP_DIRS = frozenset({
+    '.git', 'node_modules', 'venv', '__pycache__',
+    'dist', 'build', '.venv', 'env', '.env',
+    'target', 'bin', 'obj', '.idea', '.vscode'
+})
+
+# Directories skipped when selecting files for quality analysis (tests included)
+SELECTION_SKIP_DIRS = EXTENSION_SKIP_DIRS | {'tests', 'test', '__tests__', 'spec'}
+
+# Code extensions to prioritize when selecting files
+CODE_EXTENSIONS = frozenset({
+    '.py', '.js', '.ts', '.tsx', '.jsx',
+    '.java', '.go', '.rs', '.cpp', '.c',
+    '.rb', '.php', '.cs', '.swift', '.kt'
+})
+
+# File name fragments excluded from selection (tests, minified and generated code)
+SKIP_PATTERNS = (
+    'test', 'spec', '.min.', 'vendor', 'generated',
+    '.bundle.', 'dist/', 'build/', '__pycache__'
+)
+
+# Dependency manifests: file name -> (parser method, ecosystem). Within a
+# directory the first listed wins for a dependency, so lockfiles come before
+# the manifests they resolve
+DEPENDENCY_MANIFESTS = {
+    'requirements.txt': ('_parse_requirements_txt', 'Python'),
+    'pyproject.toml': ('_parse_pyproject_toml', 'Python'),
+    'Pipfile': ('_parse_pipfile', 'Python'),
+    'package-lock.json': ('_parse_package_lock_json', 'Node.js'),
+    'package.json': ('_parse_package_json', 'Node.js'),
+    'go.mod': ('_parse_go_mod', 'Go'),
+    'Cargo.toml': ('_parse_cargo_toml', 'Rust'),
+    'pom.xml': ('_parse_pom_xml', 'Java'),
+    'build.gradle': ('_parse_build_gradle', 'Java'),
+    'build.gradle.kts': ('_parse_build_gradle', 'Java'),
+}
+
+# Manifests larger than this are not parsed (lockfiles of large projects run to several MB)
+MANIFEST_MAX_BYTES = 8 * 1024 * 1024
+
+# Manifests parsed per repository, the shallowest first
+MAX_MANIFESTS = 500
+
+# Threads reading and parsing manifests
+MANIFEST_WORKERS = 8
+
+# Parsed manifests kept in memory, keyed by file name and content hash
+MANIFEST_CACHE_ENTRIES = 4096
+
+# Version specifiers in requirements.txt and PEP 508 dependency strings
+REQUIREMENT_SEPARATORS = ('==', '>=', '<=', '~=', '!=', '<', '>')
+
+# Gradle configurations whose dependencies ship with the project
+GRADLE_DEPENDENCY = re.compile(
+    r'^\s*(?:implementation|api|compile|compileOnly|runtimeOnly|runtime|annotationProcessor|kapt)'
+    r'\s*\(?\s*[\'"]([^\'":\s]+):([^\'":\s]+)(?::([^\'"@\s]+))?'
+)
+
+# Lines are counted for this many candidates per selected file, the largest by bytes
+LINE_COUNT_CANDIDATES = 4
+
+# Commits read past the 12-month window before the analytics log is stopped
+HISTORY_SLOP = 100
+
+# Clone strategies: "full" downloads every blob of the history, "blobless"
+# only commits and trees, plus the blobs of the files local analysis reads
+CLONE_STRATEGIES = ('full', 'blobless')
+
+
+def _count_extension(counts: Dict[str, int], dirs: List[str], file: str) -> None:
+    """Count ``file`` by extension unless it is under a skipped directory."""
+    ext = os.path.splitext(file)[1].lower()
+    if ext and not any(d in EXTENSION_SKIP_DIRS for d in dirs):
+        counts[ext] = counts.get(ext, 0) + 1
+
+
+def _is_selection_candidate(dirs: List[str], file: str) -> bool:
+    """True if ``file`` may be selected for quality analysis."""
+    if os.path.splitext(file)[1].lower() not in CODE_EXTENSIONS:
+        return False
+    if any(d in SELECTION_SKIP_DIRS for d in dirs):
+        return False
+    return not any(pattern in file.lower() for pattern in SKIP_PATTERNS)
+
+
+def _is_manifest(dirs: List[str], file: str) -> bool:
+    """True if ``file`` is a dependency manifest outside vendored, build and test directories."""
+    return file in DEPENDENCY_MANIFESTS and not any(d in SELECTION_SKIP_DIRS for d in dirs)
+
+
+def _manifest_order(path: str) -> Tuple[int, str, int]:
+    """Sort key: shallowest directory first, then DEPENDENCY_MANIFESTS order within a directory."""
+    directory, _, file = path.rpartition('/')
+    return path.count('/'), directory, list(DEPENDENCY_MANIFESTS).index(file)
+
+
+def _python_requirement(spec: str) -> Optional[Dict[str, str]]:
+    """Parse a requirement such as ``requests[socks]>=2.0; python_version < "3.8"``."""
+    spec = spec.split(';', 1)[0].strip()
+    if not spec:
+        return None
+    if ' @ ' in spec:
+        # Direct reference: name @ URL
+        return {'name': spec.split(' @ ', 1)[0].strip(), 'version': 'unspecified', 'ecosystem': 'Python'}
+    for sep in REQUIREMENT_SEPARATORS:
+        if sep in spec:
+            name, version = spec.split(sep, 1)
+            return {'name': name.split('[', 1)[0].strip(), 'version': version.strip(), 'ecosystem': 'Python'}
+    # No version specified
+    return {'name': spec.split('[', 1)[0].strip(), 'version': 'unspecified', 'ecosystem': 'Python'}
+
+
+def _merge_dependencies(manifests: List[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    """
+    Deduplicate dependencies across manifests, grouped by ecosystem.
+    
+    The first manifest listing a dependency wins, except that a later
+    version replaces 'unspecified'. Ecosystems and dependencies keep the
+    order in which they are first seen.
+    """
+    by_ecosystem: Dict[str, Dict[str, Dict[str, str]]] = {}
+    for dependencies in manifests:
+        for dependency in dependencies:
+            merged = by_ecosystem.setdefault(dependency['ecosystem'], {})
+            known = merged.get(dependency['name'])
+            if known is None:
+                merged[dependency['name']] = dict(dependency)
+            elif known['version'] == 'unspecified' and dependency['version'] != 'unspecified':
+                known['version'] = dependency['version']
+    return [dependency for merged in by_ecosystem.values() for dependency in merged.values()]
+
+
+@dataclass
+class TarballSnapshot:
+    """Local-analysis results computed from a streamed repository tarball."""
+    
+    extension_counts: Dict[str, int] = field(default_factory=dict)
+    selected_files: List[str] = field(default_factory=list)  # Largest code files first
+    code_samples: Dict[str, str] = field(default_factory=dict)  # Contents of selected_files
+    dependencies: List[Dict[str, str]] = field(default_factory=list)
+    files: int = 0  # Regular files in the archive
+    candidates: int = 0  # Files considered for selection
+    bytes_read: int = 0  # Uncompressed bytes of the files that were read
+    truncated: bool = False  # Stopped at the deadline before the end of the archive
+
 
 class RepositoryAnalyzer:
     """
@@ -30,71 +190,127 @@ class RepositoryAnalyzer:
     - Extracting dependencies
     """
     
-    def __init__(self, clone_timeout: int = 300, temp_dir: str = "/tmp/reporank"):
+    def __init__(self, clone_timeout: int = 300, temp_dir: str = "/tmp/reporank",
+                 mirror_cache: Optional[MirrorCache] = None, clone_strategy: str = "blobless",
+                 line_counter: Optional[LineCounter] = None, blob_cache: Optional[BlobCache] = None):
         """
         Initialize repository analyzer.
         
         Args:
             clone_timeout: Timeout in seconds for clone operations (default: 300)
             temp_dir: Base directory for temporary clones (default: /tmp/reporank)
+            mirror_cache: Optional cache of bare mirrors that clones are made from
+            clone_strategy: "blobless" (default) or "full", see clone_repository()
+            line_counter: Counts lines for file selection (default: in-process)
+            blob_cache: Optional persistent cache of per-file facts by blob SHA,
+                consulted before counting lines or parsing manifests
         """
+        if clone_strategy not in CLONE_STRATEGIES:
+            raise ValueError(f"Unknown clone strategy '{clone_strategy}', expected one of {CLONE_STRATEGIES}")
         self.clone_timeout = clone_timeout
         self.temp_dir = temp_dir
+        self.mirror_cache = mirror_cache
+        self.clone_strategy = clone_strategy
+        self.line_counter = line_counter or LineCounter()
+        self.blob_cache = blob_cache
         self._cloned_paths: List[str] = []
+        # File index per clone (see file_index()), built once and shared by the stages
+        self._file_indexes: Dict[str, FileIndex] = {}
+        self._index_locks: Dict[str, threading.Lock] = {}
+        self._index_guard = threading.Lock()
+        # Parsed manifests by (file name, blob SHA), shared by every repository
+        # analyzed with this instance, so forks and vendored copies parse once
+        self._manifest_cache: "OrderedDict[Tuple[str, str], List[Dict[str, str]]]" = OrderedDict()
+        self._manifest_cache_lock = threading.Lock()
         
-        if not GIT_AVAILABLE:
-            logger.warning("GitPython not available. Repository cloning will be disabled.")
+        if not git_available():
+            logger.warning("git executable not found. Repository cloning and history analysis will be disabled.")
     
-    def clone_repository(self, url: str, target_dir: Optional[str] = None, shallow: bool = False) -> str:
+    def clone_repository(
+        self,
+        url: str,
+        target_dir: Optional[str] = None,
+        shallow: bool = False,
+        size_hint: Optional[FileIndex] = None,
+        max_files: int = 5
+    ) -> str:
         """
         Clone a Git repository to a temporary directory.
         
+        The clone runs the git executable directly so it can be killed: it is
+        bounded by clone_timeout and by the current deadline (see
+        deadline.py), whichever ends first. With a mirror cache the
+        repository's mirror is created or fetched and the clone is made from
+        it; if that fails for any reason other than time, the repository is
+        cloned directly.
+        
+        With the blobless strategy (unless ``shallow``) only commits and trees
+        are downloaded, which is all history analysis needs. The blobs of the
+        root dependency manifests and of the files eligible for
+        select_files_for_analysis() are then fetched in one batch and only
+        those files are checked out; the file index covers the whole tree.
+        With ``size_hint``, eligible files are ranked by the blob sizes it
+        lists and only the ones select_files_for_analysis(max_files) can
+        pick are fetched; files it has no size for are always fetched.
+        If the blobless clone fails, a full clone is made.
+        
         Args:
             url: Git repository URL (e.g., https://github.com/owner/repo.git)
             target_dir: Optional target directory. If None, creates a temp directory.
             shallow: If True, performs shallow clone (depth=1). Default False for full history.
+            size_hint: Index with blob sizes of the tree, e.g. GitHubClient.get_tree_index();
+                matched by blob SHA, so an index of another commit is safe
+            max_files: Files select_files_for_analysis() will be asked for
             
         Returns:
             Path to the cloned repository
             
         Raises:
-            RuntimeError: If GitPython is not available
-            GitCommandError: If cloning fails
+            RuntimeError: If git is not available or cloning fails
             TimeoutError: If cloning exceeds timeout
         """
-        if not GIT_AVAILABLE:
-            raise RuntimeError(
-                "GitPython is not installed. Install it with: pip install gitpython"
-            )
+        if not git_available():
+            raise RuntimeError("git is not installed or not on PATH")
+        
+        deadline = current_deadline()
+        deadline = deadline.child(self.clone_timeout) if deadline is not None else Deadline(self.clone_timeout)
+        timeout = deadline.timeout()
         
         # Create target directory if not provided
         if target_dir is None:
             os.makedirs(self.temp_dir, exist_ok=True)
             target_dir = tempfile.mkdtemp(dir=self.temp_dir, prefix="repo_")
         
-        clone_type = "shallow" if shallow else "full"
+        blobless = self.clone_strategy == "blobless" and not shallow
+        clone_type = "shallow" if shallow else self.clone_strategy
         logger.info(
             f"Cloning repository ({clone_type}) from {url} to {target_dir}",
             extra={
                 'clone_type': clone_type,
                 'url': url,
                 'target_dir': target_dir,
-                'timeout': self.clone_timeout
+                'timeout': timeout
             }
         )
         
+        # Only clone the default branch, with or without depth limit
+        command = ['clone', '--quiet', '--single-branch']
+        if shallow:
+            command += ['--depth', '1']  # Shallow clone for faster cloning
+        command += [url, target_dir]
+        
         try:
-            # Clone with or without depth limit
-            clone_kwargs = {
-                'url': url,
-                'to_path': target_dir,
-                'single_branch': True,  # Only clone default branch
-            }
-            
-            if shallow:
-                clone_kwargs['depth'] = 1  # Shallow clone for faster cloning
-            
-            repo = Repo.clone_from(**clone_kwargs)
+            if blobless:
+                try:
+                    self._clone_blobless(url, target_dir, deadline, size_hint, max_files)
+                except subprocess.CalledProcessError as e:
+                    details = (e.stderr or '').strip() or str(e)
+                    logger.warning(f"⚠ Blobless clone of {url} failed, falling back to a full clone: {details}")
+                    self._file_indexes.pop(target_dir, None)
+                    self._reset_directory(target_dir)
+                    blobless = False
+            if not blobless and not self._clone_from_mirror(url, target_dir, deadline):
+                run_git(command, timeout=deadline.timeout())
             
             self._cloned_paths.append(target_dir)
             logger.info(
@@ -103,9 +319,19 @@ class RepositoryAnalyzer:
             )
             return target_dir
             
-        except GitCommandError as e:
+        except (subprocess.TimeoutExpired, DeadlineExceeded) as e:
+            # git has been killed; drop the partial clone
+            logger.error(
+                f"Git clone timed out after {timeout:.0f}s",
+                extra={'url': url, 'error_type': 'TimeoutExpired', 'fallback': 'API-only mode'}
+            )
+            shutil.rmtree(target_dir, ignore_errors=True)
+            raise TimeoutError(f"Git clone timed out after {timeout:.0f}s") from e
+            
+        except subprocess.CalledProcessError as e:
+            details = (e.stderr or '').strip() or str(e)
             error_msg = (
-                f"Git clone failed: {str(e)}. "
+                f"Git clone failed: {details}. "
                 f"This could be due to: "
                 f"1) Repository is too large, "
                 f"2) Network connectivity issues, "
@@ -117,8 +343,8 @@ class RepositoryAnalyzer:
                 error_msg,
                 extra={
                     'url': url,
-                    'error_type': 'GitCommandError',
-                    'error_details': str(e),
+                    'error_type': 'CalledProcessError',
+                    'error_details': details,
                     'fallback': 'API-only mode'
                 }
             )
@@ -152,6 +378,116 @@ class RepositoryAnalyzer:
                     logger.warning(f"Failed to cleanup directory {target_dir}: {cleanup_error}")
             raise RuntimeError(error_msg) from e
     
+    def _clone_from_mirror(self, url: str, target_dir: str, deadline: Deadline, blobless: bool = False) -> bool:
+        """
+        Check the repository out of the mirror cache.
+        
+        Returns:
+            True if target_dir now holds the clone, False if there is no
+            cache or it failed (target_dir is emptied for a direct clone)
+        
+        Raises:
+            subprocess.TimeoutExpired, DeadlineExceeded: If the clone ran out of time
+        """
+        if self.mirror_cache is None:
+            return False
+        try:
+            self.mirror_cache.checkout(url, target_dir, deadline, blobless=blobless)
+            return True
+        except (subprocess.TimeoutExpired, DeadlineExceeded):
+            raise
+        except Exception as e:
+            details = (getattr(e, 'stderr', None) or '').strip() or str(e)
+            logger.warning(f"⚠ Mirror cache failed for {url}, cloning directly: {details}")
+            self._reset_directory(target_dir)
+            return False
+    
+    def _clone_blobless(
+        self,
+        url: str,
+        target_dir: str,
+        deadline: Deadline,
+        size_hint: Optional[FileIndex] = None,
+        max_files: int = 5
+    ) -> None:
+        """
+        Make a blobless partial clone and check out the files analysis reads.
+        
+        Blob sizes cannot be read locally (``git cat-file`` would fetch each
+        missing blob), so selection candidates are ranked by ``size_hint``.
+        
+        Raises:
+            subprocess.TimeoutExpired, DeadlineExceeded: If the clone ran out of time
+            subprocess.CalledProcessError: If a git command failed
+        """
+        if not self._clone_from_mirror(url, target_dir, deadline, blobless=True):
+            run_git(
+                ['clone', '--quiet', '--no-checkout', '--single-branch', '--filter=blob:none', url, target_dir],
+                timeout=deadline.timeout()
+            )
+        
+        # Trees are local, so listing HEAD needs no network
+        listing = run_git(['ls-tree', '-r', '-z', 'HEAD'], timeout=deadline.timeout(), cwd=target_dir)
+        paths: List[Tuple[str, str]] = []  # (path, blob id)
+        wanted: Dict[str, str] = {}  # path -> blob id
+        hinted: List[Tuple[str, str, int]] = []  # candidates with a known size
+        hint_sizes = {entry.sha: entry.size for entry in size_hint} if size_hint is not None else {}
+        for record in listing.split('\0'):
+            if not record:
+                continue
+            meta, _, path = record.partition('\t')
+            _, object_type, object_id = meta.split()
+            if object_type != 'blob':
+                continue  # Submodules
+            paths.append((path, object_id))
+            *dirs, file = path.split('/')
+            if _is_manifest(dirs, file):
+                # Already parsed in this process: extract_dependencies() needs only the blob id
+                if self._cached_dependencies((file, object_id), persistent=False) is None:
+                    wanted[path] = object_id
+            elif _is_selection_candidate(dirs, file) and not is_binary_path(path):
+                if object_id in hint_sizes:
+                    hinted.append((path, object_id, hint_sizes[object_id]))
+                else:
+                    wanted[path] = object_id
+        # The same ranking as select_files_for_analysis(), ties in tree order
+        for path, object_id, _ in heapq.nlargest(
+            max_files * LINE_COUNT_CANDIDATES, hinted, key=lambda candidate: candidate[2]
+        ):
+            wanted[path] = object_id
+        
+        run_git(['read-tree', 'HEAD'], timeout=deadline.timeout(), cwd=target_dir)
+        if wanted:
+            # One batched fetch; checking files out one by one would fetch
+            # each missing blob in its own round trip
+            run_git(
+                ['-c', 'fetch.negotiationAlgorithm=noop', 'fetch', '--quiet', '--no-tags',
+                 '--no-write-fetch-head', '--recurse-submodules=no', '--filter=blob:none', '--stdin', 'origin'],
+                timeout=deadline.timeout(), cwd=target_dir, input='\n'.join(set(wanted.values())) + '\n'
+            )
+            run_git(
+                ['checkout-index', '-z', '--stdin'],
+                timeout=deadline.timeout(), cwd=target_dir, input='\0'.join(wanted) + '\0'
+            )
+        # Sizes are known for the checked-out files only, the others are never read
+        self._file_indexes[target_dir] = FileIndex(
+            IndexedFile(
+                path=path, sha=object_id, binary=is_binary_path(path),
+                size=os.path.getsize(os.path.join(target_dir, path)) if path in wanted else 0
+            )
+            for path, object_id in paths
+        )
+        logger.info(
+            f"Checked out {len(wanted)} of {len(paths)} files from blobless clone "
+            f"({len(hinted)} candidates ranked by size)"
+        )
+    
+    @staticmethod
+    def _reset_directory(path: str) -> None:
+        """Empty ``path`` for another clone attempt."""
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+    
     def cleanup(self, repo_path: Optional[str] = None) -> None:
         """
         Remove temporary directories created during analysis.
@@ -165,6 +501,8 @@ class RepositoryAnalyzer:
             paths_to_clean = self._cloned_paths.copy()
         
         for path in paths_to_clean:
+            self._file_indexes.pop(path, None)
+            self._index_locks.pop(path, None)
             if os.path.exists(path):
                 try:
                     shutil.rmtree(path)
@@ -174,11 +512,43 @@ class RepositoryAnalyzer:
                 except Exception as e:
                     logger.warning(f"Failed to clean up {path}: {e}")
     
+    def file_index(self, repo_path: str) -> FileIndex:
+        """
+        Index of the files in a clone, shared by the local analysis stages.
+        
+        The clone is scanned once (FileIndex.from_directory()) and the index
+        is reused by analyze_file_extensions(), select_files_for_analysis()
+        and extract_dependencies() until cleanup(). Stages running at the
+        same time wait for one scan. An index cut short by the deadline is
+        returned but not kept, so the next stage scans again under its own
+        budget. Blobless clones are indexed from their tree listing.
+        
+        Args:
+            repo_path: Path to the repository root
+            
+        Returns:
+            FileIndex of the repository (``truncated`` if the scan ran out of time)
+        """
+        with self._index_guard:
+            lock = self._index_locks.setdefault(repo_path, threading.Lock())
+        with lock:
+            index = self._file_indexes.get(repo_path)
+            if index is None:
+                index = FileIndex.from_directory(repo_path)
+                if index.truncated:
+                    logger.warning(f"⚠ Time budget exhausted, indexed {len(index)} files of {repo_path}")
+                else:
+                    self._file_indexes[repo_path] = index
+                    logger.info(f"Indexed {len(index)} files in {repo_path}")
+            return index
+    
     def analyze_file_extensions(self, repo_path: str) -> Dict[str, int]:
         """
-        Walk repository and count file extensions.
+        Count file extensions in the repository.
         
         Skips common non-code directories like .git, node_modules, venv, etc.
+        If the current deadline passes, the scan stops and the counts so far
+        are returned (check ``current_deadline().expired`` to tell).
         
         Args:
             repo_path: Path to the repository root
@@ -186,26 +556,8 @@ class RepositoryAnalyzer:
         Returns:
             Dictionary mapping extensions to counts, e.g., {'.py': 150, '.js': 45}
         """
-        extension_counts: Dict[str, int] = {}
-        
-        # Directories to skip
-        skip_dirs = {
-            '.git', 'node_modules', 'venv', '__pycache__', 
-            'dist', 'build', '.venv', 'env', '.env',
-            'target', 'bin', 'obj', '.idea', '.vscode'
-        }
-        
         logger.info(f"Analyzing file extensions in {repo_path}")
-        
-        for root, dirs, files in os.walk(repo_path):
-            # Filter out directories to skip (modifies dirs in-place)
-            dirs[:] = [d for d in dirs if d not in skip_dirs]
-            
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext:  # Only count files with extensions
-                    extension_counts[ext] = extension_counts.get(ext, 0) + 1
-        
+        extension_counts = self.file_index(repo_path).extension_counts()
         logger.info(f"Found {len(extension_counts)} unique file extensions")
         return extension_counts
 
@@ -218,6 +570,12 @@ class RepositoryAnalyzer:
         Select the largest source code files for quality analysis.
         
         Prioritizes code files and skips test files, minified files, and generated code.
+        Candidates are ranked by byte size from the file index, and lines
+        are counted only for the largest LINE_COUNT_CANDIDATES times
+        ``max_files`` of them, on raw bytes by ``line_counter``; counts
+        already in ``blob_cache`` are not recounted. If the current deadline
+        passes, selection uses the files counted so far, i.e. a sample of
+        the repository.
         
         Args:
             repo_path: Path to the repository root
@@ -226,68 +584,143 @@ class RepositoryAnalyzer:
         Returns:
             List of file paths (relative to repo_path) sorted by size (largest first)
         """
-        # Code extensions to prioritize
-        code_extensions = {
-            '.py', '.js', '.ts', '.tsx', '.jsx',
-            '.java', '.go', '.rs', '.cpp', '.c', 
-            '.rb', '.php', '.cs', '.swift', '.kt'
-        }
-        
-        # Patterns to skip
-        skip_patterns = [
-            'test', 'spec', '.min.', 'vendor', 'generated',
-            '.bundle.', 'dist/', 'build/', '__pycache__'
+        logger.info(f"Selecting files for analysis from {repo_path}")
+        index = self.file_index(repo_path)
+        deadline = current_deadline()
+        
+        candidates = []
+        for entry in index:
+            *dirs, file = entry.path.split('/')
+            if not entry.binary and _is_selection_candidate(dirs, file):
+                candidates.append(entry)
+        largest = heapq.nlargest(max_files * LINE_COUNT_CANDIDATES, candidates, key=lambda entry: entry.size)
+        
+        # Reuse line counts of contents seen before, in this repository or another
+        shas = self._blob_ids(repo_path, index, [entry.path for entry in largest])
+        facts = self.blob_cache.get_facts(shas.values()) if self.blob_cache is not None else {}
+        line_counts: Dict[str, int] = {}
+        uncounted = []
+        for entry in largest:
+            fact = facts.get(shas.get(entry.path, ''))
+            if fact is not None and fact.line_count is not None:
+                line_counts[entry.path] = fact.line_count
+            else:
+                uncounted.append(entry)
+        
+        # Count lines of code; past the deadline only the files counted so far are kept
+        counted = self.line_counter.count(
+            ((os.path.join(repo_path, entry.path), entry.size) for entry in uncounted), deadline=deadline
+        )
+        new_facts: Dict[str, FileFacts] = {}
+        for entry in uncounted:
+            line_count = counted.get(os.path.join(repo_path, entry.path))
+            if line_count is not None:
+                line_counts[entry.path] = line_count
+                if self.blob_cache is not None and entry.path in shas:
+                    new_facts[shas[entry.path]] = FileFacts(
+                        line_count=line_count, language=language_for_path(entry.path), binary=entry.binary
+                    )
+        if new_facts:
+            self.blob_cache.put_facts(new_facts)
+        if facts:
+            logger.info(f"Line counts of {len(largest) - len(uncounted)} of {len(largest)} files from the blob cache")
+        
+        file_sizes: List[Tuple[str, int]] = [
+            (entry.path, line_counts[entry.path]) for entry in largest if entry.path in line_counts
         ]
         
-        # Directories to skip
-        skip_dirs = {
-            '.git', 'node_modules', 'venv', '__pycache__', 
-            'dist', 'build', '.venv', 'env', '.env',
-            'target', 'bin', 'obj', '.idea', '.vscode',
-            'tests', 'test', '__tests__', 'spec'
-        }
+        # Sort by line count (descending) and take top N
+        file_sizes.sort(key=lambda x: x[1], reverse=True)
+        selected_files = [path for path, _ in file_sizes[:max_files]]
         
-        file_sizes: List[Tuple[str, int]] = []
+        logger.info(f"Selected {len(selected_files)} of {len(candidates)} candidate files for analysis")
+        return selected_files
+
+    def analyze_tarball(self, stream: BinaryIO, max_files: int = 5) -> TarballSnapshot:
+        """
+        Compute file extensions, file selection and dependencies from a tarball stream.
         
-        logger.info(f"Selecting files for analysis from {repo_path}")
+        The archive (e.g. GitHubClient.open_tarball() or a local .tar.gz) is
+        read front to back in stream mode, so nothing is written to disk and
+        only the current member plus the largest candidates by byte size
+        (LINE_COUNT_CANDIDATES per selected file) are held in memory. The rules match analyze_file_extensions(),
+        select_files_for_analysis() and extract_dependencies(). GitHub
+        tarballs wrap the tree in one top-level directory, which is stripped.
+        If the current deadline passes, reading stops and the snapshot holds
+        what was seen so far (``truncated``).
         
-        for root, dirs, files in os.walk(repo_path):
-            # Filter out directories to skip
-            dirs[:] = [d for d in dirs if d not in skip_dirs]
+        Args:
+            stream: Readable binary stream of a (possibly compressed) tar archive
+            max_files: Maximum number of files to select (default: 5)
             
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                
-                # Only consider files with code extensions
-                if ext not in code_extensions:
+        Returns:
+            TarballSnapshot with the results
+            
+        Raises:
+            tarfile.TarError: If the stream is not a valid tar archive
+        """
+        snapshot = TarballSnapshot()
+        # Min-heap of (size, -position, path, content): the largest candidates so far
+        largest: List[Tuple[int, int, str, bytes]] = []
+        capacity = max_files * LINE_COUNT_CANDIDATES
+        manifests: Dict[str, bytes] = {}
+        deadline = current_deadline()
+        
+        logger.info("Analyzing repository tarball stream")
+        
+        with tarfile.open(fileobj=stream, mode='r|*') as archive:
+            for member in archive:
+                if deadline is not None and deadline.expired:
+                    logger.warning(f"⚠ Time budget exhausted, tarball analysis stopped after {snapshot.files} files")
+                    snapshot.truncated = True
+                    break
+                if not member.isfile():
                     continue
-                
-                # Skip files matching skip patterns
-                file_lower = file.lower()
-                if any(pattern in file_lower for pattern in skip_patterns):
+                path = member.name.partition('/')[2]
+                if not path:
                     continue
+                snapshot.files += 1
+                *dirs, file = path.split('/')
+                _count_extension(snapshot.extension_counts, dirs, file)
                 
-                file_path = os.path.join(root, file)
+                if _is_manifest(dirs, file):
+                    if member.size <= MANIFEST_MAX_BYTES and len(manifests) < MAX_MANIFESTS:
+                        content = archive.extractfile(member).read()
+                        snapshot.bytes_read += len(content)
+                        manifests[path] = content
+                    continue
                 
-                try:
-                    # Count lines of code
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        line_count = sum(1 for _ in f)
-                    
-                    # Get relative path from repo root
-                    rel_path = os.path.relpath(file_path, repo_path)
-                    file_sizes.append((rel_path, line_count))
-                    
-                except Exception as e:
-                    logger.debug(f"Could not read file {file_path}: {e}")
+                if not _is_selection_candidate(dirs, file):
                     continue
+                
+                snapshot.candidates += 1
+                key = (member.size, -snapshot.candidates)
+                if len(largest) == capacity and (capacity == 0 or key <= largest[0][:2]):
+                    continue  # Smaller than every kept candidate, never read
+                content = archive.extractfile(member).read()
+                snapshot.bytes_read += len(content)
+                if len(largest) < capacity:
+                    heapq.heappush(largest, key + (path, content))
+                else:
+                    heapq.heapreplace(largest, key + (path, content))
         
-        # Sort by line count (descending) and take top N
-        file_sizes.sort(key=lambda x: x[1], reverse=True)
-        selected_files = [path for path, _ in file_sizes[:max_files]]
+        # Largest by bytes first, then by line count like select_files_for_analysis()
+        by_size = sorted(largest, key=lambda entry: entry[:2], reverse=True)
+        by_lines = sorted(
+            by_size,
+            key=lambda entry: count_bytes_lines(entry[3]),
+            reverse=True
+        )
+        for _, _, path, content in by_lines[:max_files]:
+            snapshot.selected_files.append(path)
+            snapshot.code_samples[path] = content.decode('utf-8', errors='ignore')
+        snapshot.dependencies = self.extract_dependencies_from_manifests(manifests)
         
-        logger.info(f"Selected {len(selected_files)} files for analysis")
-        return selected_files
+        logger.info(
+            f"Analyzed tarball: {snapshot.files} files, {len(snapshot.extension_counts)} extensions, "
+            f"{snapshot.candidates} candidates, {len(snapshot.selected_files)} selected"
+        )
+        return snapshot
 
     def read_file_contents(
         self, 
@@ -328,104 +761,262 @@ class RepositoryAnalyzer:
 
     def extract_dependencies(self, repo_path: str) -> List[Dict[str, str]]:
         """
-        Extract dependencies from common dependency files.
+        Extract dependencies from the dependency manifests of the repository.
         
-        Detects and parses:
-        - requirements.txt (Python)
-        - package.json (Node.js)
+        Detects and parses, at any depth outside vendored, build and test
+        directories (see DEPENDENCY_MANIFESTS):
+        - requirements.txt, pyproject.toml, Pipfile (Python)
+        - package.json, package-lock.json (Node.js)
         - go.mod (Go)
         - Cargo.toml (Rust)
+        - pom.xml, build.gradle, build.gradle.kts (Java)
+        
+        Manifests are found in the file index, read and parsed on a thread
+        pool, and cached by content hash, so identical manifests (packages of
+        a monorepo, forks analyzed in the same batch) are parsed once. In
+        blobless clones the hash comes from the tree listing, and cached
+        manifests are not even downloaded. At most MAX_MANIFESTS manifests
+        are read, the shallowest first.
         
         Args:
             repo_path: Path to the repository root
             
         Returns:
-            List of dependency dictionaries with 'name', 'version', and 'ecosystem' keys
+            List of dependency dictionaries with 'name', 'version', and 'ecosystem' keys,
+            deduplicated and grouped by ecosystem
         """
-        dependencies: List[Dict[str, str]] = []
-        
         logger.info(f"Extracting dependencies from {repo_path}")
         
-        # Python: requirements.txt
-        req_file = os.path.join(repo_path, 'requirements.txt')
-        if os.path.exists(req_file):
-            deps = self._parse_requirements_txt(req_file)
-            dependencies.extend(deps)
-            logger.info(f"Found {len(deps)} Python dependencies")
-        
-        # Node.js: package.json
-        pkg_file = os.path.join(repo_path, 'package.json')
-        if os.path.exists(pkg_file):
-            deps = self._parse_package_json(pkg_file)
-            dependencies.extend(deps)
-            logger.info(f"Found {len(deps)} Node.js dependencies")
-        
-        # Go: go.mod
-        go_file = os.path.join(repo_path, 'go.mod')
-        if os.path.exists(go_file):
-            deps = self._parse_go_mod(go_file)
-            dependencies.extend(deps)
-            logger.info(f"Found {len(deps)} Go dependencies")
-        
-        # Rust: Cargo.toml
-        cargo_file = os.path.join(repo_path, 'Cargo.toml')
-        if os.path.exists(cargo_file):
-            deps = self._parse_cargo_toml(cargo_file)
-            dependencies.extend(deps)
-            logger.info(f"Found {len(deps)} Rust dependencies")
-        
-        logger.info(f"Total dependencies extracted: {len(dependencies)}")
+        index = self.file_index(repo_path)
+        paths = []
+        for path in index.manifests(DEPENDENCY_MANIFESTS):
+            *dirs, file = path.split('/')
+            if _is_manifest(dirs, file):
+                paths.append(path)
+        paths.sort(key=_manifest_order)
+        if len(paths) > MAX_MANIFESTS:
+            logger.warning(f"⚠ Found {len(paths)} manifests, parsing the {MAX_MANIFESTS} shallowest")
+            paths = paths[:MAX_MANIFESTS]
+        
+        # Look up each distinct content once, and read only what is not cached
+        shas = self._blob_ids(repo_path, index, paths)
+        known: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+        missed = set()
+        to_read: List[str] = []
+        for path in paths:
+            if index.files[path].size > MANIFEST_MAX_BYTES:
+                logger.debug(f"Skipping manifest {path} ({index.files[path].size} bytes)")
+                continue
+            key = (path.rsplit('/', 1)[-1], shas.get(path, ''))
+            if not key[1]:
+                to_read.append(path)  # Hashed once read
+            elif key not in known and key not in missed:
+                cached = self._cached_dependencies(key)
+                if cached is not None:
+                    known[key] = cached
+                else:
+                    missed.add(key)
+                    to_read.append(path)
+        
+        def read(path: str) -> Optional[bytes]:
+            try:
+                return self._read_manifest(repo_path, path, shas.get(path))
+            except (OSError, ValueError, subprocess.SubprocessError) as e:
+                logger.debug(f"Could not read manifest {path}: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=MANIFEST_WORKERS, thread_name_prefix='manifests') as pool:
+            contents = dict(zip(to_read, pool.map(read, to_read)))
+        
+        loaded: List[Tuple[str, str, Optional[bytes]]] = []
+        for path in paths:
+            content = contents.get(path)
+            sha = shas.get(path) or (git_blob_sha(content) if content is not None else '')
+            if content is not None or (path.rsplit('/', 1)[-1], sha) in known:
+                loaded.append((path, sha, content))
+            elif sha and (path.rsplit('/', 1)[-1], sha) in missed:
+                loaded.append((path, sha, None))  # Same content as a manifest read above
+        dependencies = self._dependencies_from_manifests(loaded, known, missed)
+        
+        logger.info(f"Total dependencies extracted: {len(dependencies)} from {len(loaded)} manifests")
+        return dependencies
+    
+    def extract_dependencies_from_manifests(self, manifests: Dict[str, bytes]) -> List[Dict[str, str]]:
+        """
+        Extract dependencies from manifest contents read elsewhere (e.g. a tarball).
+        
+        Args:
+            manifests: Manifest paths (file names in DEPENDENCY_MANIFESTS) to contents
+            
+        Returns:
+            List of dependency dictionaries, as from extract_dependencies()
+        """
+        loaded = [
+            (path, git_blob_sha(manifests[path]), manifests[path])
+            for path in sorted(manifests, key=_manifest_order)
+        ]
+        dependencies = self._dependencies_from_manifests(loaded)
+        logger.info(f"Total dependencies extracted: {len(dependencies)} from {len(loaded)} manifests")
+        return dependencies
+    
+    @staticmethod
+    def _read_manifest(repo_path: str, path: str, sha: Optional[str]) -> bytes:
+        """Read a manifest from the working copy, or from git if a blobless clone skipped it."""
+        try:
+            with open(os.path.join(repo_path, path), 'rb') as f:
+                return f.read(MANIFEST_MAX_BYTES + 1)
+        except FileNotFoundError:
+            if not sha:
+                raise
+            # Left out of the checkout because it was cached, then evicted: fetch it on demand
+            return run_git(['cat-file', 'blob', sha], timeout=60, cwd=repo_path).encode('utf-8')
+    
+    def _dependencies_from_manifests(
+        self,
+        loaded: List[Tuple[str, str, Optional[bytes]]],
+        known: Optional[Dict[Tuple[str, str], List[Dict[str, str]]]] = None,
+        missed: Iterable[Tuple[str, str]] = ()
+    ) -> List[Dict[str, str]]:
+        """
+        Parse manifests not in the cache yet and merge the dependencies of all of them.
+        
+        Args:
+            loaded: (path, content hash, content) in merge order; content is
+                None if another entry with the same hash carries it, or the
+                manifest is in ``known``
+            known: Cached dependencies already looked up, by (file name, hash)
+            missed: Keys already looked up and not cached
+        """
+        parsed: Dict[Tuple[str, str], List[Dict[str, str]]] = dict(known or {})
+        missed = set(missed)
+        pending: Dict[Tuple[str, str], bytes] = {}
+        for path, sha, content in loaded:
+            key = (path.rsplit('/', 1)[-1], sha)
+            if key in parsed or key in pending or content is None:
+                continue
+            cached = None if key in missed else self._cached_dependencies(key)
+            if cached is not None:
+                parsed[key] = cached
+            else:
+                pending[key] = content
+        
+        def parse(key: Tuple[str, str]) -> List[Dict[str, str]]:
+            text = pending[key][:MANIFEST_MAX_BYTES].decode('utf-8', errors='ignore')
+            return self._parse_manifest(key[0], io.StringIO(text))
+        
+        if pending:
+            with ThreadPoolExecutor(max_workers=MANIFEST_WORKERS, thread_name_prefix='manifests') as pool:
+                for key, dependencies in zip(pending, pool.map(parse, pending)):
+                    parsed[key] = dependencies
+                    self._cache_dependencies(key, dependencies)
+        logger.info(f"Parsed {len(pending)} manifests, {len(parsed) - len(pending)} from cache")
+        
+        return _merge_dependencies([
+            parsed.get((path.rsplit('/', 1)[-1], sha), []) for path, sha, _ in loaded
+        ])
+    
+    def _cached_dependencies(
+        self, key: Tuple[str, str], persistent: bool = True
+    ) -> Optional[List[Dict[str, str]]]:
+        """
+        Parsed dependencies of a manifest by (file name, content hash), or None.
+        
+        The in-memory cache is checked first, then (unless ``persistent`` is
+        False) the blob cache, whose hits are kept in memory.
+        """
+        with self._manifest_cache_lock:
+            dependencies = self._manifest_cache.get(key)
+            if dependencies is not None:
+                self._manifest_cache.move_to_end(key)
+                return dependencies
+        if persistent and self.blob_cache is not None:
+            dependencies = self.blob_cache.get_metric(key[1], f'dependencies:{key[0]}')
+            if dependencies is not None:
+                self._cache_dependencies(key, dependencies, persist=False)
         return dependencies
     
-    def _parse_requirements_txt(self, file_path: str) -> List[Dict[str, str]]:
+    def _cache_dependencies(
+        self, key: Tuple[str, str], dependencies: List[Dict[str, str]], persist: bool = True
+    ) -> None:
+        with self._manifest_cache_lock:
+            self._manifest_cache[key] = dependencies
+            self._manifest_cache.move_to_end(key)
+            while len(self._manifest_cache) > MANIFEST_CACHE_ENTRIES:
+                self._manifest_cache.popitem(last=False)
+        if persist and self.blob_cache is not None:
+            self.blob_cache.put_metric(key[1], f'dependencies:{key[0]}', dependencies)
+    
+    def _blob_ids(self, repo_path: str, index: FileIndex, paths: List[str]) -> Dict[str, str]:
+        """
+        Blob SHAs of files in a clone, for cache lookups.
+        
+        Taken from the index where it has them (blobless clones), otherwise
+        from ``git ls-tree`` of HEAD, which a fresh clone's working copy
+        matches. Without a blob cache only the index is used.
+        
+        Returns:
+            Dictionary mapping paths to blob SHAs (paths without one left out)
+        """
+        shas = {path: index.files[path].sha for path in paths if index.files[path].sha}
+        missing = [path for path in paths if path not in shas]
+        if not missing or self.blob_cache is None or not os.path.exists(os.path.join(repo_path, '.git')):
+            return shas
+        try:
+            for start in range(0, len(missing), 200):
+                listing = run_git(
+                    ['--literal-pathspecs', 'ls-tree', '-r', '-z', 'HEAD', '--'] + missing[start:start + 200],
+                    timeout=60, cwd=repo_path
+                )
+                for record in listing.split('\0'):
+                    if not record:
+                        continue
+                    meta, _, path = record.partition('\t')
+                    _, object_type, object_id = meta.split()
+                    if object_type == 'blob':
+                        shas[path] = object_id
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"Could not list blob ids in {repo_path}: {e}")
+        return shas
+    
+    def _parse_manifest(self, file_name: str, f: TextIO) -> List[Dict[str, str]]:
+        """Parse one dependency manifest with its parser from DEPENDENCY_MANIFESTS."""
+        parser, ecosystem = DEPENDENCY_MANIFESTS[file_name]
+        deps = getattr(self, parser)(f)
+        logger.debug(f"Found {len(deps)} {ecosystem} dependencies in {file_name}")
+        return deps
+    
+    def _parse_requirements_txt(self, f: TextIO) -> List[Dict[str, str]]:
         """Parse Python requirements.txt file."""
         dependencies = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    line = line.strip()
-                    
-                    # Skip empty lines and comments
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    # Skip editable installs and URLs
-                    if line.startswith('-e') or line.startswith('http'):
-                        continue
-                    
-                    # Parse package name and version
-                    # Handle formats: package==1.0.0, package>=1.0.0, package
-                    for sep in ['==', '>=', '<=', '~=', '!=', '<', '>']:
-                        if sep in line:
-                            name, version = line.split(sep, 1)
-                            dependencies.append({
-                                'name': name.strip(),
-                                'version': version.strip(),
-                                'ecosystem': 'Python'
-                            })
-                            break
-                    else:
-                        # No version specified
-                        dependencies.append({
-                            'name': line.strip(),
-                            'version': 'unspecified',
-                            'ecosystem': 'Python'
-                        })
+            for line in f:
+                line = line.strip()
+                
+                # Skip empty lines and comments
+                if not line or line.startswith('#'):
+                    continue
+                
+                # Skip editable installs, options (-r, --index-url) and URLs
+                if line.startswith('-') or line.startswith('http'):
+                    continue
+                
+                # Parse package name and version
+                # Handle formats: package==1.0.0, package>=1.0.0, package
+                dependency = _python_requirement(line.split(' #', 1)[0])
+                if dependency:
+                    dependencies.append(dependency)
         except Exception as e:
             logger.warning(f"Error parsing requirements.txt: {e}")
         
         return dependencies
     
-    def _parse_package_json(self, file_path: str) -> List[Dict[str, str]]:
+    def _parse_package_json(self, f: TextIO) -> List[Dict[str, str]]:
         """Parse Node.js package.json file."""
         dependencies = []
         
         try:
-            import json
-            
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                data = json.load(f)
+            data = json.load(f)
             
             # Extract dependencies and devDependencies
             for dep_type in ['dependencies', 'devDependencies']:
@@ -441,101 +1032,227 @@ class RepositoryAnalyzer:
         
         return dependencies
     
-    def _parse_go_mod(self, file_path: str) -> List[Dict[str, str]]:
+    def _parse_package_lock_json(self, f: TextIO) -> List[Dict[str, str]]:
+        """
+        Parse Node.js package-lock.json file.
+        
+        Lists the direct dependencies of the root package with their
+        resolved versions. Version 1 lockfiles do not say which packages
+        are direct, so they are skipped.
+        """
+        dependencies = []
+        
+        try:
+            data = json.load(f)
+            packages = data.get('packages')
+            if not isinstance(packages, dict):
+                logger.debug("Skipping package-lock.json without a 'packages' section (lockfile version 1)")
+                return dependencies
+            
+            root = packages.get('', {})
+            for dep_type in ['dependencies', 'devDependencies']:
+                if isinstance(root.get(dep_type), dict):
+                    for name, declared in root[dep_type].items():
+                        resolved = packages.get(f'node_modules/{name}', {})
+                        dependencies.append({
+                            'name': name,
+                            'version': resolved.get('version', declared),
+                            'ecosystem': 'Node.js'
+                        })
+        except Exception as e:
+            logger.warning(f"Error parsing package-lock.json: {e}")
+        
+        return dependencies
+    
+    def _parse_go_mod(self, f: TextIO) -> List[Dict[str, str]]:
         """Parse Go go.mod file."""
         dependencies = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                in_require_block = False
+            in_require_block = False
+            
+            for line in f:
+                line = line.strip()
                 
-                for line in f:
-                    line = line.strip()
+                # Detect require block
+                if line.startswith('require ('):
+                    in_require_block = True
+                    continue
+                elif line == ')' and in_require_block:
+                    in_require_block = False
+                    continue
+                
+                # Parse single require or require block entry
+                if line.startswith('require ') or in_require_block:
+                    # Remove 'require ' prefix if present
+                    if line.startswith('require '):
+                        line = line[8:]
                     
-                    # Detect require block
-                    if line.startswith('require ('):
-                        in_require_block = True
-                        continue
-                    elif line == ')' and in_require_block:
-                        in_require_block = False
+                    # Skip empty lines and comments
+                    if not line or line.startswith('//'):
                         continue
                     
-                    # Parse single require or require block entry
-                    if line.startswith('require ') or in_require_block:
-                        # Remove 'require ' prefix if present
-                        if line.startswith('require '):
-                            line = line[8:]
-                        
-                        # Skip empty lines and comments
-                        if not line or line.startswith('//'):
-                            continue
-                        
-                        # Parse: module version
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            dependencies.append({
-                                'name': parts[0],
-                                'version': parts[1],
-                                'ecosystem': 'Go'
-                            })
+                    # Parse: module version
+                    parts = line.split()
+                    if len(parts) >= 2:
+                        dependencies.append({
+                            'name': parts[0],
+                            'version': parts[1],
+                            'ecosystem': 'Go'
+                        })
         except Exception as e:
             logger.warning(f"Error parsing go.mod: {e}")
         
         return dependencies
     
-    def _parse_cargo_toml(self, file_path: str) -> List[Dict[str, str]]:
+    def _parse_cargo_toml(self, f: TextIO) -> List[Dict[str, str]]:
         """Parse Rust Cargo.toml file."""
         dependencies = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                in_dependencies = False
+            in_dependencies = False
+            
+            for line in f:
+                line = line.strip()
                 
-                for line in f:
-                    line = line.strip()
-                    
-                    # Detect [dependencies] section
-                    if line == '[dependencies]':
-                        in_dependencies = True
-                        continue
-                    elif line.startswith('[') and in_dependencies:
-                        # New section started
-                        in_dependencies = False
+                # Detect [dependencies] section
+                if line == '[dependencies]':
+                    in_dependencies = True
+                    continue
+                elif line.startswith('[') and in_dependencies:
+                    # New section started
+                    in_dependencies = False
+                    continue
+                
+                # Parse dependency in [dependencies] section
+                if in_dependencies and '=' in line:
+                    # Skip comments
+                    if line.startswith('#'):
                         continue
                     
-                    # Parse dependency in [dependencies] section
-                    if in_dependencies and '=' in line:
-                        # Skip comments
-                        if line.startswith('#'):
-                            continue
-                        
-                        # Parse: name = "version" or name = { version = "version" }
-                        name, rest = line.split('=', 1)
-                        name = name.strip()
-                        rest = rest.strip()
-                        
-                        # Extract version
-                        version = 'unspecified'
-                        if rest.startswith('"'):
-                            # Simple format: name = "version"
-                            version = rest.strip('"').strip("'")
-                        elif 'version' in rest:
-                            # Complex format: name = { version = "version" }
-                            import re
-                            match = re.search(r'version\s*=\s*["\']([^"\']+)["\']', rest)
-                            if match:
-                                version = match.group(1)
-                        
-                        dependencies.append({
-                            'name': name,
-                            'version': version,
-                            'ecosystem': 'Rust'
-                        })
+                    # Parse: name = "version" or name = { version = "version" }
+                    name, rest = line.split('=', 1)
+                    name = name.strip()
+                    rest = rest.strip()
+                    
+                    # Extract version
+                    version = 'unspecified'
+                    if rest.startswith('"'):
+                        # Simple format: name = "version"
+                        version = rest.strip('"').strip("'")
+                    elif 'version' in rest:
+                        # Complex format: name = { version = "version" }
+                        match = re.search(r'version\s*=\s*["\']([^"\']+)["\']', rest)
+                        if match:
+                            version = match.group(1)
+                    
+                    dependencies.append({
+                        'name': name,
+                        'version': version,
+                        'ecosystem': 'Rust'
+                    })
         except Exception as e:
             logger.warning(f"Error parsing Cargo.toml: {e}")
         
         return dependencies
     
+    def _parse_pyproject_toml(self, f: TextIO) -> List[Dict[str, str]]:
+        """Parse Python pyproject.toml file (PEP 621 [project] or Poetry dependencies)."""
+        dependencies = []
+        
+        try:
+            data = tomllib.loads(f.read())
+            
+            for spec in data.get('project', {}).get('dependencies', []):
+                dependency = _python_requirement(spec) if isinstance(spec, str) else None
+                if dependency:
+                    dependencies.append(dependency)
+            
+            poetry = data.get('tool', {}).get('poetry', {}).get('dependencies', {})
+            dependencies.extend(self._toml_dependency_table(poetry))
+        except Exception as e:
+            logger.warning(f"Error parsing pyproject.toml: {e}")
+        
+        return dependencies
+    
+    def _parse_pipfile(self, f: TextIO) -> List[Dict[str, str]]:
+        """Parse Python Pipfile ([packages] section)."""
+        dependencies = []
+        
+        try:
+            data = tomllib.loads(f.read())
+            dependencies.extend(self._toml_dependency_table(data.get('packages', {})))
+        except Exception as e:
+            logger.warning(f"Error parsing Pipfile: {e}")
+        
+        return dependencies
+    
+    @staticmethod
+    def _toml_dependency_table(table: Dict) -> List[Dict[str, str]]:
+        """Python dependencies from a ``name = "version"`` or ``name = { version = ... }`` table."""
+        dependencies = []
+        for name, spec in table.items():
+            if name.lower() == 'python':
+                continue  # Interpreter constraint, not a package
+            if isinstance(spec, dict):
+                spec = spec.get('version', 'unspecified')
+            version = spec if isinstance(spec, str) and spec != '*' else 'unspecified'
+            dependencies.append({'name': name, 'version': version, 'ecosystem': 'Python'})
+        return dependencies
+    
+    def _parse_pom_xml(self, f: TextIO) -> List[Dict[str, str]]:
+        """Parse Java Maven pom.xml file (project-level <dependencies>)."""
+        dependencies = []
+        
+        try:
+            root = ET.fromstring(f.read())
+            # Elements live in the POM namespace, e.g. {http://maven.apache.org/POM/4.0.0}project
+            ns = root.tag[:root.tag.index('}') + 1] if root.tag.startswith('{') else ''
+            
+            # ${property} references resolve against <properties> and the project version
+            project_version = root.findtext(f'{ns}version') or root.findtext(f'{ns}parent/{ns}version') or ''
+            properties = {'project.version': project_version.strip()}
+            properties_element = root.find(f'{ns}properties')
+            if properties_element is not None:
+                for prop in properties_element:
+                    properties[prop.tag[len(ns):]] = (prop.text or '').strip()
+            
+            for dep in root.findall(f'{ns}dependencies/{ns}dependency'):
+                group = (dep.findtext(f'{ns}groupId') or '').strip()
+                artifact = (dep.findtext(f'{ns}artifactId') or '').strip()
+                if not artifact:
+                    continue
+                version = (dep.findtext(f'{ns}version') or '').strip()
+                version = re.sub(r'\$\{([^}]+)\}', lambda m: properties.get(m.group(1)) or m.group(0), version)
+                dependencies.append({
+                    'name': f'{group}:{artifact}' if group else artifact,
+                    'version': version or 'unspecified',
+                    'ecosystem': 'Java'
+                })
+        except Exception as e:
+            logger.warning(f"Error parsing pom.xml: {e}")
+        
+        return dependencies
+    
+    def _parse_build_gradle(self, f: TextIO) -> List[Dict[str, str]]:
+        """Parse Java Gradle build.gradle / build.gradle.kts file (``group:name:version`` notation)."""
+        dependencies = []
+        
+        try:
+            for line in f:
+                match = GRADLE_DEPENDENCY.match(line)
+                if match:
+                    group, name, version = match.groups()
+                    dependencies.append({
+                        'name': f'{group}:{name}',
+                        'version': version or 'unspecified',
+                        'ecosystem': 'Java'
+                    })
+        except Exception as e:
+            logger.warning(f"Error parsing build.gradle: {e}")
+        
+        return dependencies
+    
     def analyze_git_history(self, repo_path: str) -> Dict[str, any]:
         """
         Analyze git commit history from cloned repository.
@@ -544,56 +1261,124 @@ class RepositoryAnalyzer:
         - Total commit count
         - Monthly commit breakdown for last 12 months
         - Last commit date
+        - Contributor and churn analytics for the last 12 months
+          (see GitAnalytics)
+        
+        The total, monthly counts and last commit date come from the
+        committer timestamps of the whole history, streamed from
+        ``git rev-list --timestamp`` one line at a time, so they are exact
+        (backdated and future-dated commits included) with bounded memory.
+        The analytics come from one ``git log --numstat`` stream (newest
+        first) that stops HISTORY_SLOP commits past the 12-month window, so
+        diffs of old history are never computed; in-window commits found
+        deeper than that, e.g. behind a long run of backdated ones, are
+        left out of the analytics only.
+        
+        Partial (blobless) clones are logged with ``--name-only`` instead:
+        numstat would download every changed blob of the window, so churn
+        is counted in commits per file rather than in lines.
         
         Args:
             repo_path: Path to the cloned repository
             
+        If the current deadline passes during the analytics pass, the counts
+        are still returned, with the analytics of the commits read so far
+        (``analytics['truncated']`` is True). If it passes during the count,
+        no history is returned.
+        
         Returns:
-            Dictionary with 'total_commits', 'monthly_commits', and 'last_commit_date'
+            Dictionary with 'total_commits', 'monthly_commits',
+            'last_commit_date', 'analytics' (GitAnalytics.result() plus
+            'truncated') and 'truncated' (None, 'analytics' or 'history':
+            which pass ran out of time)
         """
         
         logger.info(f"Analyzing git history in {repo_path}")
         
-        if not GIT_AVAILABLE:
-            logger.warning("GitPython not available, cannot analyze git history")
-            return {
-                'total_commits': 0,
-                'monthly_commits': {},
-                'last_commit_date': None
-            }
-        
         try:
-            repo = Repo(repo_path)
-            
-            # Get all commits
-            commits = list(repo.iter_commits())
-            total_commits = len(commits)
+            deadline = current_deadline()
+            numstat = not self._is_partial_clone(repo_path)
             
             # Calculate date 12 months ago
             twelve_months_ago = datetime.now() - timedelta(days=365)
+            cutoff = twelve_months_ago.timestamp()
             
-            # Count commits per month for last 12 months
-            monthly_commits = defaultdict(int)
-            last_commit_date = None
+            try:
+                total_commits, monthly_commits, last_timestamp = self._commit_timeline(repo_path, cutoff, deadline)
+            except DeadlineExceeded as e:
+                # Partial counts would understate the history: leave it to the API data
+                logger.warning(f"⚠ {e}")
+                return {
+                    'total_commits': 0,
+                    'monthly_commits': {},
+                    'last_commit_date': None,
+                    'analytics': {},
+                    'truncated': 'history'
+                }
             
-            for commit in commits:
-                commit_date = datetime.fromtimestamp(commit.committed_date)
-                
-                # Track last commit date
-                if last_commit_date is None or commit_date > last_commit_date:
-                    last_commit_date = commit_date
-                
-                # Only count commits from last 12 months
-                if commit_date >= twelve_months_ago:
-                    month_key = commit_date.strftime('%Y-%m')
-                    monthly_commits[month_key] += 1
+            analytics = GitAnalytics(churn_unit='lines' if numstat else 'commits', window_days=365)
+            older_in_a_row = 0
+            in_window = False
+            commits_read = 0
+            truncated = None
+            
+            # Each commit is a header line (committer time, author time,
+            # mailmapped author email) followed by its changed files
+            lines = iter_git_lines(
+                ['-c', 'core.quotePath=false', 'log', '--no-show-signature', '--no-renames',
+                 '--numstat' if numstat else '--name-only',
+                 '--format=%x1e%ct %at %aE', 'HEAD'],
+                cwd=repo_path
+            )
+            try:
+                for line in lines:
+                    if not line.startswith('\x1e'):
+                        if in_window and line:
+                            if numstat:
+                                added, removed, path = line.split('\t', 2)
+                                # Binary files show '-' instead of line counts
+                                analytics.add_file_change(
+                                    path,
+                                    int(added) if added != '-' else None,
+                                    int(removed) if removed != '-' else None
+                                )
+                            else:
+                                analytics.add_file_change(line)
+                        continue
+                    
+                    if commits_read % 1000 == 0 and deadline is not None and deadline.expired:
+                        raise DeadlineExceeded(f"Deadline exceeded after {commits_read} commits of history")
+                    commits_read += 1
+                    committed, _, rest = line[1:].partition(' ')
+                    authored, _, author = rest.partition(' ')
+                    timestamp = int(committed)
+                    
+                    # Only analyze commits from last 12 months
+                    in_window = timestamp >= cutoff
+                    if in_window:
+                        analytics.add_commit(timestamp, int(authored), author.lower())
+                        older_in_a_row = 0
+                    else:
+                        older_in_a_row += 1
+                        if older_in_a_row > HISTORY_SLOP:
+                            break
+            except DeadlineExceeded as e:
+                # The counts above are complete; keep the analytics gathered so far
+                logger.warning(f"⚠ {e}, analytics cover the newest commits only")
+                truncated = 'analytics'
+            finally:
+                lines.close()
+            
+            last_commit_date = datetime.fromtimestamp(last_timestamp) if last_timestamp is not None else None
             
             logger.info(f"Found {total_commits} total commits, {len(monthly_commits)} months with activity")
             
             return {
                 'total_commits': total_commits,
-                'monthly_commits': dict(monthly_commits),
-                'last_commit_date': last_commit_date.isoformat() if last_commit_date else None
+                'monthly_commits': monthly_commits,
+                'last_commit_date': last_commit_date.isoformat() if last_commit_date else None,
+                'analytics': dict(analytics.result(), truncated=truncated is not None),
+                'truncated': truncated
             }
             
         except Exception as e:
@@ -601,5 +1386,52 @@ class RepositoryAnalyzer:
             return {
                 'total_commits': 0,
                 'monthly_commits': {},
-                'last_commit_date': None
+                'last_commit_date': None,
+                'analytics': {},
+                'truncated': None
             }
+    
+    @staticmethod
+    def _commit_timeline(
+        repo_path: str, cutoff: float, deadline: Optional[Deadline]
+    ) -> Tuple[int, Dict[str, int], Optional[int]]:
+        """
+        Count commits over the whole history from their committer timestamps.
+        
+        Args:
+            repo_path: Path to the repository
+            cutoff: Start of the monthly window (Unix timestamp)
+            deadline: Optional Deadline, checked every 1000 commits
+            
+        Returns:
+            (total commits, commits per month inside the window, newest
+            committer timestamp or None for an empty history)
+        """
+        total = 0
+        monthly_commits: Dict[str, int] = defaultdict(int)
+        last_timestamp = None
+        lines = iter_git_lines(['rev-list', '--timestamp', 'HEAD'], cwd=repo_path)
+        try:
+            for line in lines:
+                if total % 1000 == 0 and deadline is not None and deadline.expired:
+                    raise DeadlineExceeded(f"Deadline exceeded after {total} commits of history")
+                total += 1
+                timestamp = int(line.split(' ', 1)[0])
+                if last_timestamp is None or timestamp > last_timestamp:
+                    last_timestamp = timestamp
+                if timestamp >= cutoff:
+                    monthly_commits[datetime.fromtimestamp(timestamp).strftime('%Y-%m')] += 1
+        finally:
+            lines.close()
+        return total, dict(monthly_commits), last_timestamp
+    
+    def _is_partial_clone(self, repo_path: str) -> bool:
+        """Return True if the clone has a promisor remote (objects fetched on demand)."""
+        try:
+            promisors = run_git(
+                ['config', '--get-regexp', r'^remote\..*\.promisor$'], timeout=30, cwd=repo_path
+            )
+        except subprocess.CalledProcessError:
+            # No remote is a promisor
+            return False
+        return any(line.split()[-1:] == ['true'] for line in promisors.splitlines())
@@ -0,0 +1,316 @@
+"""Dependency-aware concurrent execution of pipeline stages."""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Collection, Dict, List, Optional, Sequence, Set, Tuple
+
+from data_acquisition.deadline import Deadline, current_deadline, deadline_scope
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Stage outcomes
+COMPLETED = 'completed'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+RESTORED = 'restored'  # Completed in an earlier run, results restored from a checkpoint
+
+
+@dataclass
+class Stage:
+    """
+    A unit of pipeline work with declared inputs and outputs.
+
+    ``func`` receives the shared state (a dict of named values) and returns a
+    dict of the values it produces, which must be a subset of ``provides``.
+    A stage runs once every stage producing its ``requires``/``optional``
+    keys and every stage named in ``after`` has finished. If a required key
+    was not produced (its producer failed or was skipped) the stage is
+    skipped; missing optional keys are simply absent from the state.
+    ``fields`` names the RepositoryData attributes the stage writes, which
+    is what a checkpoint keeps for it. ``budget`` bounds the stage in
+    seconds: it runs under a child of the caller's deadline (see
+    deadline.py), which blocking calls inside it honor.
+    """
+
+    name: str
+    func: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+    requires: Tuple[str, ...] = ()
+    provides: Tuple[str, ...] = ()
+    optional: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+    critical: bool = False  # Failure aborts the run (after `always` stages)
+    always: bool = False  # Still runs when a critical stage failed (e.g. cleanup)
+    fields: Tuple[str, ...] = ()
+    budget: Optional[float] = None
+
+
+@dataclass
+class StageRecord:
+    """Outcome and timing of one stage, relative to the start of the run."""
+
+    name: str
+    status: str = SKIPPED
+    start: float = 0.0
+    end: float = 0.0
+    error: str = ''
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'status': self.status,
+            'start': round(self.start, 4),
+            'end': round(self.end, 4),
+            'duration': round(self.duration, 4),
+            'error': self.error,
+        }
+
+
+@dataclass
+class ExecutionReport:
+    """Per-stage records and the critical path of a run."""
+
+    records: Dict[str, StageRecord] = field(default_factory=dict)
+    critical_path: List[str] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'wall_time': round(self.wall_time, 4),
+            'critical_path': list(self.critical_path),
+            'stages': {name: record.to_dict() for name, record in self.records.items()},
+        }
+
+
+class StageExecutor:
+    """
+    Runs a DAG of stages on a thread pool, as early as dependencies allow.
+
+    I/O-bound stages (API calls, cloning) overlap with each other and with
+    local analysis. Non-critical failures only skip dependent stages, which
+    keeps the pipeline's graceful degradation; a critical failure stops new
+    stages from starting, lets running ones finish, runs ``always`` stages
+    whose inputs are available and then re-raises the original exception.
+
+    Example:
+        executor = StageExecutor([
+            Stage('clone', clone, provides=('repo_path',)),
+            Stage('walk', walk, requires=('repo_path',), provides=('files',)),
+        ])
+        report = executor.run(state={'url': url})
+    """
+
+    def __init__(self, stages: Sequence[Stage], max_workers: int = 6):
+        """
+        Initialize the executor.
+
+        Args:
+            stages: Stages of the DAG (names must be unique)
+            max_workers: Maximum number of stages running at once
+
+        Raises:
+            ValueError: If names are duplicated, a key has two producers, a
+                dependency is unknown or the graph has a cycle
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        self.max_workers = max_workers
+
+        self.producers: Dict[str, str] = {}
+        for stage in stages:
+            for key in stage.provides:
+                if key in self.producers:
+                    raise ValueError(f"'{key}' is provided by both {self.producers[key]} and {stage.name}")
+                self.producers[key] = stage.name
+        for stage in stages:
+            for name in stage.after:
+                if name not in self.stages:
+                    raise ValueError(f"Stage {stage.name} runs after unknown stage {name}")
+        self._check_acyclic()
+
+    def dependencies(self, stage: Stage) -> List[str]:
+        """Names of the stages that must finish before this stage starts."""
+        names = [self.producers[key] for key in stage.requires + stage.optional if key in self.producers]
+        return list(dict.fromkeys(names + list(stage.after)))
+
+    def plan_resume(self, checkpointed: Collection[str]) -> Set[str]:
+        """
+        Choose which checkpointed stages can be restored instead of run.
+
+        Stage outputs (a clone path, in-flight API results) are not
+        checkpointed, so a stage that has to run pulls its producers back in;
+        they run again but their own dependants stay restored. A stage is
+        also re-run when one of its dependencies has no checkpoint, so later
+        stages still apply on top of earlier ones. ``always`` stages (cleanup)
+        never pull producers in: with nothing produced they are skipped.
+
+        Args:
+            checkpointed: Names of stages that completed in an earlier run
+
+        Returns:
+            Names of the stages to restore
+        """
+        missing = {name for name in self.stages if name not in checkpointed}
+        changed = True
+        while changed:
+            changed = False
+            for name, stage in self.stages.items():
+                if name not in missing and any(dep in missing for dep in self.dependencies(stage)):
+                    missing.add(name)
+                    changed = True
+
+        rerun = set(missing)
+        queue = [name for name in missing if not self.stages[name].always]
+        while queue:
+            stage = self.stages[queue.pop()]
+            for key in stage.requires + stage.optional:
+                producer = self.producers.get(key)
+                if producer is not None and producer not in rerun:
+                    rerun.add(producer)
+                    queue.append(producer)
+        return set(self.stages) - rerun
+
+    def _check_acyclic(self) -> None:
+        visiting, done = set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependency cycle through {name}")
+            visiting.add(name)
+            for dependency in self.dependencies(self.stages[name]):
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def run(
+        self,
+        state: Optional[Dict[str, Any]] = None,
+        restored: Collection[str] = (),
+        on_complete: Optional[Callable[[Stage], None]] = None
+    ) -> ExecutionReport:
+        """
+        Run all stages.
+
+        Each stage runs under the caller's current deadline, narrowed by the
+        stage's budget.
+
+        Args:
+            state: Initial values (updated in place with stage outputs)
+            restored: Stages to mark as restored instead of running them
+                (see plan_resume()); they provide no outputs
+            on_complete: Called with each stage that completes, before any
+                stage ordered after it starts (e.g. to write a checkpoint)
+
+        Returns:
+            ExecutionReport with per-stage timings and the critical path
+
+        Raises:
+            Exception: The exception of a failed critical stage
+        """
+        state = state if state is not None else {}
+        lock = threading.Lock()
+        report = ExecutionReport(records={name: StageRecord(name) for name in self.stages})
+        finished: Dict[str, str] = {}
+        for name in restored:
+            report.records[name].status = finished[name] = RESTORED
+        running: Dict[Future, str] = {}
+        abort: Optional[BaseException] = None
+        started_at = time.perf_counter()
+        deadline = current_deadline()
+
+        def call(stage: Stage) -> Dict[str, Any]:
+            with lock:
+                inputs = dict(state)
+            if stage.budget is None:
+                scope = deadline
+            else:
+                scope = deadline.child(stage.budget) if deadline is not None else Deadline(stage.budget)
+            report.records[stage.name].start = time.perf_counter() - started_at
+            try:
+                with deadline_scope(scope):
+                    return stage.func(inputs) or {}
+            finally:
+                report.records[stage.name].end = time.perf_counter() - started_at
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='stage') as pool:
+            while len(finished) < len(self.stages):
+                for name, stage in self.stages.items():
+                    if name in finished or name in running.values():
+                        continue
+                    if not all(dependency in finished for dependency in self.dependencies(stage)):
+                        continue
+                    missing = [key for key in stage.requires if key not in state]
+                    if missing or (abort is not None and not stage.always):
+                        record = report.records[name]
+                        record.start = record.end = time.perf_counter() - started_at
+                        record.error = f"missing inputs: {', '.join(missing)}" if missing else 'aborted'
+                        finished[name] = SKIPPED
+                        logger.debug(f"Skipping stage {name} ({record.error})")
+                        continue
+                    running[pool.submit(call, stage)] = name
+
+                if not running:
+                    # Stages skipped in this pass may have unblocked others
+                    continue
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    record = report.records[name]
+                    try:
+                        outputs = future.result()
+                    except Exception as e:
+                        record.status = FAILED
+                        record.error = f"{type(e).__name__}: {e}"
+                        finished[name] = FAILED
+                        if self.stages[name].critical and abort is None:
+                            abort = e
+                        else:
+                            logger.warning(f"⚠ Stage {name} failed: {e}")
+                        continue
+                    unexpected = set(outputs) - set(self.stages[name].provides)
+                    if unexpected:
+                        logger.warning(f"Stage {name} returned undeclared outputs: {sorted(unexpected)}")
+                    with lock:
+                        state.update({k: v for k, v in outputs.items() if k not in unexpected})
+                    record.status = COMPLETED
+                    if on_complete is not None:
+                        try:
+                            on_complete(self.stages[name])
+                        except Exception as e:
+                            logger.warning(f"⚠ Completion hook failed for stage {name}: {e}")
+                    finished[name] = COMPLETED
+
+        report.wall_time = time.perf_counter() - started_at
+        report.critical_path = self._critical_path(report)
+        if abort is not None:
+            raise abort
+        return report
+
+    def _critical_path(self, report: ExecutionReport) -> List[str]:
+        """Walk back from the last stage to finish through the dependency that gated each start."""
+        ran = {name: record for name, record in report.records.items() if record.status not in (SKIPPED, RESTORED)}
+        if not ran:
+            return []
+        current = max(ran.values(), key=lambda record: record.end).name
+        path = [current]
+        while True:
+            gates = [name for name in self.dependencies(self.stages[current]) if name in ran]
+            if not gates:
+                break
+            current = max(gates, key=lambda name: ran[name].end)
+            path.append(current)
+        return list(reversed(path))
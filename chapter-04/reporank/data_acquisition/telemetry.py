@@ -0,0 +1,333 @@
+"""Per-endpoint request metrics for the GitHub API client."""
+
+import json
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+# Latency histogram bucket upper bounds in seconds (Prometheus "le" labels)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Path segments that vary per request, replaced to form endpoint templates
+_TEMPLATE_RULES = [
+    (re.compile(r'^/repos/[^/]+/[^/]+'), '/repos/{o}/{r}'),
+    (re.compile(r'/contents/.+$'), '/contents/{path}'),
+    (re.compile(r'/git/trees/[^/]+$'), '/git/trees/{ref}'),
+    (re.compile(r'/commits/[^/]+$'), '/commits/{sha}'),
+    (re.compile(r'/(tarball|zipball)/[^/]+$'), r'/\1/{ref}'),
+    (re.compile(r'^/users/[^/]+'), '/users/{u}'),
+    (re.compile(r'^/orgs/[^/]+'), '/orgs/{org}'),
+]
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    Reduce an endpoint path to its template.
+
+    Example:
+        endpoint_template('/repos/psf/requests/languages')
+        # Returns: '/repos/{o}/{r}/languages'
+    """
+    template = '/' + endpoint.split('?', 1)[0].strip('/')
+    for pattern, replacement in _TEMPLATE_RULES:
+        template = pattern.sub(replacement, template)
+    return template
+
+
+@dataclass
+class Histogram:
+    """Latency histogram with fixed, non-cumulative buckets."""
+
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    count: int = 0
+    total: float = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket containing it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets[:-1]):
+            seen += n
+            if seen >= rank:
+                return LATENCY_BUCKETS[i]
+        return float('inf')
+
+
+@dataclass
+class EndpointMetrics:
+    """Counters for one endpoint template."""
+
+    latency: Histogram = field(default_factory=Histogram)
+    status_codes: Dict[str, int] = field(default_factory=dict)
+    bytes_received: int = 0
+    retries: Dict[str, int] = field(default_factory=dict)
+    backoff_seconds: float = 0.0
+    cache: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        latency = self.latency
+        return {
+            'requests': latency.count,
+            'latency_seconds': {
+                'sum': round(latency.total, 6),
+                'mean': round(latency.total / latency.count, 6) if latency.count else 0.0,
+                'p50': latency.quantile(0.5),
+                'p95': latency.quantile(0.95),
+                'buckets': dict(zip([str(b) for b in LATENCY_BUCKETS] + ['+Inf'], latency.buckets)),
+            },
+            'status_codes': dict(self.status_codes),
+            'bytes_received': self.bytes_received,
+            'retries': dict(self.retries),
+            'backoff_seconds': round(self.backoff_seconds, 3),
+            'cache': dict(self.cache),
+        }
+
+
+class RequestMetrics:
+    """
+    Thread-safe registry of GitHub API request metrics.
+
+    Tracks, per endpoint template: a latency histogram, status-code counts,
+    bytes received, retries and backoff time by reason, and cache outcomes.
+    Rate-limit headroom is kept as a gauge plus a bounded timeline of samples.
+    Each update is a few dictionary operations under one lock, so the
+    registry is cheap enough to leave enabled for fleet runs.
+
+    Example:
+        metrics = client.metrics
+        metrics.write('metrics.prom')   # Prometheus text format
+        metrics.write('metrics.json')   # JSON snapshot
+    """
+
+    def __init__(self, max_rate_limit_samples: int = 1000):
+        """
+        Initialize an empty registry.
+
+        Args:
+            max_rate_limit_samples: Rate-limit timeline samples kept (oldest dropped)
+        """
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+        self.rate_limit: Dict[str, Dict[str, float]] = {}
+        self.rate_limit_timeline: Deque[Tuple[float, str, int, int]] = deque(maxlen=max_rate_limit_samples)
+
+    def _endpoint(self, method: str, endpoint: str) -> EndpointMetrics:
+        key = (method.upper(), endpoint_template(endpoint))
+        metrics = self.endpoints.get(key)
+        if metrics is None:
+            metrics = self.endpoints[key] = EndpointMetrics()
+        return metrics
+
+    def observe_request(
+        self,
+        method: str,
+        endpoint: str,
+        status: Any,
+        seconds: float,
+        bytes_received: int = 0
+    ) -> None:
+        """
+        Record one HTTP round trip.
+
+        Args:
+            method: HTTP method
+            endpoint: Endpoint path (reduced to its template)
+            status: Status code, or an error name such as 'timeout'
+            seconds: Wall-clock duration
+            bytes_received: Response body size
+        """
+        with self._lock:
+            metrics = self._endpoint(method, endpoint)
+            metrics.latency.observe(seconds)
+            status = str(status)
+            metrics.status_codes[status] = metrics.status_codes.get(status, 0) + 1
+            metrics.bytes_received += bytes_received
+
+    def add_bytes(self, method: str, endpoint: str, bytes_received: int) -> None:
+        """Add body bytes read after the request was observed (streamed responses)."""
+        with self._lock:
+            self._endpoint(method, endpoint).bytes_received += bytes_received
+
+    def record_retry(self, method: str, endpoint: str, reason: str, backoff: float = 0.0) -> None:
+        """
+        Record a retried attempt.
+
+        Args:
+            method: HTTP method
+            endpoint: Endpoint path
+            reason: Why the attempt is retried (timeout, connection, secondary_rate_limit, ...)
+            backoff: Seconds slept before the next attempt
+        """
+        with self._lock:
+            metrics = self._endpoint(method, endpoint)
+            metrics.retries[reason] = metrics.retries.get(reason, 0) + 1
+            metrics.backoff_seconds += backoff
+
+    def record_cache(self, method: str, endpoint: str, outcome: str) -> None:
+        """Record a response cache outcome ('hit', 'revalidated' or 'miss')."""
+        with self._lock:
+            metrics = self._endpoint(method, endpoint)
+            metrics.cache[outcome] = metrics.cache.get(outcome, 0) + 1
+
+    def record_rate_limit(self, resource: str, headers: Any) -> None:
+        """
+        Record rate-limit headroom from response headers.
+
+        Args:
+            resource: Resource the request was scheduled on (core, graphql)
+            headers: Response headers with X-RateLimit-* fields
+        """
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None:
+            return
+        resource = headers.get('X-RateLimit-Resource') or resource
+        try:
+            remaining = int(remaining)
+            limit = int(headers.get('X-RateLimit-Limit', 0))
+            reset = float(headers.get('X-RateLimit-Reset', 0))
+        except ValueError:
+            return
+        now = time.time()
+        with self._lock:
+            self.rate_limit[resource] = {'remaining': remaining, 'limit': limit, 'reset': reset}
+            self.rate_limit_timeline.append((now, resource, remaining, limit))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Snapshot all metrics as a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary with 'endpoints' (keyed "METHOD template"), 'totals',
+            'rate_limit' and 'rate_limit_timeline'
+        """
+        with self._lock:
+            endpoints = {
+                f"{method} {template}": metrics.to_dict()
+                for (method, template), metrics in sorted(self.endpoints.items())
+            }
+            rate_limit = {resource: dict(values) for resource, values in self.rate_limit.items()}
+            timeline = [
+                {'time': round(t, 3), 'resource': resource, 'remaining': remaining, 'limit': limit}
+                for t, resource, remaining, limit in self.rate_limit_timeline
+            ]
+
+        totals = {
+            'requests': sum(e['requests'] for e in endpoints.values()),
+            'bytes_received': sum(e['bytes_received'] for e in endpoints.values()),
+            'retries': sum(sum(e['retries'].values()) for e in endpoints.values()),
+            'backoff_seconds': round(sum(e['backoff_seconds'] for e in endpoints.values()), 3),
+            'latency_seconds': round(sum(e['latency_seconds']['sum'] for e in endpoints.values()), 3),
+            'cache_hits': sum(e['cache'].get('hit', 0) for e in endpoints.values()),
+        }
+        return {
+            'started_at': self.started_at,
+            'uptime_seconds': round(time.time() - self.started_at, 3),
+            'totals': totals,
+            'endpoints': endpoints,
+            'rate_limit': rate_limit,
+            'rate_limit_timeline': timeline,
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Export the snapshot as JSON."""
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, prefix: str = 'reporank_github') -> str:
+        """
+        Export the snapshot in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            Text snapshot (histograms are cumulative as Prometheus expects)
+        """
+        with self._lock:
+            items = sorted(self.endpoints.items())
+            lines = [
+                f"# HELP {prefix}_request_duration_seconds GitHub API request latency",
+                f"# TYPE {prefix}_request_duration_seconds histogram",
+            ]
+            for (method, template), metrics in items:
+                labels = f'method="{method}",endpoint="{template}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, metrics.latency.buckets):
+                    cumulative += count
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(
+                    f'{prefix}_request_duration_seconds_bucket{{{labels},le="+Inf"}} {metrics.latency.count}'
+                )
+                lines.append(f'{prefix}_request_duration_seconds_sum{{{labels}}} {metrics.latency.total:.6f}')
+                lines.append(f'{prefix}_request_duration_seconds_count{{{labels}}} {metrics.latency.count}')
+
+            counters = [
+                ('responses_total', 'Responses by status code', 'status',
+                 lambda m: m.status_codes),
+                ('retries_total', 'Retried attempts by reason', 'reason',
+                 lambda m: m.retries),
+                ('cache_total', 'Response cache outcomes', 'outcome',
+                 lambda m: m.cache),
+            ]
+            for name, help_text, label, values in counters:
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for (method, template), metrics in items:
+                    for value, count in sorted(values(metrics).items()):
+                        lines.append(
+                            f'{prefix}_{name}{{method="{method}",endpoint="{template}",{label}="{value}"}} {count}'
+                        )
+
+            lines.append(f"# HELP {prefix}_received_bytes_total Response body bytes received")
+            lines.append(f"# TYPE {prefix}_received_bytes_total counter")
+            for (method, template), metrics in items:
+                lines.append(
+                    f'{prefix}_received_bytes_total{{method="{method}",endpoint="{template}"}} {metrics.bytes_received}'
+                )
+
+            lines.append(f"# HELP {prefix}_backoff_seconds_total Time slept before retries")
+            lines.append(f"# TYPE {prefix}_backoff_seconds_total counter")
+            for (method, template), metrics in items:
+                lines.append(
+                    f'{prefix}_backoff_seconds_total{{method="{method}",endpoint="{template}"}} '
+                    f'{metrics.backoff_seconds:.3f}'
+                )
+
+            lines.append(f"# HELP {prefix}_rate_limit_remaining Requests left in the current window")
+            lines.append(f"# TYPE {prefix}_rate_limit_remaining gauge")
+            for resource, values in sorted(self.rate_limit.items()):
+                lines.append(f'{prefix}_rate_limit_remaining{{resource="{resource}"}} {values["remaining"]}')
+            lines.append(f"# HELP {prefix}_rate_limit_limit Size of the rate-limit window")
+            lines.append(f"# TYPE {prefix}_rate_limit_limit gauge")
+            for resource, values in sorted(self.rate_limit.items()):
+                lines.append(f'{prefix}_rate_limit_limit{{resource="{resource}"}} {values["limit"]}')
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """
+        Write a snapshot to a file.
+
+        Args:
+            path: Destination; ``.prom``/``.txt`` files get the Prometheus
+                format, anything else JSON
+        """
+        content = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
@@ -125,10 +125,25 @@ def analyze_recommendations(repo_data):
     return repo_data
 
 
+# Analysis steps in execution order, named for checkpoints (see data_acquisition.checkpoint)
+ANALYSIS_STEPS = [
+    ('repository_score', analyze_repository_score),
+    ('quality_metrics', analyze_quality_metrics),
+    ('llm_evaluation', analyze_llm_evaluation),
+    ('recommendations', analyze_recommendations),
+]
+
+# Steps that depend only on repository content (README, code, dependencies), whose
+# results are reused when only metadata changed (see data_acquisition.incremental)
+CONTENT_STEPS = ('quality_metrics', 'llm_evaluation')
+
+# Steps calling the LLM, skipped rather than started once the analysis deadline
+# has passed (see data_acquisition.deadline)
+LLM_STEPS = ('llm_evaluation',)
+
+
 def execute(repo_data):
     """Execute all analysis functions to populate repo_data."""
-    repo_data = analyze_repository_score(repo_data)
-    repo_data = analyze_quality_metrics(repo_data)
-    repo_data = analyze_llm_evaluation(repo_data)
-    repo_data = analyze_recommendations(repo_data)
+    for _, step in ANALYSIS_STEPS:
+        repo_data = step(repo_data)
     return repo_data
@@ -73,8 +73,13 @@ class LLMEvaluator:
                 "LLM evaluations may fail. Please set the appropriate environment variable."
             )
         
-        # Configure DSPy with the specified model
-        lm = dspy.LM(llm_model, temperature=temperature, max_tokens=max_tokens, api_key=api_key)
+        # Configure DSPy with the specified model; an LLM evaluation budget
+        # also bounds each request so a slow provider cannot stall a worker
+        lm_kwargs = {}
+        llm_budget = config.stage_budgets.get('llm_evaluation')
+        if llm_budget:
+            lm_kwargs['timeout'] = llm_budget
+        lm = dspy.LM(llm_model, temperature=temperature, max_tokens=max_tokens, api_key=api_key, **lm_kwargs)
         dspy.configure(lm=lm)
         
         # Initialize DSPy modules
@@ -0,0 +1,445 @@
+"""Fleet mode: analyze many repositories from a manifest with a shared worker pool."""
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from data_acquisition.acquisition_pipeline import AcquisitionPipeline
+from data_acquisition.checkpoint import CheckpointStore, run_analysis_steps
+from data_acquisition.deadline import Deadline, current_deadline, deadline_scope
+from data_acquisition.incremental import select_analysis_steps
+from data_analysis.analysis_engine import ANALYSIS_STEPS, CONTENT_STEPS, LLM_STEPS
+from models.repository_data import RepositoryData
+from report_generation.renderer import ReportRenderer
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Written to the output directory of a batch run
+RESULTS_FILE = 'batch_results.jsonl'
+SUMMARY_FILE = 'batch_summary.json'
+
+# Result statuses
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+@dataclass
+class BatchItem:
+    """One manifest entry."""
+
+    url: str
+    owner: str
+    repo_name: str
+    line: int = 0
+    extra: Dict[str, Any] = field(default_factory=dict)  # Other JSONL fields, copied to the result
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.owner}/{self.repo_name}"
+
+
+@dataclass
+class BatchResult:
+    """Outcome and timings of one repository in a batch run."""
+
+    item: BatchItem
+    status: str = FAILED
+    error: str = ''
+    failed_stage: str = ''
+    started_at: str = ''
+    timings: Dict[str, float] = field(default_factory=dict)
+    overall_score: Optional[float] = None
+    outputs: Dict[str, str] = field(default_factory=dict)
+    critical_path: List[str] = field(default_factory=list)
+    change_status: str = ''  # Set with incremental re-ranking
+    resumed: bool = False  # Finished in the run being resumed, not re-run
+    degradations: List[Dict[str, str]] = field(default_factory=list)  # Stages out of time
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'repository': self.item.full_name,
+            'url': self.item.url,
+            'status': self.status,
+            'error': self.error,
+            'failed_stage': self.failed_stage,
+            'started_at': self.started_at,
+            'timings': {name: round(seconds, 3) for name, seconds in self.timings.items()},
+            'overall_score': self.overall_score,
+            'outputs': self.outputs,
+            'critical_path': self.critical_path,
+            'change_status': self.change_status,
+            'resumed': self.resumed,
+            'degradations': self.degradations,
+            **({'input': self.item.extra} if self.item.extra else {}),
+        }
+
+
+def load_manifest(path: str) -> List[BatchItem]:
+    """
+    Read repositories to analyze from a URL list or a JSONL file.
+
+    Plain lines hold a URL or "owner/repo"; lines starting with "{" are JSON
+    objects with a "url" (or "github_url"/"repository") key, other keys are
+    kept and copied to the result. Blank lines and "#" comments are ignored,
+    invalid entries are logged and skipped and duplicates are dropped.
+
+    Args:
+        path: Manifest file
+
+    Returns:
+        Manifest entries in file order
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    items: List[BatchItem] = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            extra: Dict[str, Any] = {}
+            url = line
+            if line.startswith('{'):
+                try:
+                    extra = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"⚠ {path}:{line_number}: invalid JSON ({e}), skipping")
+                    continue
+                url = next((extra.pop(key) for key in ('url', 'github_url', 'repository') if key in extra), '')
+            try:
+                owner, repo_name = AcquisitionPipeline.parse_github_url(str(url))
+            except ValueError as e:
+                logger.warning(f"⚠ {path}:{line_number}: {e}, skipping")
+                continue
+            key = (owner.lower(), repo_name.lower())
+            if key in seen:
+                logger.debug(f"{path}:{line_number}: duplicate {owner}/{repo_name}, skipping")
+                continue
+            seen.add(key)
+            items.append(BatchItem(url=str(url), owner=owner, repo_name=repo_name, line=line_number, extra=extra))
+    return items
+
+
+class FleetRunner:
+    """
+    Runs acquisition, analysis and reporting for many repositories.
+
+    All workers share one AcquisitionPipeline (and so one GitHubClient with
+    its connection pool, response cache, rate limiter and token pool, and one
+    RepositoryAnalyzer clone directory) and one ReportRenderer. Repositories
+    run on a thread pool, since acquisition is dominated by API calls and
+    clones; the analysis step can be moved to a process pool when it is
+    CPU-bound. Reports are written as each repository finishes, one line per
+    repository is appended to batch_results.jsonl and batch_summary.json is
+    written at the end (also after an interrupt).
+
+    With a CheckpointStore every stage is checkpointed per repository; when
+    resuming, repositories that finished are taken over from their
+    checkpoint and the others continue from their first incomplete stage.
+    When the pipeline has a ranking state store, unchanged repositories
+    reuse their earlier results and the new rankings are stored.
+
+    Example:
+        runner = FleetRunner(pipeline, ReportRenderer(), './output', workers=8)
+        summary = runner.run(load_manifest('urls.txt'))
+    """
+
+    def __init__(
+        self,
+        pipeline: AcquisitionPipeline,
+        renderer: ReportRenderer,
+        output_dir: str,
+        workers: int = 4,
+        analysis_processes: int = 0,
+        analysis_steps: Sequence[Tuple[str, Callable[[RepositoryData], RepositoryData]]] = ANALYSIS_STEPS,
+        content_steps: Sequence[str] = CONTENT_STEPS,
+        prefetch_metadata: bool = True,
+        checkpoints: Optional[CheckpointStore] = None,
+        analysis_deadline: float = 0,
+        step_budgets: Optional[Dict[str, float]] = None,
+        optional_steps: Sequence[str] = LLM_STEPS
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            pipeline: Acquisition pipeline shared by all workers
+            renderer: Report renderer shared by all workers
+            output_dir: Directory for reports, results and the summary
+            workers: Repositories processed at once
+            analysis_processes: Size of the process pool for the analysis step
+                (0 runs it on the worker thread, e.g. for I/O-bound LLM calls);
+                the steps must then be picklable module-level functions
+            analysis_steps: Named analysis steps applied to each repository
+            content_steps: Steps reused when only metadata changed
+            prefetch_metadata: Fetch metadata for the whole manifest with bulk
+                GraphQL queries when the pipeline uses the GraphQL backend
+            checkpoints: Optional checkpoint store to record to and resume from
+            analysis_deadline: Seconds allowed per repository for acquisition
+                and analysis (0 = no deadline), so one giant repository
+                degrades instead of holding a worker
+            step_budgets: Optional seconds allowed per analysis step
+            optional_steps: Analysis steps skipped when out of time
+        """
+        self.pipeline = pipeline
+        self.renderer = renderer
+        self.output_dir = output_dir
+        self.workers = max(1, workers)
+        self.analysis_processes = analysis_processes
+        self.analysis_steps = analysis_steps
+        self.content_steps = content_steps
+        self.prefetch_metadata = prefetch_metadata
+        self.checkpoints = checkpoints
+        self.analysis_deadline = analysis_deadline
+        self.step_budgets = dict(step_budgets or {})
+        self.optional_steps = optional_steps
+        self._write_lock = threading.Lock()
+
+    def run(self, items: List[BatchItem]) -> Dict[str, Any]:
+        """
+        Process all manifest entries.
+
+        Args:
+            items: Entries from load_manifest()
+
+        Returns:
+            The summary also written to batch_summary.json
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        results_path = os.path.join(self.output_dir, RESULTS_FILE)
+        open(results_path, 'w', encoding='utf-8').close()
+
+        started_at = datetime.now().isoformat()
+        started = time.perf_counter()
+        results: List[BatchResult] = []
+        interrupted = False
+
+        if self.checkpoints is not None and self.checkpoints.resumed:
+            remaining = []
+            for item in items:
+                checkpoint = self.checkpoints.for_repository(item.owner, item.repo_name)
+                if checkpoint.finished:
+                    result = self._restored_result(item, checkpoint.result)
+                    results.append(result)
+                    self._append_result(results_path, result)
+                else:
+                    remaining.append(item)
+            logger.info(
+                f"Resuming run {self.checkpoints.run_id}: {len(results)} repositories finished, "
+                f"{len(remaining)} to go"
+            )
+        else:
+            remaining = items
+        metadata = self._prefetch(remaining)
+
+        analysis_pool: Optional[Executor] = None
+        if self.analysis_processes > 0:
+            # Spawned workers do not inherit the locks held by pipeline threads
+            analysis_pool = ProcessPoolExecutor(
+                max_workers=self.analysis_processes,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+
+        logger.info(f"Analyzing {len(remaining)} repositories with {self.workers} workers")
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='fleet')
+        pending = iter(remaining)
+        running: Dict[Future, BatchItem] = {}
+        try:
+            # Submit lazily so an interrupt does not leave thousands of queued tasks
+            while True:
+                while len(running) < self.workers * 2:
+                    item = next(pending, None)
+                    if item is None:
+                        break
+                    running[pool.submit(
+                        self._process, item, metadata.get(item.full_name), analysis_pool
+                    )] = item
+                if not running:
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    result = future.result()
+                    results.append(result)
+                    self._append_result(results_path, result)
+                    self._log_progress(result, len(results), len(items))
+        except KeyboardInterrupt:
+            interrupted = True
+            logger.warning(f"⚠ Interrupted, waiting for {len(running)} running repositories")
+            for future in running:
+                future.cancel()
+        finally:
+            pool.shutdown(wait=True)
+            if analysis_pool is not None:
+                analysis_pool.shutdown(wait=True)
+
+        if interrupted:
+            for future, item in running.items():
+                if future.done() and not future.cancelled():
+                    result = future.result()
+                    results.append(result)
+                    self._append_result(results_path, result)
+
+        summary = self._summarize(items, results, started_at, time.perf_counter() - started, interrupted)
+        with open(os.path.join(self.output_dir, SUMMARY_FILE), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+    def _prefetch(self, items: List[BatchItem]) -> Dict[str, Any]:
+        """Bulk-fetch GraphQL snapshots; failed repositories fall back to per-repo calls."""
+        client = self.pipeline.github_client
+        if not (self.prefetch_metadata and self.pipeline.backend == "graphql" and client.token and items):
+            return {}
+        try:
+            snapshots = client.get_repositories_bulk([(item.owner, item.repo_name) for item in items])
+        except Exception as e:
+            logger.warning(f"⚠ Bulk metadata prefetch failed, fetching per repository: {e}")
+            return {}
+        # Errors are dropped so the pipeline retries those repositories itself
+        return {name: snapshot for name, snapshot in snapshots.items() if not isinstance(snapshot, Exception)}
+
+    def _process(
+        self,
+        item: BatchItem,
+        metadata: Optional[Dict[str, Any]],
+        analysis_pool: Optional[Executor]
+    ) -> BatchResult:
+        """Acquire, analyze and render one repository; never raises."""
+        result = BatchResult(item=item, started_at=datetime.now().isoformat())
+        started = time.perf_counter()
+        checkpoint = None
+        if self.checkpoints is not None:
+            checkpoint = self.checkpoints.for_repository(item.owner, item.repo_name)
+        stage = 'acquisition'
+        deadline = Deadline(self.analysis_deadline or None)
+        try:
+            with deadline_scope(deadline):
+                repo_data = self.pipeline.execute(item.url, metadata=metadata, checkpoint=checkpoint)
+            result.critical_path = repo_data.stage_timings.get('critical_path', [])
+            result.change_status = repo_data.change_status
+            result.timings['acquisition'] = time.perf_counter() - started
+
+            stage = 'analysis'
+            step = time.perf_counter()
+            call = None
+            if analysis_pool is not None:
+                # The deadline does not cross into the process, so bound the wait instead
+                # (steps started after the deadline are mandatory ones, left unbounded)
+                call = lambda step, data: analysis_pool.submit(step, data).result(
+                    timeout=current_deadline().remaining() or None
+                )
+            steps = select_analysis_steps(repo_data, self.analysis_steps, self.content_steps)
+            with deadline_scope(deadline):
+                repo_data = run_analysis_steps(
+                    repo_data, steps, checkpoint=checkpoint, call=call,
+                    budgets=self.step_budgets, optional_steps=self.optional_steps
+                )
+            result.degradations = list(repo_data.degradations)
+            result.timings['analysis'] = time.perf_counter() - step
+            result.overall_score = repo_data.overall_score
+
+            stage = 'report'
+            step = time.perf_counter()
+            prefix = os.path.join(self.output_dir, f"{item.owner}_{item.repo_name}")
+            result.outputs = {
+                'html': self.renderer.render_html_report(repo_data, f"{prefix}_report.html"),
+                'json': self.renderer.save_json_data(repo_data, f"{prefix}_data.json"),
+            }
+            result.timings['report'] = time.perf_counter() - step
+            if self.pipeline.state_store is not None:
+                self.pipeline.state_store.put(repo_data)
+            result.status = COMPLETED
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            result.failed_stage = stage
+        result.timings['total'] = time.perf_counter() - started
+        if checkpoint is not None and result.status == COMPLETED:
+            try:
+                checkpoint.finish(result.to_dict())
+            except OSError as e:
+                logger.warning(f"⚠ Failed to checkpoint result of {item.full_name}: {e}")
+        return result
+
+    @staticmethod
+    def _restored_result(item: BatchItem, data: Dict[str, Any]) -> BatchResult:
+        """Rebuild the result of a repository that finished in the resumed run."""
+        return BatchResult(
+            item=item,
+            status=data.get('status', COMPLETED),
+            started_at=data.get('started_at', ''),
+            timings=data.get('timings', {}),
+            overall_score=data.get('overall_score'),
+            outputs=data.get('outputs', {}),
+            critical_path=data.get('critical_path', []),
+            change_status=data.get('change_status', ''),
+            resumed=True,
+            degradations=data.get('degradations', []),
+        )
+
+    def _append_result(self, path: str, result: BatchResult) -> None:
+        with self._write_lock:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(result.to_dict()) + '\n')
+
+    @staticmethod
+    def _log_progress(result: BatchResult, done: int, total: int) -> None:
+        name = result.item.full_name
+        seconds = result.timings.get('total', 0.0)
+        if result.status == COMPLETED:
+            change = f" ({result.change_status})" if result.change_status else ''
+            if result.degradations:
+                change += f" degraded: {', '.join(entry['stage'] for entry in result.degradations)}"
+            logger.info(f"[{done}/{total}] ✓ {name}: score {result.overall_score}{change} in {seconds:.1f}s")
+        else:
+            logger.error(f"[{done}/{total}] ✗ {name}: {result.failed_stage} failed after {seconds:.1f}s: {result.error}")
+
+    def _summarize(
+        self,
+        items: List[BatchItem],
+        results: List[BatchResult],
+        started_at: str,
+        wall_time: float,
+        interrupted: bool
+    ) -> Dict[str, Any]:
+        order = {item.full_name: index for index, item in enumerate(items)}
+        results = sorted(results, key=lambda result: order.get(result.item.full_name, len(order)))
+        completed = [result for result in results if result.status == COMPLETED]
+        totals = [result.timings['total'] for result in results]
+        blob_cache = self.pipeline.repo_analyzer.blob_cache
+        return {
+            'started_at': started_at,
+            'finished_at': datetime.now().isoformat(),
+            'wall_time': round(wall_time, 3),
+            'interrupted': interrupted,
+            'workers': self.workers,
+            'analysis_processes': self.analysis_processes,
+            'run_id': self.checkpoints.run_id if self.checkpoints is not None else None,
+            'counts': {
+                'total': len(items),
+                'completed': len(completed),
+                'failed': len(results) - len(completed),
+                'not_run': len(items) - len(results),
+                'resumed': sum(1 for result in results if result.resumed),
+                'degraded': sum(1 for result in results if result.degradations),
+            },
+            'change_status': dict(Counter(result.change_status for result in results if result.change_status)),
+            'repo_seconds': {
+                'sum': round(sum(totals), 3),
+                'mean': round(sum(totals) / len(totals), 3) if totals else 0.0,
+                'max': round(max(totals), 3) if totals else 0.0,
+            },
+            'api': self.pipeline.github_client.metrics.to_dict()['totals'],
+            'blob_cache': blob_cache.stats.to_dict() if blob_cache is not None else None,
+            'repositories': [result.to_dict() for result in results],
+        }
@@ -5,15 +5,24 @@ import argparse
 import os
 import sys
 import re
-from typing import Tuple
+import logging
+import sqlite3
+from typing import List, Optional, Tuple
 
 from config import Config
+from data_acquisition.blob_cache import BlobCache
 from data_acquisition.github_client import GitHubClient
 from data_acquisition.repo_analyzer import RepositoryAnalyzer
 from data_acquisition.acquisition_pipeline import AcquisitionPipeline
-from data_analysis.analysis_engine import execute as data_analysis_execute
+from data_acquisition.checkpoint import CheckpointStore, run_analysis_steps
+from data_acquisition.deadline import Deadline, deadline_scope
+from data_acquisition.incremental import RankingStateStore, select_analysis_steps
+from data_acquisition.mirror_cache import MirrorCache
+from data_analysis.analysis_engine import ANALYSIS_STEPS, CONTENT_STEPS, LLM_STEPS
+from fleet import SUMMARY_FILE, BatchItem, FleetRunner, load_manifest
 from report_generation.renderer import ReportRenderer
 from utils.logger import setup_logger, get_logger
+from utils.line_counter import LineCounter
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -22,7 +31,17 @@ def parse_arguments() -> argparse.Namespace:
         description='RepoRank - Analyze GitHub repositories',
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
-    parser.add_argument('github_url', type=str, help='GitHub repository URL')
+    parser.add_argument('github_url', type=str, nargs='?', help='GitHub repository URL')
+    parser.add_argument('-b', '--batch', type=str, default=None,
+                       help='Analyze every repository in a file of URLs (or JSONL with a "url" key)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                       help='Repositories analyzed at once in batch mode')
+    parser.add_argument('--analysis-processes', type=int, default=None,
+                       help='Processes for the analysis step in batch mode (0 = threads)')
+    parser.add_argument('--resume', type=str, nargs='?', const='latest', default=None, metavar='RUN_ID',
+                       help='Continue an interrupted run from its checkpoints (default: latest run)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Reuse earlier results for repositories without new pushes')
     parser.add_argument('-o', '--output', type=str, default='./output', help='Output directory')
     parser.add_argument('-t', '--token', type=str, default=None, help='GitHub API token')
     parser.add_argument('-l', '--log-level', type=str, choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], 
@@ -61,12 +80,24 @@ def main() -> int:
     logger.info("RepoRank - GitHub Repository Analysis Tool")
     logger.info("=" * 80)
     
-    try:
-        owner, repo_name = validate_github_url(args.github_url)
-        logger.info(f"Analyzing: {owner}/{repo_name}")
-    except ValueError as e:
-        logger.error(f"URL validation failed: {e}")
-        return 1
+    if bool(args.github_url) == bool(args.batch):
+        logger.error("Pass either a GitHub URL or --batch FILE")
+        return 2
+    
+    if args.batch:
+        try:
+            batch_items = load_manifest(args.batch)
+            logger.info(f"Batch: {len(batch_items)} repositories from {args.batch}")
+        except OSError as e:
+            logger.error(f"Failed to read batch file: {e}")
+            return 1
+    else:
+        try:
+            owner, repo_name = validate_github_url(args.github_url)
+            logger.info(f"Analyzing: {owner}/{repo_name}")
+        except ValueError as e:
+            logger.error(f"URL validation failed: {e}")
+            return 1
     
     try:
         config = Config.from_env()
@@ -74,6 +105,12 @@ def main() -> int:
         config.log_level = args.log_level
         if args.token:
             config.github_token = args.token
+        if args.workers is not None:
+            config.batch_workers = args.workers
+        if args.analysis_processes is not None:
+            config.batch_analysis_processes = args.analysis_processes
+        if args.incremental:
+            config.incremental_enabled = True
         
         os.makedirs(config.output_dir, exist_ok=True)
         logger.info(f"Output directory: {config.output_dir}")
@@ -83,29 +120,95 @@ def main() -> int:
     
     try:
         logger.info("Initializing components...")
-        github_client = GitHubClient(token=config.github_token)
-        repo_analyzer = RepositoryAnalyzer()
-        acquisition_pipeline = AcquisitionPipeline(github_client, repo_analyzer)
+        # In batch mode every worker shares the client, so size its connection pool for all of them
+        pool_size = config.api_concurrency * config.batch_workers if args.batch else None
+        github_client = GitHubClient.from_config(
+            config, pool_size=pool_size, stats_workers=max(4, config.batch_workers) if args.batch else 4
+        )
+        mirror_cache = None
+        if config.clone_cache_enabled:
+            mirror_cache = MirrorCache(config.get_clone_cache_dir(), max_bytes=config.clone_cache_max_mb * 1024 * 1024)
+        blob_cache = None
+        if config.blob_cache_enabled:
+            try:
+                blob_cache = BlobCache(config.get_blob_cache_path(), max_entries=config.blob_cache_max_entries)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠ Blob cache unavailable ({e}), analyzing every file")
+        repo_analyzer = RepositoryAnalyzer(
+            clone_timeout=config.clone_timeout, temp_dir=config.temp_dir,
+            mirror_cache=mirror_cache, clone_strategy=config.clone_strategy,
+            line_counter=LineCounter(processes=config.line_count_processes),
+            blob_cache=blob_cache
+        )
+        state_store = RankingStateStore(config.get_state_dir()) if config.incremental_enabled else None
+        acquisition_pipeline = AcquisitionPipeline(
+            github_client, repo_analyzer,
+            max_concurrency=config.api_concurrency,
+            backend=config.acquisition_backend,
+            stats_deadline=config.stats_poll_deadline,
+            state_store=state_store,
+            stage_budgets=config.stage_budgets,
+            local_analysis=config.local_analysis
+        )
         report_renderer = ReportRenderer()
+        checkpoints = None
+        if config.checkpoint_enabled or args.resume:
+            checkpoints = CheckpointStore(config.get_checkpoint_dir(), run_id=args.resume)
+            logger.info(
+                f"{'Resuming' if checkpoints.resumed else 'Checkpointing'} run {checkpoints.run_id} "
+                f"in {config.get_checkpoint_dir()}"
+            )
         logger.info("Components initialized")
     except Exception as e:
         logger.error(f"Initialization failed: {e}")
         return 1
     
+    try:
+        if args.batch:
+            return run_batch(batch_items, config, acquisition_pipeline, report_renderer, checkpoints, logger)
+        return run_single(
+            args.github_url, owner, repo_name, config, acquisition_pipeline, report_renderer, checkpoints, logger
+        )
+    finally:
+        acquisition_pipeline.close()
+
+
+def run_single(
+    github_url: str,
+    owner: str,
+    repo_name: str,
+    config: Config,
+    acquisition_pipeline: AcquisitionPipeline,
+    report_renderer: ReportRenderer,
+    checkpoints: Optional[CheckpointStore],
+    logger: logging.Logger
+) -> int:
+    """Analyze one repository and write its reports; non-zero exit on failure."""
+    checkpoint = checkpoints.for_repository(owner, repo_name) if checkpoints else None
+    # One deadline covers acquisition and analysis
+    deadline = Deadline(config.analysis_deadline or None)
     try:
         logger.info("STAGE 1: DATA ACQUISITION")
-        repo_data = acquisition_pipeline.execute(args.github_url)
+        with deadline_scope(deadline):
+            repo_data = acquisition_pipeline.execute(github_url, checkpoint=checkpoint)
         logger.info("Data acquisition complete")
     except Exception as e:
         logger.error(f"Data acquisition failed: {e}")
+        log_resume_hint(checkpoints, logger)
         return 1
     
     try:
         logger.info("STAGE 2: DATA ANALYSIS")
-        repo_data = data_analysis_execute(repo_data)
+        steps = select_analysis_steps(repo_data, ANALYSIS_STEPS, CONTENT_STEPS)
+        with deadline_scope(deadline):
+            repo_data = run_analysis_steps(
+                repo_data, steps, checkpoint=checkpoint,
+                budgets=config.stage_budgets, optional_steps=LLM_STEPS
+            )
         logger.info("Data analysis complete")
     except Exception as e:
         logger.error(f"Data analysis failed: {e}")
+        log_resume_hint(checkpoints, logger)
         return 1
     
     try:
@@ -118,6 +221,11 @@ def main() -> int:
         
         logger.info(f"HTML report: {html_output}")
         logger.info(f"JSON data: {json_output}")
+        if acquisition_pipeline.state_store is not None:
+            acquisition_pipeline.state_store.put(repo_data)
+        if checkpoints is not None:
+            # The run is complete: nothing left to resume
+            checkpoints.discard()
     except Exception as e:
         logger.error(f"Report generation failed: {e}")
         return 1
@@ -127,10 +235,98 @@ def main() -> int:
     logger.info(f"Repository: {owner}/{repo_name}")
     logger.info(f"Overall Score: {repo_data.overall_score}/10")
     logger.info(f"Maturity Level: {repo_data.maturity_level}")
+    if repo_data.change_status:
+        logger.info(f"Change status: {repo_data.change_status} (HEAD {repo_data.head_sha[:12] or 'unknown'})")
+    for entry in repo_data.degradations:
+        logger.warning(f"⚠ Degraded: {entry['stage']} used {entry['fallback']} ({entry['reason']})")
+    log_api_summary(acquisition_pipeline.github_client, config, logger)
+    log_blob_cache_summary(acquisition_pipeline.repo_analyzer, logger)
     logger.info("=" * 80)
     
     return 0
 
 
+def run_batch(
+    batch_items: List[BatchItem],
+    config: Config,
+    acquisition_pipeline: AcquisitionPipeline,
+    report_renderer: ReportRenderer,
+    checkpoints: Optional[CheckpointStore],
+    logger: logging.Logger
+) -> int:
+    """Analyze every manifest entry with shared components; non-zero exit if any failed."""
+    logger.info(f"BATCH MODE: {config.batch_workers} workers, "
+                f"{config.batch_analysis_processes or 'no'} analysis processes")
+    runner = FleetRunner(
+        acquisition_pipeline, report_renderer, config.output_dir,
+        workers=config.batch_workers,
+        analysis_processes=config.batch_analysis_processes,
+        checkpoints=checkpoints,
+        analysis_deadline=config.analysis_deadline,
+        step_budgets=config.stage_budgets
+    )
+    summary = runner.run(batch_items)
+    
+    counts = summary['counts']
+    logger.info("=" * 80)
+    logger.info("BATCH COMPLETE" if not summary['interrupted'] else "BATCH INTERRUPTED")
+    logger.info(
+        f"Repositories: {counts['completed']} completed, {counts['failed']} failed, "
+        f"{counts['not_run']} not run in {summary['wall_time']:.1f}s"
+    )
+    if counts['degraded']:
+        logger.warning(f"⚠ {counts['degraded']} repositories degraded to cheaper fallbacks (see summary)")
+    logger.info(f"Summary: {os.path.join(config.output_dir, SUMMARY_FILE)}")
+    if counts['failed'] or counts['not_run']:
+        log_resume_hint(checkpoints, logger)
+    elif checkpoints is not None and not summary['interrupted']:
+        # Every repository finished: nothing left to resume
+        checkpoints.discard()
+    log_api_summary(acquisition_pipeline.github_client, config, logger)
+    log_blob_cache_summary(acquisition_pipeline.repo_analyzer, logger)
+    logger.info("=" * 80)
+    
+    if summary['interrupted']:
+        return 130
+    return 0 if counts['failed'] == 0 else 1
+
+
+def log_resume_hint(checkpoints: Optional[CheckpointStore], logger: logging.Logger) -> None:
+    """Tell the user how to continue a run that did not finish."""
+    if checkpoints is not None:
+        logger.info(f"Completed stages are checkpointed; re-run with --resume {checkpoints.run_id} to continue")
+
+
+def log_api_summary(github_client: GitHubClient, config: Config, logger: logging.Logger) -> None:
+    """Log cache and request totals and write the metrics file if configured."""
+    cache_stats = github_client.get_cache_stats()
+    if cache_stats:
+        logger.info(
+            f"API cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+            f"({cache_stats['revalidations']} revalidated with 304)"
+        )
+    api_totals = github_client.metrics.to_dict()['totals']
+    logger.info(
+        f"API requests: {api_totals['requests']} in {api_totals['latency_seconds']:.1f}s, "
+        f"{api_totals['retries']} retries, {api_totals['bytes_received'] / 1024:.0f} KB received"
+    )
+    if config.metrics_file:
+        try:
+            github_client.metrics.write(config.metrics_file)
+            logger.info(f"API metrics: {config.metrics_file}")
+        except OSError as e:
+            logger.warning(f"Failed to write API metrics: {e}")
+
+
+def log_blob_cache_summary(repo_analyzer: RepositoryAnalyzer, logger: logging.Logger) -> None:
+    """Log how many per-file lookups the blob cache answered this run."""
+    if repo_analyzer.blob_cache is not None:
+        stats = repo_analyzer.blob_cache.stats.to_dict()
+        logger.info(
+            f"Blob cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_ratio']:.0%} hit ratio), {stats['stores']} stored"
+        )
+
+
 if __name__ == '__main__':
     sys.exit(main())
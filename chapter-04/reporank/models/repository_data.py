@@ -26,11 +26,16 @@ class RepositoryData:
     forks: int = 0
     contributors: int = 0
     license: str = ""
+    pushed_at: str = ""  # Last push to any branch
+    head_sha: str = ""  # Default branch commit the analysis is based on
     
     # Commit Activity (from GitHub API)
     total_commits: int = 0
     last_commit: str = ""
     monthly_commits: Dict[str, int] = field(default_factory=dict)
+    # Authors, churn and bus factor over the last 12 months of local history
+    # (see data_acquisition/git_analytics.py)
+    git_analytics: Dict[str, Any] = field(default_factory=dict)
     
     # Tech Stack (from local analysis)
     file_extension_counts: Dict[str, int] = field(default_factory=dict)
@@ -68,6 +73,13 @@ class RepositoryData:
     analysis_date: str = field(default_factory=lambda: datetime.now().isoformat())
     overall_score: float = 0.0
     maturity_level: str = ""
+    # Acquisition stage start/end/status and critical path (see StageExecutor)
+    stage_timings: Dict[str, Any] = field(default_factory=dict)
+    # Incremental re-ranking: "new", "changed", "metadata_changed" or "unchanged" (see incremental.py)
+    change_status: str = ""
+    # Stages that fell back to a cheaper result when their time budget ran out:
+    # [{'stage': ..., 'reason': ..., 'fallback': ...}] (see data_acquisition/deadline.py)
+    degradations: List[Dict[str, str]] = field(default_factory=list)
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
@@ -100,7 +112,8 @@ class RepositoryData:
             "commit_activity": {
                 "total_commits": self.total_commits,
                 "last_commit": self.last_commit,
-                "monthly_commits": self.monthly_commits
+                "monthly_commits": self.monthly_commits,
+                "git_analytics": self.git_analytics
             },
             "tech_stack": {
                 "file_extension_counts": self.file_extension_counts,
@@ -132,6 +145,7 @@ class RepositoryData:
             },
             "analysis_metadata": {
                 "analysis_date": self.analysis_date,
-                "analyzed_files": self.analyzed_files
+                "analyzed_files": self.analyzed_files,
+                "degradations": self.degradations
             }
         }
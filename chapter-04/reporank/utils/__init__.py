@@ -34,6 +34,7 @@ from utils.file_utils import (
     format_file_size,
     list_files_recursive,
     count_lines_in_file,
+    count_lines_in_files,
     generate_timestamp_filename,
     safe_filename,
     copy_file,
@@ -98,6 +99,7 @@ __all__ = [
     'format_file_size',
     'list_files_recursive',
     'count_lines_in_file',
+    'count_lines_in_files',
     'generate_timestamp_filename',
     'safe_filename',
     'copy_file',
@@ -8,6 +8,8 @@ from typing import Optional, Dict, Any, List
 from pathlib import Path
 from datetime import datetime
 
+from utils.line_counter import LineCounter, count_file_lines
+
 
 def ensure_directory(path: str) -> str:
     """
@@ -237,21 +239,47 @@ def count_lines_in_file(path: str, encoding: str = 'utf-8', errors: str = 'ignor
     """
     Count the number of lines in a file.
     
+    Newlines are counted on the raw bytes (memory-mapped for large files),
+    so the file is never decoded.
+    
     Args:
         path: Path to file
-        encoding: File encoding (default: utf-8)
-        errors: How to handle encoding errors (default: ignore)
+        encoding: Kept for compatibility; ignored
+        errors: Kept for compatibility; ignored
         
     Returns:
         Number of lines in the file
     """
     try:
-        with open(path, 'r', encoding=encoding, errors=errors) as f:
-            return sum(1 for _ in f)
+        return count_file_lines(path)
     except Exception:
         return 0
 
 
+def count_lines_in_files(paths: List[str], processes: int = 0) -> Dict[str, int]:
+    """
+    Count the number of lines in many files.
+    
+    Large batches are split by file size across a pool of ``processes``
+    processes (see utils.line_counter.LineCounter).
+    
+    Args:
+        paths: Paths to files
+        processes: Size of the process pool (0 = count in this process)
+        
+    Returns:
+        Dictionary mapping each readable file to its number of lines
+    """
+    files = []
+    for path in paths:
+        try:
+            files.append((path, os.path.getsize(path)))
+        except OSError:
+            continue
+    with LineCounter(processes=processes) as counter:
+        return counter.count(files)
+
+
 def generate_timestamp_filename(base_name: str, extension: str = "") -> str:
     """
     Generate a filename with timestamp.
@@ -0,0 +1,220 @@
+"""Line counting on raw bytes, in-process or sharded across a process pool."""
+
+import heapq
+import mmap
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Files at least this large are memory-mapped; smaller ones are read in one call
+MMAP_MIN_BYTES = 64 * 1024
+
+# Bytes of a mapped file counted per slice (mmap objects have no count())
+MMAP_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Batches below this many bytes are counted in-process: starting the pool costs more
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+# Shards per process, so one slow shard does not leave the other processes idle
+SHARDS_PER_PROCESS = 4
+
+
+def count_bytes_lines(data: bytes) -> int:
+    """
+    Count the lines in a buffer.
+
+    A final line without a trailing newline counts as a line, as when
+    iterating over the file.
+
+    Args:
+        data: File contents
+
+    Returns:
+        Number of lines
+    """
+    if not data:
+        return 0
+    return data.count(b'\n') + (0 if data[-1:] == b'\n' else 1)
+
+
+def count_file_lines(path: str) -> int:
+    """
+    Count the lines in a file without decoding it.
+
+    Newlines are counted on the raw bytes. Large files are memory-mapped
+    and counted slice by slice, so memory stays bounded whatever their
+    size; small files are read in one call.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Number of lines
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_MIN_BYTES:
+            return count_bytes_lines(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if hasattr(data, 'madvise'):
+                data.madvise(mmap.MADV_SEQUENTIAL)
+            newlines = 0
+            for start in range(0, size, MMAP_CHUNK_BYTES):
+                newlines += data[start:start + MMAP_CHUNK_BYTES].count(b'\n')
+            return newlines + (0 if data[size - 1:size] == b'\n' else 1)
+
+
+def _count_shard(paths: List[str]) -> List[Optional[int]]:
+    """Count the lines of each file in a shard (None if it cannot be read); runs in a pool process."""
+    counts: List[Optional[int]] = []
+    for path in paths:
+        try:
+            counts.append(count_file_lines(path))
+        except (OSError, ValueError):
+            counts.append(None)
+    return counts
+
+
+def shard_by_size(files: Iterable[Tuple[str, int]], shards: int) -> List[List[str]]:
+    """
+    Split files into shards of about equal total size.
+
+    Files are placed largest first, each into the currently smallest shard.
+
+    Args:
+        files: (path, size in bytes) pairs
+        shards: Number of shards
+
+    Returns:
+        Non-empty lists of paths
+    """
+    heap = [(0, shard) for shard in range(max(1, shards))]
+    assigned: List[List[str]] = [[] for _ in heap]
+    for path, size in sorted(files, key=lambda item: item[1], reverse=True):
+        total, shard = heapq.heappop(heap)
+        assigned[shard].append(path)
+        heapq.heappush(heap, (total + size, shard))
+    return [paths for paths in assigned if paths]
+
+
+class LineCounter:
+    """
+    Counts lines in many files, sharding large batches across processes.
+
+    Counting newlines in bytes releases little of the GIL, so threads do not
+    help; batches of at least ``parallel_min_bytes`` are split by size into
+    shards and counted in a pool of spawned processes (started on first use
+    and shared by all callers). Smaller batches, and every batch when
+    ``processes`` is 0, are counted in the calling thread.
+
+    Example:
+        counter = LineCounter(processes=4)
+        counts = counter.count([('src/app.js', 120000), ('src/lib.cc', 80000)])
+        counter.close()
+    """
+
+    def __init__(self, processes: int = 0, parallel_min_bytes: int = PARALLEL_MIN_BYTES):
+        """
+        Initialize the line counter.
+
+        Args:
+            processes: Size of the process pool (0 = always count in-process)
+            parallel_min_bytes: Smallest batch, in bytes, sent to the pool
+        """
+        self.processes = processes
+        self.parallel_min_bytes = parallel_min_bytes
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def count(self, files: Iterable[Tuple[str, int]], deadline=None) -> Dict[str, int]:
+        """
+        Count the lines of each file.
+
+        Args:
+            files: (path, size in bytes) pairs; sizes only steer sharding
+            deadline: Optional Deadline; when it passes, files not counted
+                yet are left out of the result
+
+        Returns:
+            Dictionary mapping each readable file's path to its line count
+        """
+        files = list(files)
+        total_bytes = sum(size for _, size in files)
+        if self.processes < 1 or len(files) < 2 or total_bytes < self.parallel_min_bytes:
+            return self._count_in_process(files, deadline)
+
+        shards = shard_by_size(files, self.processes * SHARDS_PER_PROCESS)
+        pool = self._get_pool()
+        futures = {pool.submit(_count_shard, paths): paths for paths in shards}
+        timeout = deadline.timeout() if deadline is not None else None
+        done, not_done = wait(futures, timeout=timeout)
+        for future in not_done:
+            future.cancel()
+        if not_done:
+            logger.warning(f"⚠ Time budget exhausted, {len(not_done)} of {len(shards)} line-count shards skipped")
+
+        counts: Dict[str, int] = {}
+        for future in done:
+            paths = futures[future]
+            if future.exception() is not None:
+                # A pool process died (e.g. out of memory): count this shard here
+                logger.warning(f"⚠ Line-count process failed ({future.exception()}), counting in-process")
+                self._discard_pool(pool)
+                counts.update(self._count_in_process([(path, 0) for path in paths], deadline))
+                continue
+            for path, lines in zip(paths, future.result()):
+                if lines is not None:
+                    counts[path] = lines
+        return counts
+
+    def _count_in_process(self, files: List[Tuple[str, int]], deadline) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for path, _ in files:
+            if deadline is not None and deadline.expired:
+                logger.warning(f"⚠ Time budget exhausted, counted {len(counts)} of {len(files)} files")
+                break
+            try:
+                counts[path] = count_file_lines(path)
+            except (OSError, ValueError) as e:
+                logger.debug(f"Could not count lines in {path}: {e}")
+        return counts
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned workers do not inherit the locks held by other threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        # A broken pool rejects all further work; the next batch starts a new one
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def close(self) -> None:
+        """Shut down the process pool, if one was started."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self) -> 'LineCounter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()